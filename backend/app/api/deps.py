@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import math
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException, Request
+
+from app.config import settings
+from app.core.rate_limit import client_ip
+from app.repositories import TooManyListsError
+from app.services.count_stream import CountBroadcaster
+from app.services.startup import start_waitlist_service
+from app.services.waitlist import AsyncWaitlistService
+from app.services.waitlists import UnknownWaitlistError, WaitlistRegistry
+
+logger = logging.getLogger(__name__)
+
+
+async def get_waitlist_service(request: Request) -> AsyncWaitlistService:
+    """Return the process-wide waitlist service built in the app lifespan.
+
+    If warm-up failed at startup (e.g. Firestore was unreachable), the service
+    is started on first use instead, with the lifespan's steps, so a transient
+    outage can recover.
+    """
+    state = request.app.state
+    service = getattr(state, "waitlist_service", None)
+    if service is not None:
+        return service
+
+    lock = getattr(state, "startup_lock", None)
+    if lock is None:
+        lock = state.startup_lock = asyncio.Lock()
+    async with lock:
+        if getattr(state, "waitlist_service", None) is None:
+            try:
+                await start_waitlist_service(state)
+            except Exception as e:
+                logger.error(f"Waitlist service unavailable: {str(e)}")
+                raise HTTPException(
+                    status_code=503, detail="Service temporarily unavailable"
+                )
+    return state.waitlist_service
+
+
+async def get_count_broadcaster(request: Request) -> CountBroadcaster:
+    """Return the worker's live count broadcaster, built on first use."""
+    service = await get_waitlist_service(request)
+    broadcaster = getattr(request.app.state, "count_broadcaster", None)
+    if broadcaster is None or broadcaster.service is not service:
+        broadcaster = request.app.state.count_broadcaster = CountBroadcaster(service)
+    return broadcaster
+
+
+async def get_waitlist_registry(request: Request) -> WaitlistRegistry:
+    """Return the worker's registry of named waitlists, built on first use."""
+    service = await get_waitlist_service(request)
+    registry = getattr(request.app.state, "waitlist_registry", None)
+    if registry is None or registry.default is not service:
+        registry = request.app.state.waitlist_registry = WaitlistRegistry(service)
+    return registry
+
+
+async def get_list_service(list_id: str, request: Request) -> AsyncWaitlistService:
+    """Return the service of the named waitlist in the ``list_id`` path parameter."""
+    try:
+        registry = await get_waitlist_registry(request)
+        return await registry.get(list_id)
+    except UnknownWaitlistError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except TooManyListsError as e:
+        # A listed waitlist the in-memory backend has no room left for
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def require_admin(authorization: Optional[str] = Header(default=None)) -> None:
+    """Require ``Authorization: Bearer <ADMIN_API_KEY>``.
+
+    Admin routes are unreachable when no key is configured.
+    """
+    expected = settings.admin_api_key
+    scheme, _, token = (authorization or "").partition(" ")
+    if (
+        not expected
+        or scheme.lower() != "bearer"
+        or not secrets.compare_digest(token.encode(), expected.encode())
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or missing admin credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def limit_debug(request: Request) -> None:
+    """Apply the per-IP debug rate limit, answering 429 when it is used up."""
+    limiter = getattr(request.app.state, "rate_limiter", None)
+    if limiter is None:
+        return
+    retry_after = await limiter.check_debug(client_ip(request.scope))
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests. Please try again later.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
@@ -0,0 +1,133 @@
+import logging
+from datetime import datetime, timezone
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_waitlist_registry, get_waitlist_service, require_admin
+from app.repositories import StorageUnavailableError, TooManyListsError
+from app.repositories.base import ENTRY_FIELDS, EntryFilter
+from app.services.bulk_import import BulkImporter, iter_lines
+from app.services.export import MEDIA_TYPES, export_chunks
+from app.services.waitlist import AsyncWaitlistService
+from app.services.waitlists import UnknownWaitlistError, WaitlistRegistry
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 500
+
+
+def _as_stored(value: Optional[datetime]) -> Optional[datetime]:
+    # Entries are stamped with naive UTC datetimes
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@router.get("/admin/waitlist")
+async def list_waitlist(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    page_token: Optional[str] = None,
+    source: Optional[str] = None,
+    notified: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    fields: Optional[List[str]] = Query(None),
+    service: AsyncWaitlistService = Depends(get_waitlist_service),
+):
+    """List waitlist entries, newest first, one page at a time.
+
+    ``source``, ``notified`` and the ``created_at`` range (``created_from``
+    inclusive, ``created_to`` exclusive) are applied by Firestore. Repeat
+    ``fields`` to return only those fields and each entry's ``id``. Pass
+    ``next_page_token`` back as ``page_token``, with the same filters, for the
+    next page.
+    """
+    unknown = sorted(set(fields or ()) - set(ENTRY_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    filters = EntryFilter(
+        source=source,
+        notified=notified,
+        created_from=_as_stored(created_from),
+        created_to=_as_stored(created_to),
+    )
+
+    try:
+        entries, next_page_token = await service.get_all_emails(
+            limit, page_token, filters=filters, fields=fields
+        )
+    except ValueError as e:
+        # Malformed page token
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"entries": entries, "next_page_token": next_page_token}
+
+
+@router.post("/admin/waitlist/import")
+async def import_waitlist(
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    source: str = "import",
+    service: AsyncWaitlistService = Depends(get_waitlist_service),
+):
+    """Bulk-import addresses from a CSV or NDJSON request body.
+
+    The body is streamed and written in batches; the response reports the
+    outcome of every row and the import throughput.
+    """
+    try:
+        importer = BulkImporter(service, source=source)
+        report = await importer.run(iter_lines(request.stream()), format)
+    except StorageUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk import failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
+
+    logger.info(
+        f"Bulk import finished: {report['counts']} in {report['elapsed_seconds']}s"
+    )
+    return report
+
+
+@router.get("/admin/waitlist/export")
+async def export_waitlist(
+    format: Literal["csv", "ndjson"] = "ndjson",
+    service: AsyncWaitlistService = Depends(get_waitlist_service),
+):
+    """Stream every waitlist entry as CSV or NDJSON, newest first.
+
+    Entries are read page by page with cursors and written out as they
+    arrive, so the server never holds the full list in memory.
+    """
+    return StreamingResponse(
+        export_chunks(service.stream_entries(), format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="waitlist.{format}"'},
+    )
+
+
+@router.post("/admin/waitlists/{list_id}", status_code=201)
+async def create_waitlist(
+    list_id: str,
+    registry: WaitlistRegistry = Depends(get_waitlist_registry),
+):
+    """Create the named waitlist ``list_id``, served at ``/api/waitlists/{list_id}``.
+
+    Creating a list that exists already is not an error; ``created`` is then
+    false.
+    """
+    try:
+        created = await registry.create(list_id)
+    except UnknownWaitlistError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TooManyListsError as e:
+        # The in-memory backend's limit on named lists
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(f"Waitlist {list_id} {'created' if created else 'already exists'}")
+    return {"list_id": list_id, "created": created}
@@ -1,21 +1,25 @@
 import logging
 import os
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 
-from app.core.firebase import test_firestore_connection
-from app.services.waitlist import WaitlistService
+from app.api.deps import get_waitlist_service, limit_debug, require_admin
+from app.services.waitlist import AsyncWaitlistService
 
-router = APIRouter()
+# Every check here reaches storage, so none of them is open to the public or
+# suitable for an uptime checker; use /livez and /readyz for that
+router = APIRouter(dependencies=[Depends(require_admin), Depends(limit_debug)])
 logger = logging.getLogger(__name__)
 
 
 @router.get("/debug/firebase")
 async def debug_firebase():
     """Debug endpoint to test Firebase/Firestore connectivity."""
+    from app.core.firebase import test_firestore_connection
+
     try:
         # Test basic connection
-        connection_test = test_firestore_connection()
+        connection_test = await test_firestore_connection()
 
         # Get environment info
         env_info = {
@@ -34,20 +38,40 @@ async def debug_firebase():
 
 
 @router.get("/debug/waitlist")
-async def debug_waitlist():
+async def debug_waitlist(
+    request: Request,
+    service: AsyncWaitlistService = Depends(get_waitlist_service),
+):
     """Debug endpoint to test waitlist service."""
     try:
-        service = WaitlistService()
-
         # Test basic service operations
         result = {
             "service_initialized": True,
-            "collection_name": service.COLLECTION_NAME,
+            "collection_name": service.repository.COLLECTION_NAME,
+            "storage": service.repository.describe(),
         }
 
+        if service.cache is not None:
+            result["cache"] = service.cache.stats()
+        if service.write_behind is not None:
+            result["write_behind"] = service.write_behind.stats()
+        if service.idempotency is not None:
+            result["idempotency"] = service.idempotency.stats()
+        if service.email_index is not None:
+            result["email_index"] = service.email_index.stats()
+        registry = getattr(request.app.state, "waitlist_registry", None)
+        if registry is not None:
+            result["named_lists"] = registry.stats()
+        broadcaster = getattr(request.app.state, "count_broadcaster", None)
+        if broadcaster is not None:
+            result["count_stream"] = broadcaster.stats()
+        health = getattr(request.app.state, "health_monitor", None)
+        if health is not None:
+            result["health"] = health.stats()
+
         # Try to get count (this tests read access)
         try:
-            count = service.get_count()
+            count = await service.get_count()
             result["current_count"] = count
             result["read_access"] = True
         except Exception as e:
@@ -62,14 +86,33 @@ async def debug_waitlist():
         raise HTTPException(status_code=500, detail=f"Waitlist debug failed: {str(e)}")
 
 
+@router.post("/debug/waitlist/rebuild-count")
+async def debug_rebuild_waitlist_count(
+    service: AsyncWaitlistService = Depends(get_waitlist_service),
+):
+    """Debug endpoint to seed or repair the sharded waitlist counter."""
+    try:
+        count = await service.rebuild_counter()
+        return {
+            "success": True,
+            "count": count,
+            "num_shards": getattr(service.repository, "num_shards", None),
+        }
+
+    except Exception as e:
+        logger.error(f"Rebuilding waitlist counter failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Counter rebuild failed: {str(e)}")
+
+
 @router.post("/debug/test-email")
-async def debug_test_email(test_email: str = "test@debug.local"):
+async def debug_test_email(
+    test_email: str = "test@debug.local",
+    service: AsyncWaitlistService = Depends(get_waitlist_service),
+):
     """Debug endpoint to test adding an email (for testing only)."""
     try:
-        service = WaitlistService()
-
         # Try to add a test email
-        result = service.add_email(test_email)
+        result = await service.add_email(test_email)
 
         return {
             "success": True,
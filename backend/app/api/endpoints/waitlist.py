@@ -1,38 +1,90 @@
 import logging
 from datetime import datetime
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Request
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
+from app.api.deps import get_count_broadcaster, get_list_service, get_waitlist_service
+from app.config import settings
+from app.core.responses import ORJSONResponse, cacheable_json_response
+from app.repositories import StorageUnavailableError
 from app.schemas.waitlist import WaitlistEntry, WaitlistResponse
-from app.services.waitlist import WaitlistService
+from app.services.count_stream import CountBroadcaster, count_events
+from app.services.idempotency import IdempotencyKeyReusedError
+from app.services.waitlist import AsyncWaitlistService
+from app.services.write_behind import QueueFullError
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.post("/waitlist", response_model=WaitlistResponse)
-async def join_waitlist(entry: WaitlistEntry, request: Request):
-    """Add an email to the waiting list."""
-    logger.info(f"🔔 Waitlist request received: {entry.email}")
-    logger.info(
-        f"📡 Request from: {request.client.host if request.client else 'unknown'}"
-    )
-    try:
-        # Initialize service
-        service = WaitlistService()
+async def join_waitlist(
+    entry: WaitlistEntry,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+    service: AsyncWaitlistService = Depends(get_waitlist_service),
+):
+    """Add an email to the waiting list.
+
+    A request repeated with the same ``Idempotency-Key`` header gets the
+    original response again rather than a duplicate-email error.
+    """
+    return await _join(service, entry, idempotency_key)
+
+
+@router.post("/waitlists/{list_id}", response_model=WaitlistResponse)
+async def join_named_waitlist(
+    entry: WaitlistEntry,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+    service: AsyncWaitlistService = Depends(get_list_service),
+):
+    """Add an email to the named waitlist ``list_id``.
+
+    Each list has its own entries, count and duplicate check; ``default`` is
+    the list of ``POST /waitlist``. Unknown lists answer 404.
+    """
+    return await _join(service, entry, idempotency_key)
 
+
+async def _join(
+    service: AsyncWaitlistService,
+    entry: WaitlistEntry,
+    idempotency_key: Optional[str],
+):
+    # Each request gets one sampled access log line from RequestLogMiddleware;
+    # log calls here pass arguments so they are only formatted if emitted
+    try:
         # Add email to Firestore
-        result = service.add_email(entry.email)
+        result = await service.add_email(entry.email, idempotency_key=idempotency_key)
 
-        # TODO: Send confirmation email via Mailgun
+        # The confirmation email is sent in a later batch by the notification
+        # worker (app/services/notifications.py), off the request path
 
-        logger.info(f"✅ Successfully added {entry.email} to waitlist")
-        return WaitlistResponse(
-            message="Successfully joined the waiting list!",
-            email=result["email"],
-            timestamp=result["created_at"],
+        # The fields are already validated, so the body is returned as is:
+        # WaitlistResponse documents it without being rebuilt per request
+        return ORJSONResponse(
+            {
+                "message": "Successfully joined the waiting list!",
+                "email": result["email"],
+                "timestamp": result["created_at"],
+            }
         )
 
+    except QueueFullError as e:
+        # Shed load while the write-behind queue catches up
+        logger.warning("Rejecting signup for %s: %s", entry.email, e)
+        raise HTTPException(
+            status_code=503,
+            detail="We're busy right now. Please try again in a moment.",
+            headers={"Retry-After": "1"},
+        )
+    except StorageUnavailableError:
+        # Answered as 503 with Retry-After by the app's exception handler
+        raise
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except ValueError as e:
         # Email already exists
         raise HTTPException(status_code=400, detail=str(e))
@@ -44,12 +96,58 @@ async def join_waitlist(entry: WaitlistEntry, request: Request):
 
 
 @router.get("/waitlist/count")
-async def get_waitlist_count():
-    """Get the total number of waitlist entries."""
+async def get_waitlist_count(
+    request: Request,
+    service: AsyncWaitlistService = Depends(get_waitlist_service),
+):
+    """Get the total number of waitlist entries.
+
+    Cacheable for ``COUNT_MAX_AGE`` seconds; a request with the ``ETag`` of
+    the current count in ``If-None-Match`` gets 304.
+    """
+    return await _count(request, service)
+
+
+@router.get("/waitlists/{list_id}/count")
+async def get_named_waitlist_count(
+    request: Request,
+    service: AsyncWaitlistService = Depends(get_list_service),
+):
+    """Get the number of entries in the named waitlist ``list_id``."""
+    return await _count(request, service)
+
+
+async def _count(request: Request, service: AsyncWaitlistService):
     try:
-        service = WaitlistService()
-        count = service.get_count()
-        return {"count": count}
+        count = await service.get_count()
+        return cacheable_json_response(
+            request, orjson.dumps({"count": count}), settings.count_max_age
+        )
+    except StorageUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting waitlist count: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving count")
+
+
+@router.get("/waitlist/count/stream")
+async def stream_waitlist_count(
+    broadcaster: CountBroadcaster = Depends(get_count_broadcaster),
+):
+    """Push the waitlist count as Server-Sent Events.
+
+    Viewers subscribe here instead of polling ``/waitlist/count``: each
+    worker reads the count once per change for all of its subscribers.
+    """
+    if broadcaster.full:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many live count subscribers",
+            headers={"Retry-After": "5"},
+        )
+    return StreamingResponse(
+        count_events(broadcaster),
+        media_type="text/event-stream",
+        # Stop intermediaries from caching or buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 
@@ -8,14 +9,173 @@ class Settings(BaseSettings):
     debug: bool = True
     port: int = 8000
 
+    # Production server (see gunicorn.conf.py and app/core/server.py).
+    # server_workers defaults to one uvicorn worker per CPU available to the
+    # container. "auto" picks uvloop and httptools when installed, as they are
+    # with uvicorn[standard].
+    server_workers: Optional[int] = None
+    server_loop: Literal["auto", "uvloop", "asyncio"] = "auto"
+    server_http: Literal["auto", "httptools", "h11"] = "auto"
+    # Idle keep-alive, longer than the frontend proxy's (4 s in Node's fetch),
+    # so the backend does not close a connection the proxy is about to reuse
+    server_keepalive: int = 15
+    # Workers silent for server_timeout seconds are restarted. On SIGTERM,
+    # workers get server_graceful_timeout seconds to finish requests and shut
+    # down, inside the 10 s Cloud Run allows before SIGKILL.
+    server_timeout: int = 30
+    server_graceful_timeout: int = 8
+    # Restart a worker after server_max_requests requests (0: never), plus a
+    # random jitter (None: up to a tenth more) so workers restart at different
+    # times. A restarted worker reloads the email index and starts with cold
+    # caches, so this is for bounding slow leaks, not a routine setting.
+    server_max_requests: int = 0
+    server_max_requests_jitter: Optional[int] = None
+    # Import the app once in the master before forking: workers share its
+    # memory pages and a broken import fails at boot instead of in every worker
+    server_preload: bool = True
+
     # Firebase
     firebase_project_id: Optional[str] = None
 
+    # Waitlist
+    # Where waitlist entries are stored. "memory" keeps them in each worker
+    # process and is meant for tests and load runs only.
+    storage_backend: Literal["firestore", "memory"] = "firestore"
+    # Shards in the waitlist counter document; each shard sustains roughly one
+    # write per second, so size this to the expected peak signup rate.
+    waitlist_counter_shards: int = 10
+    # How waitlist document IDs are chosen. "auto" uses Firestore auto IDs and a
+    # duplicate query per signup; "email" keys each document by a hash of the
+    # normalized email so a signup is a single create(). Switch to "email" only
+    # after running `python cli.py migrate-email-ids` on existing data.
+    waitlist_id_mode: Literal["auto", "email"] = "auto"
+    # Named waitlists at /api/waitlists/{list_id} (see app/services/waitlists.py).
+    # Only the IDs in waitlist_lists (JSON list in the environment) and those
+    # created with POST /api/admin/waitlists/{list_id} are accepted. Each
+    # worker keeps the services of up to waitlist_max_cached_lists lists.
+    waitlist_lists: List[str] = []
+    waitlist_max_cached_lists: int = 100
+    # Per-worker cache in front of Firestore reads (see app/services/cache.py)
+    waitlist_cache_enabled: bool = True
+    waitlist_count_cache_ttl: float = 5.0
+    waitlist_email_cache_size: int = 10_000
+    waitlist_email_cache_ttl: float = 600.0
+    waitlist_negative_cache_ttl: float = 5.0
+    # Write-behind signups (see app/services/write_behind.py): acknowledge once
+    # queued in the worker and write in batches of up to waitlist_batch_size
+    # (at most 499) every waitlist_flush_interval seconds. A full queue answers
+    # 503 to new signups. Duplicates are checked before answering, so this
+    # turns the email index on as well.
+    waitlist_write_behind: bool = False
+    waitlist_queue_max_size: int = 10_000
+    waitlist_batch_size: int = 400
+    waitlist_flush_interval: float = 0.25
+    # Idempotency-Key on POST /api/waitlist (see app/services/idempotency.py):
+    # each worker remembers up to idempotency_cache_size keys for
+    # idempotency_ttl seconds; older repeats are matched against the stored entry
+    idempotency_enabled: bool = True
+    idempotency_cache_size: int = 10_000
+    idempotency_ttl: float = 86_400.0
+    # In-memory email index (see app/services/email_index.py): a Bloom filter
+    # per worker, sized for email_index_capacity addresses at a false-positive
+    # rate of email_index_error_rate (about 1.8 MB per million at 0.001).
+    # get_email() of an address it has never seen skips the read, which is
+    # what lets write-behind check duplicates before acknowledging (it is on
+    # whenever waitlist_write_behind is). Direct signups save no read
+    # (create() checks for the duplicate itself), while every worker streams
+    # the whole collection at startup and listens for new entries, so it is
+    # otherwise off by default.
+    email_index_enabled: bool = False
+    email_index_capacity: int = 1_000_000
+    email_index_error_rate: float = 0.001
+    # Live count over Server-Sent Events (see app/services/count_stream.py).
+    # Each worker reloads the count at most every count_stream_min_interval
+    # seconds after a signup, and every count_stream_refresh_interval seconds
+    # regardless. Streams end after count_stream_max_duration seconds, inside
+    # Cloud Run's request timeout, and the browser reconnects. The reloads
+    # carry on for count_stream_idle_timeout seconds after the last stream
+    # closes, so reconnecting clients do not restart them.
+    count_stream_min_interval: float = 1.0
+    count_stream_refresh_interval: float = 30.0
+    count_stream_keepalive: float = 15.0
+    count_stream_max_duration: float = 25.0
+    count_stream_max_subscribers: int = 1_000
+    count_stream_idle_timeout: float = 60.0
+    # Cache-Control max-age, in seconds, on the cacheable GETs: the count,
+    # /health and /. Each also sends an ETag and answers If-None-Match with 304.
+    count_max_age: int = 5
+    health_max_age: int = 5
+    root_max_age: int = 300
+
+    # Rate limits on POST /api/waitlist (see app/core/rate_limit.py): a token
+    # bucket per client IP and per email domain. Buckets live in each worker
+    # unless rate_limit_redis_url is set, which shares them across workers.
+    # Refill rates must be positive; turn limits off with rate_limit_enabled.
+    rate_limit_enabled: bool = True
+    rate_limit_ip_burst: int = 10
+    rate_limit_ip_per_minute: float = Field(20, gt=0)
+    rate_limit_domain_burst: int = 300
+    rate_limit_domain_per_minute: float = Field(1200, gt=0)
+    rate_limit_max_keys: int = 100_000
+    rate_limit_redis_url: Optional[str] = None
+    # Take the client IP from X-Forwarded-For (only behind a proxy that sets it,
+    # such as the frontend's /api/proxy, which the container image trusts).
+    # The client is rate_limit_trusted_hops entries from the right: one per
+    # proxy appending to the header; entries further left are client-supplied.
+    rate_limit_trust_forwarded_for: bool = False
+    rate_limit_trusted_hops: int = 1
+    # Per client IP on /api/debug/*, whose checks read from storage
+    rate_limit_debug_burst: int = 5
+    rate_limit_debug_per_minute: float = Field(6, gt=0)
+
+    # Storage calls (see app/core/resilience.py): each attempt has a deadline;
+    # reads are retried with jittered backoff up to storage_max_attempts while
+    # the per-worker retry budget allows; storage_breaker_threshold transient
+    # failures in a row open the breaker, failing calls with 503 for
+    # storage_breaker_reset_timeout seconds before a trial call
+    storage_read_timeout: float = 2.0
+    storage_write_timeout: float = 5.0
+    storage_max_attempts: int = 3
+    storage_retry_budget: float = 10
+    storage_retry_ratio: float = 0.1
+    storage_breaker_threshold: int = 5
+    storage_breaker_reset_timeout: float = 10.0
+
+    # Readiness (see app/services/health.py): each worker pings storage every
+    # health_check_interval seconds and reports unready after
+    # health_failure_threshold failed pings in a row
+    health_check_interval: float = 10.0
+    health_check_timeout: float = 2.0
+    health_failure_threshold: int = 3
+
+    # Logging (see app/core/logs.py). "json" writes Cloud Logging structured
+    # entries; "text" is easier to read locally. Successful requests are logged
+    # at the sample rate of their route (log_sample_default if not listed);
+    # 4xx/5xx responses are always logged.
+    log_level: str = "INFO"
+    log_format: Literal["text", "json"] = "text"
+    log_redact_emails: bool = True
+    log_sample_rates: Dict[str, float] = {
+        "/api/waitlist": 0.1,
+        "/api/waitlist/count": 0.01,
+        "/api/waitlists/{list_id}": 0.1,
+        "/api/waitlists/{list_id}/count": 0.01,
+        "/health": 0.0,
+        "/livez": 0.0,
+        "/readyz": 0.0,
+        "/metrics": 0.0,
+    }
+    log_sample_default: float = 1.0
+
     # Google API (not currently used)
     google_client_id: Optional[str] = None
     google_client_secret: Optional[str] = None
     google_redirect_uri: str = "http://localhost:8000/auth/callback"
 
+    # Admin API: bearer token required by /api/admin/* and /api/debug/*
+    # (disabled when unset)
+    admin_api_key: Optional[str] = None
+
     # Security (not currently used)
     secret_key: Optional[str] = None
     algorithm: str = "HS256"
@@ -28,10 +188,16 @@ class Settings(BaseSettings):
     monitoring_enabled: bool = True
     alert_webhook_url: Optional[str] = None
 
-    # Mailgun (not currently used)
+    # Mailgun confirmation emails (see app/services/notifications.py)
     mailgun_api_key: Optional[str] = None
     mailgun_domain: Optional[str] = None
     mailgun_from_email: str = "noreply@example.com"
+    mailgun_base_url: str = "https://api.mailgun.net/v3"
+    # Run the background sender in each worker; one at a time holds the lease
+    notifications_enabled: bool = False
+    notification_batch_size: int = 500
+    notification_poll_interval: float = 10.0
+    notification_max_retries: int = 4
 
     class Config:
         env_file = ".env"
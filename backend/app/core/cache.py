@@ -0,0 +1,141 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.metrics import CACHE_LOOKUPS
+
+_MISSING = object()
+
+
+class CacheStats:
+    """Hit/miss counters for one cache, also exported as metrics when named."""
+
+    __slots__ = ("hits", "misses", "_hit_metric", "_miss_metric")
+
+    def __init__(self, name: Optional[str] = None):
+        self.hits = 0
+        self.misses = 0
+        self._hit_metric = CACHE_LOOKUPS.labels(name, "hit") if name else None
+        self._miss_metric = CACHE_LOOKUPS.labels(name, "miss") if name else None
+
+    def record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+            if self._hit_metric is not None:
+                self._hit_metric.inc()
+        else:
+            self.misses += 1
+            if self._miss_metric is not None:
+                self._miss_metric.inc()
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+class LRUCache:
+    """Bounded LRU mapping whose entries expire after a TTL.
+
+    Not thread-safe; meant to be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        name: Optional[str] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats(name)
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return ``(hit, value)``, refreshing the key's LRU position on a hit."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self._clock():
+                self._entries.move_to_end(key)
+                self.stats.record(True)
+                return True, value
+            del self._entries[key]
+        self.stats.record(False)
+        return False, None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        hit, value = self.lookup(key)
+        return value if hit else default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class TTLValue:
+    """A single cached value that expires after a TTL.
+
+    ``get_or_load`` lets only one caller reload an expired value; concurrent
+    callers wait for that load instead of issuing their own.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        name: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.stats = CacheStats(name)
+        self._clock = clock
+        self._value: Any = _MISSING
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return self._value is not _MISSING and self._expires_at > self._clock()
+
+    def set(self, value: Any) -> None:
+        self._value = value
+        self._expires_at = self._clock() + self.ttl
+
+    def update(self, fn: Callable[[Any], Any]) -> None:
+        """Apply ``fn`` to the value if it is fresh, keeping its expiry."""
+        if self._fresh():
+            self._value = fn(self._value)
+
+    def invalidate(self) -> None:
+        self._value = _MISSING
+
+    async def get_or_load(self, loader: Callable[[], Awaitable[Any]]) -> Any:
+        if self._fresh():
+            self.stats.record(True)
+            return self._value
+
+        async with self._lock:
+            # Another caller may have reloaded while we waited for the lock
+            if self._fresh():
+                self.stats.record(True)
+                return self._value
+            self.stats.record(False)
+            self.set(await loader())
+            return self._value
@@ -0,0 +1,76 @@
+import time
+from typing import Callable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Failure counter that trips after ``failure_threshold`` failures in a row.
+
+    ``closed`` lets calls through. ``open`` rejects them until
+    ``reset_timeout`` seconds have passed since the trip, then moves to
+    ``half_open``. In that state one trial call is let through: a success
+    closes the breaker and a failure opens it again for another
+    ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if self._clock() - self._opened_at < self.reset_timeout:
+            return OPEN
+        return HALF_OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a trial call through."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._trial_running or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+        self._trial_running = False
+
+    def release_trial(self) -> None:
+        """Forget a trial call that ended without an outcome, e.g. cancelled."""
+        self._trial_running = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "retry_after": round(self.retry_after(), 3),
+        }
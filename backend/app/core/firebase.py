@@ -1,16 +1,21 @@
+import asyncio
 import logging
 import os
-from datetime import datetime
+import time
 from typing import Any, Dict, Optional
 
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials, firestore, firestore_async
+from google.cloud.firestore_v1 import AsyncClient
+
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 # Global Firebase app instance
 _firebase_app: Optional[firebase_admin.App] = None
 _firestore_client: Optional[firestore.Client] = None
+_async_firestore_client: Optional[AsyncClient] = None
 
 
 def get_firebase_app() -> firebase_admin.App:
@@ -62,19 +67,6 @@ def get_firestore_client() -> firestore.Client:
             # Note: database_id parameter is supported starting from firebase-admin 6.6.0
             _firestore_client = firestore.client(database_id=database_id)
 
-            # Test the connection by attempting to read from a collection
-            logger.debug("Testing Firestore connection...")
-            test_collection = _firestore_client.collection("_connection_test")
-            # This will fail if we don't have proper permissions, which is expected
-            try:
-                list(test_collection.limit(1).get())
-                logger.info("Firestore connection test successful")
-            except Exception as test_e:
-                # Connection test may fail due to permissions, but client creation succeeded
-                logger.debug(
-                    f"Firestore connection test failed (this may be normal): {str(test_e)}"
-                )
-
             logger.info("Firestore client initialized successfully")
 
         except Exception as e:
@@ -84,30 +76,109 @@ def get_firestore_client() -> firestore.Client:
     return _firestore_client
 
 
-def test_firestore_connection() -> Dict[str, Any]:
-    """Test Firestore connection and return status."""
-    try:
-        client = get_firestore_client()
+def get_async_firestore_client() -> AsyncClient:
+    """Get or initialize the async Firestore client.
+
+    The async client shares the Firebase app with the sync client but talks to
+    Firestore over a grpc.aio channel, so awaiting it yields the event loop
+    instead of blocking the worker.
+    """
+    global _async_firestore_client
+
+    if _async_firestore_client is None:
+        logger.info("Initializing async Firestore client...")
+
+        try:
+            get_firebase_app()
+
+            database_id = os.getenv("FIRESTORE_DATABASE_ID", "(default)")
+            logger.info(f"Using Firestore database (async): {database_id}")
 
-        # Try to write and read a test document
-        test_collection = client.collection("_health_check")
-        test_doc = {"timestamp": datetime.utcnow(), "test": True}
+            _async_firestore_client = firestore_async.client(database_id=database_id)
 
-        # Add test document
-        doc_ref = test_collection.add(test_doc)[1]
+            logger.info("Async Firestore client initialized successfully")
 
-        # Read it back
-        retrieved_doc = doc_ref.get()
+        except Exception as e:
+            logger.error(f"Failed to initialize async Firestore client: {str(e)}")
+            raise
+
+    return _async_firestore_client
+
+
+async def warm_up_firestore(client: Optional[AsyncClient] = None) -> AsyncClient:
+    """Initialize the Firebase app and async client and open the gRPC channel.
+
+    Called from the application lifespan so the credential lookup, channel
+    setup and first round-trip happen before the worker takes traffic. The
+    round-trip is bounded by ``settings.storage_write_timeout`` so an
+    unreachable Firestore cannot hold up startup indefinitely.
+    """
+    if client is None:
+        client = get_async_firestore_client()
+
+    logger.debug("Testing Firestore connection...")
+    try:
+        await asyncio.wait_for(
+            client.collection("_connection_test").limit(1).get(),
+            settings.storage_write_timeout,
+        )
+        logger.info("Firestore connection test successful")
+    except Exception as test_e:
+        # Connection test may fail due to permissions, but client creation succeeded
+        logger.debug(
+            f"Firestore connection test failed (this may be normal): {str(test_e)}"
+        )
+
+    return client
+
+
+async def close_firestore_clients() -> None:
+    """Close the Firestore gRPC channels and release the Firebase app."""
+    global _firebase_app, _firestore_client, _async_firestore_client
+
+    if _async_firestore_client is not None:
+        api = getattr(_async_firestore_client, "_firestore_api_internal", None)
+        if api is not None:
+            await api.transport.close()
+        _async_firestore_client = None
+
+    if _firestore_client is not None:
+        api = getattr(_firestore_client, "_firestore_api_internal", None)
+        if api is not None:
+            api.transport.close()
+        _firestore_client = None
+
+    if _firebase_app is not None:
+        # firebase_admin caches clients per app, so drop the app as well to
+        # avoid handing out a closed client on the next initialization
+        firebase_admin.delete_app(_firebase_app)
+        _firebase_app = None
+
+    logger.info("Firestore clients closed")
+
+
+async def test_firestore_connection() -> Dict[str, Any]:
+    """Test Firestore connection and return status.
+
+    Reads a single document and writes nothing, so calling it repeatedly costs
+    one read each time and leaves no data behind. The read is abandoned after
+    ``settings.storage_read_timeout`` seconds.
+    """
+    try:
+        client = get_async_firestore_client()
 
-        # Clean up
-        doc_ref.delete()
+        started = time.perf_counter()
+        await asyncio.wait_for(
+            client.collection("_health_check").document("ping").get(),
+            settings.storage_read_timeout,
+        )
+        latency = time.perf_counter() - started
 
         return {
             "status": "healthy",
             "message": "Firestore connection successful",
             "can_read": True,
-            "can_write": True,
-            "document_id": doc_ref.id,
+            "latency_ms": round(latency * 1000, 1),
         }
 
     except Exception as e:
@@ -116,6 +187,5 @@ def test_firestore_connection() -> Dict[str, Any]:
             "status": "error",
             "message": f"Firestore connection failed: {str(e)}",
             "can_read": False,
-            "can_write": False,
             "error": str(e),
         }
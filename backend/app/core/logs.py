@@ -0,0 +1,224 @@
+"""Logging for the API: off the event loop, structured, sampled and redacted.
+
+``configure_logging`` puts a ``QueueHandler`` on the root logger, so a log
+call on the request path only appends the record to a queue. A
+``QueueListener`` thread then formats it, redacts email addresses and writes
+it to stdout. Records are queued unformatted, so message arguments are
+rendered in that thread rather than by the caller.
+
+With ``LOG_FORMAT=json`` each line is a Cloud Logging structured entry
+(``severity``, ``message``, ``time``, and ``httpRequest`` for request logs),
+so Cloud Run ingests it with the right severity and request fields.
+``RequestLogMiddleware`` writes one such line per request in place of
+gunicorn's access log. Successful requests are sampled per route
+(``LOG_SAMPLE_RATES``) and every 4xx/5xx is logged.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.core.metrics import route_template
+
+EMAIL_PATTERN = re.compile(
+    r"([A-Za-z0-9._%+-])[A-Za-z0-9._%+-]*@([A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+)"
+)
+
+# Record attributes set by the logging module itself; anything else on a
+# record came from ``extra=`` and is emitted as a JSON field
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def redact_emails(text: str) -> str:
+    """Mask every email address in ``text`` down to its first character."""
+    return EMAIL_PATTERN.sub(r"\1***@\2", text)
+
+
+class RedactingFormatter(logging.Formatter):
+    """Plain-text lines with email addresses masked."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        return redact_emails(text) if settings.log_redact_emails else text
+
+
+class CloudLoggingFormatter(logging.Formatter):
+    """One JSON object per line, in the Cloud Logging structured format."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+
+        entry: Dict[str, Any] = {
+            "severity": record.levelname,
+            "message": message,
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "logger": record.name,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        line = json.dumps(entry, default=str, ensure_ascii=False)
+        # Redact the whole line so fields passed in ``extra`` are covered too
+        return redact_emails(line) if settings.log_redact_emails else line
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to the current ``sys.stdout``, even if it was replaced later."""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value) -> None:
+        pass
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as they are, leaving the formatting to the listener.
+
+    Only tracebacks are rendered here, while the frames still exist.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _start_listener(handler: logging.Handler) -> None:
+    global _listener
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        log_queue, handler, respect_handler_level=True
+    )
+    _listener.start()
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if isinstance(existing, _DeferredQueueHandler):
+            root.removeHandler(existing)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+
+
+def stop_logging() -> None:
+    """Write out everything still queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging() -> None:
+    """Route all logging through the queue to stdout. Safe to call again."""
+    if _listener is not None:
+        return
+
+    handler = _StdoutHandler()
+    if settings.log_format == "json":
+        handler.setFormatter(CloudLoggingFormatter())
+    else:
+        handler.setFormatter(RedactingFormatter("%(levelname)s:%(name)s:%(message)s"))
+
+    root = logging.getLogger()
+    root.setLevel(settings.log_level.upper())
+    _start_listener(handler)
+    route_server_logs()
+
+    atexit.register(stop_logging)
+    # A worker forked from a process that already configured logging (gunicorn
+    # --preload) inherits the queue but not the listener thread
+    os.register_at_fork(after_in_child=lambda: _start_listener(handler))
+
+
+def route_server_logs() -> None:
+    """Send the server's own loggers through the same handler as the app.
+
+    The access log is turned off; RequestLogMiddleware replaces it.
+    """
+    for name in ("uvicorn", "uvicorn.error", "gunicorn.error"):
+        server_logger = logging.getLogger(name)
+        server_logger.handlers.clear()
+        server_logger.propagate = True
+    logging.getLogger("uvicorn.access").disabled = True
+
+
+def sample_rate(route: str) -> float:
+    return settings.log_sample_rates.get(route, settings.log_sample_default)
+
+
+class RequestLogMiddleware:
+    """Log one line per HTTP request, sampling the successful ones by route."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.logger = logging.getLogger("app.requests")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = route_template(scope)
+            rate = 1.0 if status >= 400 else sample_rate(route)
+            if rate >= 1.0 or random.random() < rate:
+                self._log(scope, route, status, time.perf_counter() - started, rate)
+
+    def _log(
+        self, scope: Scope, route: str, status: int, elapsed: float, rate: float
+    ) -> None:
+        client = scope.get("client")
+        level = logging.ERROR if status >= 500 else logging.INFO
+        self.logger.log(
+            level,
+            "%s %s %s %.1fms",
+            scope["method"],
+            scope["path"],
+            status,
+            elapsed * 1000,
+            extra={
+                "httpRequest": {
+                    "requestMethod": scope["method"],
+                    "requestUrl": scope["path"],
+                    "status": status,
+                    "latency": f"{elapsed:.6f}s",
+                    "remoteIp": client[0] if client else None,
+                },
+                "route": route,
+                "sampleRate": rate,
+            },
+        )
@@ -0,0 +1,168 @@
+"""Prometheus metrics for the API.
+
+Under gunicorn each worker is its own process, so when
+``PROMETHEUS_MULTIPROC_DIR`` is set every worker writes its samples to files
+in that directory and ``/metrics`` merges them, whichever worker serves the
+scrape. The directory must exist and be empty when the server starts, and
+``gunicorn.conf.py`` marks exited workers dead so their gauges drop out.
+"""
+
+import functools
+import os
+import time
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Signups and counts are single-digit milliseconds in memory and tens of
+# milliseconds against Firestore; the upper buckets catch retries and stalls
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve an HTTP request, by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+STORAGE_LATENCY = Histogram(
+    "waitlist_storage_duration_seconds",
+    "Time spent in a waitlist storage call",
+    ["backend", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "waitlist_cache_lookups_total",
+    "Waitlist cache lookups",
+    ["cache", "result"],
+)
+STORAGE_RETRIES = Counter(
+    "waitlist_storage_retries_total",
+    "Storage calls repeated after a transient failure",
+    ["backend", "operation"],
+)
+WRITE_BEHIND_QUEUED = Gauge(
+    "waitlist_write_behind_queued",
+    "Signups accepted but not yet written",
+    multiprocess_mode="livesum",
+)
+WRITE_BEHIND_DUPLICATES = Counter(
+    "waitlist_write_behind_duplicates_total",
+    "Acknowledged signups dropped at write time as already registered",
+)
+EMAIL_INDEX_ITEMS = Gauge(
+    "waitlist_email_index_items",
+    "Addresses in the email index",
+    multiprocess_mode="livemax",
+)
+EMAIL_INDEX_BYTES = Gauge(
+    "waitlist_email_index_bytes",
+    "Memory held by the email index's bit array",
+    multiprocess_mode="livemax",
+)
+RATE_LIMITED = Counter(
+    "http_rate_limited_total",
+    "Requests rejected by the rate limiter",
+    ["bucket"],
+)
+
+
+def timed(operation: str):
+    """Record an async repository method's duration in ``STORAGE_LATENCY``."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(self, *args, **kwargs)
+            finally:
+                STORAGE_LATENCY.labels(self.backend, operation).observe(
+                    time.perf_counter() - started
+                )
+
+        return wrapper
+
+    return decorator
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return the exposition body and its content type."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that handled the request, or "unmatched"."""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # Newer FastAPI versions report an included router's routes without the
+    # include prefix; recover it from the front of the request path
+    path = scope["path"]
+    if not route.path_regex.match(path):
+        for i in range(1, len(path)):
+            if path[i] == "/" and route.path_regex.match(path[i:]):
+                return path[:i] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Observe every HTTP request in ``REQUEST_LATENCY``.
+
+    Requests are labelled with the matched route's path template rather than
+    the raw path, so path parameters and unknown URLs cannot inflate label
+    cardinality.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(
+                scope["method"], route_template(scope), str(status)
+            ).observe(time.perf_counter() - started)
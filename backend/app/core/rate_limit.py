@@ -0,0 +1,303 @@
+import json
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.core.cache import LRUCache
+from app.core.metrics import RATE_LIMITED
+
+logger = logging.getLogger(__name__)
+
+# Request bodies larger than this are passed through without a domain check,
+# and without being read past it; a signup body is well under it
+MAX_INSPECTED_BODY = 4096
+
+# Token bucket in one atomic step: refill from elapsed time, then take a token.
+# Returns {allowed, seconds until a token is available}.
+_REDIS_TAKE = """
+local burst = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(retry)}
+"""
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Token bucket size and refill rate."""
+
+    burst: int
+    per_minute: float
+
+    def __post_init__(self):
+        if self.per_minute <= 0:
+            raise ValueError(f"Rate must refill, got {self.per_minute} per minute")
+
+    @property
+    def per_second(self) -> float:
+        return self.per_minute / 60
+
+
+class BucketStore(ABC):
+    """Where token buckets are kept."""
+
+    @abstractmethod
+    async def take(self, key: str, rate: Rate) -> Tuple[bool, float]:
+        """Take one token from ``key``'s bucket.
+
+        Returns:
+            Whether a token was available, and if not, the seconds until one is
+        """
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBucketStore(BucketStore):
+    """Buckets in a bounded per-process LRU.
+
+    A bucket expires once it would have refilled completely, so idle keys
+    cost nothing, and the least recently used keys are evicted beyond
+    ``max_keys``; an evicted bucket starts again full.
+    """
+
+    def __init__(
+        self,
+        max_keys: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self._buckets = LRUCache(
+            max_keys or settings.rate_limit_max_keys, ttl=0, clock=clock
+        )
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, key: str, rate: Rate) -> Tuple[bool, float]:
+        now = self._clock()
+        tokens, updated_at = self._buckets.get(key, (rate.burst, now))
+        tokens = min(rate.burst, tokens + (now - updated_at) * rate.per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets.set(
+            key, (tokens, now), ttl=(rate.burst - tokens) / rate.per_second
+        )
+        return allowed, 0.0 if allowed else (1 - tokens) / rate.per_second
+
+
+class RedisBucketStore(BucketStore):
+    """Buckets in Redis, shared by every worker and instance.
+
+    Needs the optional ``redis`` package (``uv sync --extra redis``). If Redis
+    is unreachable the request is let through, so an outage of the limiter
+    never blocks signups.
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._take = self._redis.register_script(_REDIS_TAKE)
+
+    async def take(self, key: str, rate: Rate) -> Tuple[bool, float]:
+        try:
+            allowed, retry_after = await self._take(
+                keys=[f"ratelimit:{key}"], args=[rate.burst, rate.per_second]
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit store unavailable, allowing request: {str(e)}")
+            return True, 0.0
+        return bool(allowed), float(retry_after)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class RateLimiter:
+    """Token buckets per client IP and per email domain, plus a stricter
+    per-IP bucket for the debug endpoints."""
+
+    def __init__(
+        self,
+        store: BucketStore,
+        ip_rate: Optional[Rate] = None,
+        domain_rate: Optional[Rate] = None,
+        debug_rate: Optional[Rate] = None,
+    ):
+        self.store = store
+        self.ip_rate = ip_rate or Rate(
+            settings.rate_limit_ip_burst, settings.rate_limit_ip_per_minute
+        )
+        self.domain_rate = domain_rate or Rate(
+            settings.rate_limit_domain_burst, settings.rate_limit_domain_per_minute
+        )
+        self.debug_rate = debug_rate or Rate(
+            settings.rate_limit_debug_burst, settings.rate_limit_debug_per_minute
+        )
+        self.rejected = 0
+
+    async def _take(self, bucket: str, key: str, rate: Rate) -> Optional[float]:
+        allowed, retry_after = await self.store.take(f"{bucket}:{key}", rate)
+        if allowed:
+            return None
+        self.rejected += 1
+        RATE_LIMITED.labels(bucket).inc()
+        return retry_after
+
+    async def check_ip(self, ip: str) -> Optional[float]:
+        """Return None if allowed, else the seconds to wait before retrying."""
+        return await self._take("ip", ip, self.ip_rate)
+
+    async def check_domain(self, domain: str) -> Optional[float]:
+        return await self._take("domain", domain, self.domain_rate)
+
+    async def check_debug(self, ip: str) -> Optional[float]:
+        return await self._take("debug", ip, self.debug_rate)
+
+    async def close(self) -> None:
+        await self.store.close()
+
+
+def create_rate_limiter() -> RateLimiter:
+    """Build the limiter from settings: Redis if configured, else in-process."""
+    if settings.rate_limit_redis_url:
+        store: BucketStore = RedisBucketStore(settings.rate_limit_redis_url)
+    else:
+        store = MemoryBucketStore()
+    return RateLimiter(store)
+
+
+def client_ip(scope: Scope) -> str:
+    """Client address, from ``X-Forwarded-For`` when behind a trusted proxy.
+
+    Each proxy appends the address it received the request from, so the
+    client is ``rate_limit_trusted_hops`` entries from the right; anything
+    further left was sent by the client and could be anything.
+    """
+    if settings.rate_limit_trust_forwarded_for:
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                hops = [hop.strip() for hop in value.decode("latin-1").split(",")]
+                hops = [hop for hop in hops if hop]
+                if hops:
+                    return hops[-min(len(hops), settings.rate_limit_trusted_hops)]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _email_domain(body: bytes) -> Optional[str]:
+    if len(body) > MAX_INSPECTED_BODY:
+        return None
+    try:
+        email = json.loads(body).get("email")
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(email, str) or "@" not in email:
+        return None
+    return email.rsplit("@", 1)[1].strip().lower() or None
+
+
+class RateLimitMiddleware:
+    """Reject over-limit ``POST``s to ``paths``, or to a path under one of
+    ``prefixes``, with 429 before routing.
+
+    Uses the ``RateLimiter`` in ``app.state.rate_limiter`` (built in the
+    lifespan) and does nothing when there is none. The IP bucket is checked
+    first, so a client over its limit is turned away without its body even
+    being read; the body is then read once to find the email domain and
+    replayed to the route. Reading stops past ``MAX_INSPECTED_BODY``: what was
+    read is replayed and the rest streams to the route unread.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        paths: Tuple[str, ...] = ("/api/waitlist",),
+        prefixes: Tuple[str, ...] = ("/api/waitlists/",),
+    ):
+        self.app = app
+        self.paths = paths
+        self.prefixes = prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not (
+                scope["path"] in self.paths or scope["path"].startswith(self.prefixes)
+            )
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = getattr(scope["app"].state, "rate_limiter", None)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = await limiter.check_ip(client_ip(scope))
+        if retry_after is not None:
+            await self._reject(retry_after, scope, receive, send)
+            return
+
+        body = b""
+        more_body = True
+        while more_body and len(body) <= MAX_INSPECTED_BODY:
+            message = await receive()
+            if message["type"] != "http.request":
+                return  # client disconnected
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        domain = None if more_body else _email_domain(body)
+        if domain is not None:
+            retry_after = await limiter.check_domain(domain)
+            if retry_after is not None:
+                await self._reject(retry_after, scope, receive, send)
+                return
+
+        replayed = False
+
+        async def replay() -> Message:
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": more_body}
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+    @staticmethod
+    async def _reject(
+        retry_after: float, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        response = JSONResponse(
+            {"detail": "Too many requests. Please try again later."},
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
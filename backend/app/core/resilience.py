@@ -0,0 +1,177 @@
+"""Deadlines, retries and a circuit breaker around storage calls.
+
+A ``StorageGuard`` wraps each call to one storage backend:
+
+- every attempt runs under a deadline, so a stalled RPC ends the request
+  instead of holding a worker until the client gives up;
+- reads that fail with a transient error are retried after a jittered
+  backoff, as long as the process-wide ``RetryBudget`` allows it, so a
+  degraded backend is not hit with several times its normal load;
+- transient failures feed a ``CircuitBreaker``. Once it opens, calls fail at
+  once with ``StorageUnavailableError`` (answered as 503 with
+  ``Retry-After``) until a trial call succeeds.
+"""
+
+import asyncio
+import functools
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+from app.config import settings
+from app.core.circuit import CircuitBreaker
+from app.core.metrics import STORAGE_RETRIES
+from app.repositories.base import StorageUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of successful calls.
+
+    Each failure takes a token and each success gives back ``ratio`` of one,
+    up to ``max_tokens``. Retries are allowed while more than half the
+    tokens are left, so while most calls fail retries stop and the load on
+    the backend stays close to the incoming request rate.
+    """
+
+    def __init__(self, max_tokens: float, ratio: float):
+        self.max_tokens = max_tokens
+        self.ratio = ratio
+        self.tokens = max_tokens
+
+    def allow_retry(self) -> bool:
+        return self.tokens > self.max_tokens / 2
+
+    def record_success(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def record_failure(self) -> None:
+        self.tokens = max(0.0, self.tokens - 1)
+
+
+def backoff(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter delay before retry number ``attempt`` (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class StorageGuard:
+    """Apply deadlines, retries and a circuit breaker to one backend's calls.
+
+    Only exceptions in ``transient`` (plus ``asyncio.TimeoutError`` from a
+    missed deadline) count as failures. Any other exception means the
+    backend answered, such as a duplicate address, and is passed through as
+    a success for the breaker.
+    """
+
+    def __init__(
+        self,
+        transient: Tuple[Type[BaseException], ...] = (),
+        read_timeout: Optional[float] = None,
+        write_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        budget: Optional[RetryBudget] = None,
+        backoff_base: float = 0.05,
+        backoff_cap: float = 1.0,
+    ):
+        self.transient = (asyncio.TimeoutError, *transient)
+        self.read_timeout = read_timeout or settings.storage_read_timeout
+        self.write_timeout = write_timeout or settings.storage_write_timeout
+        self.max_attempts = max_attempts or settings.storage_max_attempts
+        self.breaker = breaker or CircuitBreaker(
+            settings.storage_breaker_threshold,
+            reset_timeout=settings.storage_breaker_reset_timeout,
+        )
+        self.budget = budget or RetryBudget(
+            settings.storage_retry_budget, settings.storage_retry_ratio
+        )
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    def _unavailable(self, message: str) -> StorageUnavailableError:
+        return StorageUnavailableError(
+            message, retry_after=max(1.0, self.breaker.retry_after())
+        )
+
+    async def call(
+        self,
+        backend: str,
+        operation: str,
+        fn: Callable[[], Awaitable[Any]],
+        retry: bool,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Run ``fn`` under a deadline, repeating it on failure if ``retry``.
+
+        The deadline defaults to the read timeout for retried calls and the
+        write timeout otherwise.
+
+        Raises:
+            StorageUnavailableError: If the breaker is open or the call kept
+                failing with transient errors
+        """
+        if timeout is None:
+            timeout = self.read_timeout if retry else self.write_timeout
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise self._unavailable(f"Storage unavailable, {operation} not tried")
+            attempt += 1
+            try:
+                result = await asyncio.wait_for(fn(), timeout)
+            except self.transient as e:
+                self.breaker.record_failure()
+                self.budget.record_failure()
+                error = f"{type(e).__name__}: {str(e)}"
+                if (
+                    not retry
+                    or attempt >= self.max_attempts
+                    or not self.budget.allow_retry()
+                ):
+                    logger.warning(
+                        "Storage %s failed after %d attempt(s): %s",
+                        operation,
+                        attempt,
+                        error,
+                    )
+                    raise self._unavailable(f"Storage {operation} failed: {error}")
+                STORAGE_RETRIES.labels(backend, operation).inc()
+                await asyncio.sleep(
+                    backoff(attempt, self.backoff_base, self.backoff_cap)
+                )
+            except asyncio.CancelledError:
+                # The caller went away; the outcome says nothing about storage
+                self.breaker.release_trial()
+                raise
+            except Exception:
+                # The backend answered; the error is the caller's to handle
+                self.breaker.record_success()
+                self.budget.record_success()
+                raise
+            else:
+                self.breaker.record_success()
+                self.budget.record_success()
+                return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.breaker.stats(), "retry_tokens": round(self.budget.tokens, 2)}
+
+
+def guarded(operation: str, retry: bool = False):
+    """Run an async repository method through ``self.guard``.
+
+    ``retry=True`` marks the call as safe to repeat (a read) and gives it the
+    read deadline; other calls get the write deadline and a single attempt.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            return await self.guard.call(
+                self.backend, operation, lambda: fn(self, *args, **kwargs), retry
+            )
+
+        return wrapper
+
+    return decorator
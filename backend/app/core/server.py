@@ -0,0 +1,114 @@
+"""Worker model for the production server (see ``gunicorn.conf.py``).
+
+Gunicorn runs ``server_workers`` processes, one per available CPU unless set,
+each serving the app with uvicorn through ``UvicornWorker``. The worker
+resolves ``server_loop`` and ``server_http`` once, so ``"auto"`` means uvloop
+and httptools when they are installed (``uvicorn[standard]`` brings both) and
+the choice is logged instead of guessed at.
+"""
+
+import math
+import os
+import signal
+import sys
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Optional
+
+from uvicorn.workers import UvicornWorker as _UvicornWorker
+
+from app.config import settings
+from app.core.logs import route_server_logs
+
+# Cgroup v2 CPU limit of the container ("<quota> <period>", or "max <period>")
+CPU_MAX_PATH = Path("/sys/fs/cgroup/cpu.max")
+
+# Seconds of server_graceful_timeout kept for the lifespan shutdown (flushing
+# write-behind, closing the storage client) after in-flight requests end
+SHUTDOWN_RESERVE = 3
+
+
+def available_cpus(cpu_max_path: Path = CPU_MAX_PATH) -> int:
+    """CPUs this process may run on, within the container's CPU limit."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = cpu_max_path.read_text().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def worker_count() -> int:
+    return settings.server_workers or available_cpus()
+
+
+def max_requests_jitter() -> int:
+    if settings.server_max_requests_jitter is not None:
+        return settings.server_max_requests_jitter
+    return settings.server_max_requests // 10
+
+
+def resolve_loop(loop: Optional[str] = None) -> str:
+    """``server_loop`` with ``"auto"`` replaced by the loop uvicorn would pick."""
+    loop = loop or settings.server_loop
+    if loop == "auto":
+        return "uvloop" if find_spec("uvloop") else "asyncio"
+    return loop
+
+
+def resolve_http(http: Optional[str] = None) -> str:
+    """``server_http`` with ``"auto"`` replaced by the parser uvicorn would pick."""
+    http = http or settings.server_http
+    if http == "auto":
+        return "httptools" if find_spec("httptools") else "h11"
+    return http
+
+
+def preload_storage() -> None:
+    """Import the Firestore repository in the master when preloading.
+
+    ``app.repositories`` imports it, and with it grpc and the Google client
+    libraries, on first use, which is after the fork: each worker would load
+    its own copy. Only the modules are imported; no client or channel is
+    created, as gRPC channels must not cross a fork.
+    """
+    if settings.server_preload and settings.storage_backend == "firestore":
+        import app.repositories.firestore  # noqa: F401
+
+
+class UvicornWorker(_UvicornWorker):
+    """Uvicorn worker configured from ``Settings``.
+
+    Besides the event loop and HTTP parser, it bounds how long shutdown waits
+    for in-flight requests, which uvicorn's own worker leaves unbounded: the
+    gunicorn master kills workers ``server_graceful_timeout`` seconds after
+    SIGTERM, and the lifespan shutdown must have run by then.
+
+    A worker shut down by a signal exits normally, so the logs still queued
+    are written out; uvicorn re-raises the signal, which with the default
+    handler would kill the process before ``atexit`` runs. uvicorn's logs stay
+    on the app's handler, which uvicorn's worker would swap for gunicorn's
+    when the app was preloaded (see ``app/core/logs.py``).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.CONFIG_KWARGS = {"loop": resolve_loop(), "http": resolve_http()}
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(
+            1, self.cfg.graceful_timeout - SHUTDOWN_RESERVE
+        )
+        if self.cfg.preload_app:
+            route_server_logs()
+
+    def init_signals(self) -> None:
+        super().init_signals()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._exit)
+
+    def _exit(self, sig: int, frame: Any) -> None:
+        sys.exit(0)
@@ -0,0 +1,37 @@
+from app.config import settings
+from app.repositories.base import (
+    DuplicateEmailError,
+    StorageUnavailableError,
+    TooManyListsError,
+    WaitlistRepository,
+)
+from app.repositories.memory import InMemoryWaitlistRepository
+
+__all__ = [
+    "DuplicateEmailError",
+    "FirestoreWaitlistRepository",
+    "InMemoryWaitlistRepository",
+    "StorageUnavailableError",
+    "TooManyListsError",
+    "WaitlistRepository",
+    "create_repository",
+]
+
+
+def __getattr__(name: str):
+    # The Google client libraries take a large share of the app's import time,
+    # so the Firestore repository is only imported once something asks for it
+    if name == "FirestoreWaitlistRepository":
+        from app.repositories.firestore import FirestoreWaitlistRepository
+
+        return FirestoreWaitlistRepository
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_repository() -> WaitlistRepository:
+    """Build the waitlist repository selected by ``settings.storage_backend``."""
+    if settings.storage_backend == "memory":
+        return InMemoryWaitlistRepository()
+    from app.repositories.firestore import FirestoreWaitlistRepository
+
+    return FirestoreWaitlistRepository()
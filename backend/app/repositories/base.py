@@ -0,0 +1,295 @@
+import base64
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+# Position in the newest-first ordering of entries: (created_at, entry ID).
+# The ID breaks ties between equal timestamps so a cursor is always unique.
+Cursor = Tuple[datetime, str]
+
+# Entries fetched per page while streaming an export
+EXPORT_PAGE_SIZE = 1000
+# Firestore caps a batched write at 500 operations
+MAX_BATCH_WRITES = 500
+
+# Stored fields of an entry, besides its ID
+ENTRY_FIELDS = (
+    "email",
+    "created_at",
+    "source",
+    "notified",
+    "notified_at",
+    "ip_address",
+    "user_agent",
+    "idempotency_key",
+)
+# Named waitlists (``/api/waitlists/{list_id}``). The default list keeps the
+# ``waitlist`` collection; every other list is the ``entries`` subcollection of
+# ``waitlists/{list_id}``, so one set of composite indexes serves all of them.
+DEFAULT_LIST_ID = "default"
+LISTS_COLLECTION = "waitlists"
+LIST_ENTRIES_COLLECTION = "entries"
+LIST_ID_PATTERN = r"^[a-z0-9][a-z0-9-]{0,62}$"
+
+# Fields a listing can filter on by equality. Firestore needs a composite
+# index for each combination (see ``composite_indexes`` in firestore.py).
+FILTER_FIELDS = ("source", "notified")
+
+
+def collection_path(list_id: str = DEFAULT_LIST_ID) -> str:
+    """Path of the collection holding the entries of ``list_id``."""
+    if list_id == DEFAULT_LIST_ID:
+        return WaitlistRepository.COLLECTION_NAME
+    return f"{LISTS_COLLECTION}/{list_id}/{LIST_ENTRIES_COLLECTION}"
+
+
+@dataclass(frozen=True)
+class EntryFilter:
+    """Conditions on the entries a listing returns; ``None`` means any.
+
+    ``created_from`` is inclusive and ``created_to`` exclusive.
+    """
+
+    source: Optional[str] = None
+    notified: Optional[bool] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    def equalities(self) -> Dict[str, Any]:
+        """The equality conditions, by field."""
+        return {
+            field: getattr(self, field)
+            for field in FILTER_FIELDS
+            if getattr(self, field) is not None
+        }
+
+    def matches(self, entry: Dict[str, Any]) -> bool:
+        created_at = entry.get("created_at")
+        if self.created_from is not None and not (
+            created_at is not None and created_at >= self.created_from
+        ):
+            return False
+        if self.created_to is not None and not (
+            created_at is not None and created_at < self.created_to
+        ):
+            return False
+        return all(
+            entry.get(field) == value for field, value in self.equalities().items()
+        )
+
+
+def project(entry: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Keep only the entry's ID and ``fields`` (all fields if None)."""
+    if fields is None:
+        return entry
+    return {"id": entry["id"], **{f: entry[f] for f in fields if f in entry}}
+
+
+class DuplicateEmailError(ValueError):
+    """Raised when an email is already on the waitlist."""
+
+
+class TooManyListsError(ValueError):
+    """Raised when a backend cannot hold another named waitlist."""
+
+
+class StorageUnavailableError(Exception):
+    """Raised when storage is failing and the caller should try again later.
+
+    ``retry_after`` is the suggested wait in seconds, sent to clients as the
+    ``Retry-After`` header of a 503.
+    """
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def normalize_email(email: str) -> str:
+    return email.lower().strip()
+
+
+def encode_page_token(cursor: Cursor) -> str:
+    """Serialize a cursor into an opaque, URL-safe page token."""
+    created_at, entry_id = cursor
+    payload = {"c": created_at.isoformat(), "i": entry_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token: str) -> Cursor:
+    """Parse a page token back into a cursor.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        return datetime.fromisoformat(payload["c"]), str(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid page token") from e
+
+
+class WaitlistRepository(ABC):
+    """Storage for waitlist entries.
+
+    Entries are plain dicts as built by ``AsyncWaitlistService.new_entry``;
+    entries returned by a repository also carry their ``id``. Emails passed in
+    are already normalized. Implementations must make ``create`` atomic with
+    respect to the duplicate check, since concurrent signups for the same
+    address are expected.
+    """
+
+    backend: str
+    COLLECTION_NAME = "waitlist"
+    list_id: str = DEFAULT_LIST_ID
+
+    async def warm_up(self) -> None:
+        """Open connections before the worker takes traffic."""
+
+    async def ping(self) -> None:
+        """Make the cheapest round-trip to storage; raises if it is unreachable.
+
+        Must not write, and must cost the same however many entries there are.
+        """
+
+    def describe(self) -> Dict[str, Any]:
+        """Backend details reported by the debug endpoint."""
+        return {
+            "backend": self.backend,
+            "list_id": self.list_id,
+            "collection": collection_path(self.list_id),
+        }
+
+    def for_list(self, list_id: str) -> "WaitlistRepository":
+        """Repository of the named waitlist ``list_id``, in the same storage
+        and sharing this repository's connection."""
+        raise NotImplementedError(f"{self.backend} storage has no named waitlists")
+
+    async def create_list(self, list_id: str) -> bool:
+        """Register the named waitlist ``list_id``.
+
+        Returns:
+            False if it was registered already
+        """
+        raise NotImplementedError(f"{self.backend} storage has no named waitlists")
+
+    async def list_exists(self, list_id: str) -> bool:
+        """Whether ``list_id`` was registered with ``create_list``."""
+        return False
+
+    async def list_ids(self) -> List[str]:
+        """IDs of the named waitlists registered with ``create_list``."""
+        return []
+
+    @abstractmethod
+    async def create(self, entry: Dict[str, Any]) -> str:
+        """Store a new entry and return its ID.
+
+        Raises:
+            DuplicateEmailError: If the entry's email is already stored
+        """
+
+    @abstractmethod
+    async def create_many(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store the entries whose emails are not stored yet.
+
+        Returns:
+            The entries that were created, with their IDs
+        """
+
+    @abstractmethod
+    async def get(self, email: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for an email, or None."""
+
+    @abstractmethod
+    async def existing(self, emails: List[str]) -> Set[str]:
+        """Return the subset of ``emails`` already stored."""
+
+    @abstractmethod
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[Cursor] = None,
+        filters: Optional[EntryFilter] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+        """Return up to ``limit`` entries after ``cursor``, newest first.
+
+        Args:
+            limit: Maximum number of entries
+            cursor: Position to resume after, from the previous page
+            filters: Only return entries matching these conditions
+            fields: Only return these fields (plus ``id``); all if None.
+                ``created_at`` is always read, since the cursor needs it.
+
+        Returns:
+            The entries and the cursor of the next page, or None after the
+            last page
+        """
+
+    @abstractmethod
+    def stream(
+        self, page_size: int = EXPORT_PAGE_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every entry, newest first, ``page_size`` entries at a time."""
+
+    async def stream_emails(
+        self, page_size: int = EXPORT_PAGE_SIZE
+    ) -> AsyncIterator[str]:
+        """Yield the email of every entry, reading no other field if possible."""
+        async for entry in self.stream(page_size):
+            yield entry["email"]
+
+    def watch_emails(self, since: datetime, callback: Callable[[str], None]):
+        """Call ``callback`` with the email of each entry created from ``since``
+        on, as other processes store them.
+
+        ``callback`` may run on another thread. Returns a handle whose
+        ``unsubscribe()`` stops the calls, or None when no other process
+        writes to this storage.
+        """
+        return None
+
+    @abstractmethod
+    async def count(self) -> int:
+        """Return the number of entries."""
+
+    @abstractmethod
+    async def rebuild_counter(self) -> int:
+        """Recompute any stored count from the entries and return it."""
+
+    @abstractmethod
+    async def list_unnotified(self, limit: int) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` entries that have not been emailed yet."""
+
+    @abstractmethod
+    async def mark_notified(
+        self, entry_ids: List[str], error: Optional[str] = None
+    ) -> None:
+        """Set ``notified`` on the given entries.
+
+        With ``error``, the entries could not be emailed: they are kept in
+        ``notification_error`` and leave the queue all the same.
+        """
+
+    @abstractmethod
+    async def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Take or renew the named lease for ``ttl`` seconds.
+
+        Returns False while another owner holds an unexpired lease, so a job
+        run by every worker process only does its work in one of them.
+        """
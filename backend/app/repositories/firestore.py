@@ -0,0 +1,666 @@
+import hashlib
+import itertools
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from google.api_core import exceptions as gcp_exceptions
+from google.cloud.firestore_v1 import (
+    AsyncClient,
+    AsyncTransaction,
+    Client,
+    Increment,
+    async_transactional,
+)
+
+from app.config import settings
+from app.core.firebase import (
+    get_async_firestore_client,
+    get_firestore_client,
+    warm_up_firestore,
+)
+from app.core.metrics import STORAGE_LATENCY, timed
+from app.core.resilience import StorageGuard, guarded
+from app.repositories.base import (
+    DEFAULT_LIST_ID,
+    EXPORT_PAGE_SIZE,
+    FILTER_FIELDS,
+    LIST_ENTRIES_COLLECTION,
+    LISTS_COLLECTION,
+    MAX_BATCH_WRITES,
+    Cursor,
+    DuplicateEmailError,
+    EntryFilter,
+    WaitlistRepository,
+    collection_path,
+    normalize_email,
+    project,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Firestore limits an "in" filter to 30 values
+IN_QUERY_LIMIT = 30
+
+# Order of every listing: newest first; the document ID breaks ties between
+# equal timestamps so a cursor always identifies a unique position
+LISTING_ORDER = (("created_at", "DESCENDING"), ("__name__", "DESCENDING"))
+
+# Errors after which the same call may succeed: they are retried (reads only)
+# and counted by the circuit breaker. Anything else, such as AlreadyExists or
+# PermissionDenied, is an answer from Firestore and passed to the caller.
+TRANSIENT_ERRORS = (
+    gcp_exceptions.ServiceUnavailable,
+    gcp_exceptions.DeadlineExceeded,
+    gcp_exceptions.InternalServerError,
+    gcp_exceptions.ResourceExhausted,
+)
+
+
+def composite_indexes(
+    collection: str = WaitlistRepository.COLLECTION_NAME,
+) -> List[Dict[str, Any]]:
+    """Composite indexes the listing queries need, as in firestore.indexes.json.
+
+    Equality filters on any combination of ``FILTER_FIELDS`` followed by
+    ``LISTING_ORDER`` need one each. A ``created_at`` range is on the first
+    ordered field, so it needs no index of its own, and the trailing
+    ``__name__`` order is implied by the index.
+    """
+    order = [
+        {"fieldPath": field, "order": direction}
+        for field, direction in LISTING_ORDER
+        if field != "__name__"
+    ]
+    return [
+        {
+            "collectionGroup": collection,
+            "queryScope": "COLLECTION",
+            "fields": [
+                *({"fieldPath": field, "order": "ASCENDING"} for field in combination),
+                *order,
+            ],
+        }
+        for size in range(1, len(FILTER_FIELDS) + 1)
+        for combination in itertools.combinations(sorted(FILTER_FIELDS), size)
+    ]
+
+
+def indexes_document() -> Dict[str, Any]:
+    """Contents of firestore.indexes.json (``python cli.py firestore-indexes``):
+    the indexes of the default list's collection and of the ``entries``
+    subcollections that hold the named lists."""
+    return {
+        "indexes": [
+            *composite_indexes(),
+            *composite_indexes(LIST_ENTRIES_COLLECTION),
+        ],
+        "fieldOverrides": [],
+    }
+
+
+def email_document_id(email: str) -> str:
+    """Document ID of an email-keyed entry: SHA-256 of the normalized address."""
+    return hashlib.sha256(normalize_email(email).encode("utf-8")).hexdigest()
+
+
+def _cursor(doc) -> Cursor:
+    return doc.to_dict()["created_at"], doc.id
+
+
+def _start_after(cursor: Cursor) -> Dict[str, Any]:
+    """Cursor values for ``start_after`` matching ``_ordered_query``."""
+    created_at, doc_id = cursor
+    return {"created_at": created_at, "__name__": doc_id}
+
+
+def _created_at_sort_key(doc) -> tuple:
+    # Entries without a timestamp sort last
+    created_at = (doc.to_dict() or {}).get("created_at")
+    return (created_at is None, created_at or 0)
+
+
+@async_transactional
+async def _create_entry(
+    transaction: AsyncTransaction, collection, doc_ref, shard_ref, entry_data
+) -> None:
+    """Create a waitlist entry and bump one counter shard atomically."""
+    email = entry_data["email"]
+    with STORAGE_LATENCY.labels("firestore", "create.duplicate_query").time():
+        existing = (
+            await collection.where("email", "==", email)
+            .limit(1)
+            .get(transaction=transaction)
+        )
+    if len(existing) > 0:
+        logger.warning("Email %s already exists in waitlist", email)
+        raise DuplicateEmailError("Email already registered")
+
+    transaction.create(doc_ref, entry_data)
+    transaction.set(shard_ref, {"count": Increment(1)}, merge=True)
+
+
+@async_transactional
+async def _reset_counter(
+    transaction: AsyncTransaction, collection, counter_ref, num_shards: int
+) -> int:
+    """Recount the collection and overwrite the counter shards with the total."""
+    shards = counter_ref.collection("shards")
+    existing_shards = await shards.get(transaction=transaction)
+    result = await collection.count().get(transaction=transaction)
+    total = result[0][0].value
+
+    for snapshot in existing_shards:
+        if int(snapshot.id) >= num_shards:
+            transaction.delete(snapshot.reference)
+    for shard in range(num_shards):
+        transaction.set(
+            shards.document(str(shard)), {"count": total if shard == 0 else 0}
+        )
+    transaction.set(
+        counter_ref, {"num_shards": num_shards, "rebuilt_at": datetime.utcnow()}
+    )
+    return total
+
+
+@async_transactional
+async def _take_lease(
+    transaction: AsyncTransaction, lease_ref, owner: str, ttl: float
+) -> bool:
+    """Take the lease document unless another owner holds an unexpired lease."""
+    snapshot = await lease_ref.get(transaction=transaction)
+    now = datetime.now(timezone.utc)
+    lease = snapshot.to_dict() if snapshot.exists else None
+    if lease and lease.get("owner") != owner and lease["expires_at"] > now:
+        return False
+    transaction.set(
+        lease_ref, {"owner": owner, "expires_at": now + timedelta(seconds=ttl)}
+    )
+    return True
+
+
+class FirestoreWaitlistRepository(WaitlistRepository):
+    """Waitlist entries in a Firestore collection, through the async client.
+
+    ``list_id`` picks the waitlist (see ``collection_path``); named lists come
+    from ``for_list``, which shares the client and the guard.
+
+    The entry count is kept in a sharded counter at
+    ``counters/{counter_id}/shards/{n}``, incremented in the same
+    transaction that creates the entry. Until the counter has been seeded with
+    ``rebuild_counter`` the count falls back to a server-side aggregation query.
+
+    With ``id_mode="email"`` each entry's document ID is ``email_document_id``
+    of its address, so a signup is one batched ``create()`` that Firestore
+    rejects if the address is already registered, with no duplicate query.
+
+    Request-path calls go through a ``StorageGuard`` (``guard``): each has a
+    deadline, reads are retried on transient errors, and while Firestore keeps
+    failing they raise ``StorageUnavailableError`` without reaching it. The
+    export stream and the maintenance operations are not guarded.
+    """
+
+    backend = "firestore"
+    COUNTER_COLLECTION = "counters"
+    LEASE_COLLECTION = "leases"
+
+    def __init__(
+        self,
+        client: Optional[AsyncClient] = None,
+        num_shards: Optional[int] = None,
+        id_mode: Optional[str] = None,
+        guard: Optional[StorageGuard] = None,
+        watch_client: Optional[Client] = None,
+        list_id: str = DEFAULT_LIST_ID,
+    ):
+        self.db = client if client is not None else get_async_firestore_client()
+        # Listeners need the synchronous client; created on first use
+        self._watch_client = watch_client
+        self.list_id = list_id
+        self.collection = self.db.collection(collection_path(list_id))
+        self.num_shards = num_shards or settings.waitlist_counter_shards
+        self.email_keyed = (id_mode or settings.waitlist_id_mode) == "email"
+        self.counter_ref = self.db.collection(self.COUNTER_COLLECTION).document(
+            self.counter_id
+        )
+        self.guard = guard or StorageGuard(TRANSIENT_ERRORS)
+        self._counter_ready = False
+
+    @property
+    def counter_id(self) -> str:
+        if self.list_id == DEFAULT_LIST_ID:
+            return self.COLLECTION_NAME
+        return f"{self.COLLECTION_NAME}-{self.list_id}"
+
+    def for_list(self, list_id: str) -> "FirestoreWaitlistRepository":
+        return FirestoreWaitlistRepository(
+            client=self.db,
+            num_shards=self.num_shards,
+            id_mode="email" if self.email_keyed else "auto",
+            guard=self.guard,
+            watch_client=self._watch_client,
+            list_id=list_id,
+        )
+
+    def _list_ref(self, list_id: str):
+        # The parent document of the list's entries subcollection
+        return self.db.collection(LISTS_COLLECTION).document(list_id)
+
+    @timed("create_list")
+    @guarded("create_list")
+    async def create_list(self, list_id: str) -> bool:
+        batch = self.db.batch()
+        batch.create(self._list_ref(list_id), {"created_at": datetime.utcnow()})
+        try:
+            await batch.commit()
+        except gcp_exceptions.AlreadyExists:
+            return False
+        return True
+
+    @timed("list_exists")
+    @guarded("list_exists", retry=True)
+    async def list_exists(self, list_id: str) -> bool:
+        return (await self._list_ref(list_id).get()).exists
+
+    @timed("list_ids")
+    @guarded("list_ids", retry=True)
+    async def list_ids(self) -> List[str]:
+        docs = await self.db.collection(LISTS_COLLECTION).select([]).get()
+        return [doc.id for doc in docs]
+
+    async def warm_up(self) -> None:
+        await warm_up_firestore(self.db)
+
+    @timed("ping")
+    async def ping(self) -> None:
+        # One document read, whether or not the counter exists. It goes through
+        # the guard unretried, so while the breaker is half-open the health
+        # monitor's ping can be the trial call that closes it again.
+        await self.guard.call(
+            self.backend,
+            "ping",
+            self.counter_ref.get,
+            retry=False,
+            timeout=self.guard.read_timeout,
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            **super().describe(),
+            "id_mode": "email" if self.email_keyed else "auto",
+            "num_shards": self.num_shards,
+            "guard": self.guard.stats(),
+        }
+
+    def document_for(self, email: str):
+        """Reference for a new entry: email-keyed, or a fresh auto ID."""
+        if self.email_keyed:
+            return self.collection.document(email_document_id(email))
+        return self.collection.document()
+
+    def random_shard(self):
+        return self.counter_ref.collection("shards").document(
+            str(random.randrange(self.num_shards))
+        )
+
+    @timed("create")
+    @guarded("create")
+    async def create(self, entry: Dict[str, Any]) -> str:
+        if self.email_keyed:
+            doc_ref = await self._create_email_keyed(entry)
+        else:
+            # Check for a duplicate, add the entry and count it in one transaction
+            doc_ref = self.collection.document()
+            await _create_entry(
+                self.db.transaction(),
+                self.collection,
+                doc_ref,
+                self.random_shard(),
+                entry,
+            )
+        return doc_ref.id
+
+    async def _create_email_keyed(self, entry_data: Dict[str, Any]):
+        """Create an email-keyed entry and bump a counter shard in one batch.
+
+        The batch is atomic, so when ``create()`` fails because the document
+        exists the counter is left untouched as well.
+        """
+        email = entry_data["email"]
+        doc_ref = self.document_for(email)
+        batch = self.db.batch()
+        batch.create(doc_ref, entry_data)
+        batch.set(self.random_shard(), {"count": Increment(1)}, merge=True)
+        try:
+            await batch.commit()
+        except gcp_exceptions.AlreadyExists:
+            logger.warning("Email %s already exists in waitlist", email)
+            raise DuplicateEmailError("Email already registered")
+        return doc_ref
+
+    @timed("create_many")
+    async def create_many(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create entries in ``WriteBatch``es of at most ``MAX_BATCH_WRITES``.
+
+        Each batch holds the new entries and one counter-shard increment for
+        all of them.
+        """
+        created = []
+        step = MAX_BATCH_WRITES - 1
+        for start in range(0, len(entries), step):
+            chunk = entries[start : start + step]
+            existing = await self.existing([entry["email"] for entry in chunk])
+            new = [entry for entry in chunk if entry["email"] not in existing]
+            try:
+                created.extend(await self._write_batch(new))
+            except gcp_exceptions.AlreadyExists:
+                # A signup raced this batch for one of its addresses, which
+                # failed as a whole; look again and write the rest
+                existing = await self.existing([entry["email"] for entry in new])
+                new = [entry for entry in new if entry["email"] not in existing]
+                created.extend(await self._write_batch(new))
+        return created
+
+    @guarded("create_many")
+    async def _write_batch(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not entries:
+            return []
+        batch = self.db.batch()
+        created = []
+        for entry in entries:
+            doc_ref = self.document_for(entry["email"])
+            if self.email_keyed:
+                batch.create(doc_ref, entry)
+            else:
+                batch.set(doc_ref, entry)
+            created.append({"id": doc_ref.id, **entry})
+        batch.set(self.random_shard(), {"count": Increment(len(entries))}, merge=True)
+        await batch.commit()
+        return created
+
+    @timed("get")
+    @guarded("get", retry=True)
+    async def get(self, email: str) -> Optional[Dict[str, Any]]:
+        if self.email_keyed:
+            doc = await self.collection.document(email_document_id(email)).get()
+            return {"id": doc.id, **doc.to_dict()} if doc.exists else None
+
+        docs = await self.collection.where("email", "==", email).limit(1).get()
+
+        for doc in docs:
+            return {"id": doc.id, **doc.to_dict()}
+
+        return None
+
+    @timed("existing")
+    @guarded("existing", retry=True)
+    async def existing(self, emails: List[str]) -> Set[str]:
+        """Look addresses up in bulk: ``get_all`` on email-keyed IDs, or ``in``
+        queries for auto IDs."""
+        found: Set[str] = set()
+        if not emails:
+            return found
+
+        if self.email_keyed:
+            by_id = {email_document_id(email): email for email in emails}
+            refs = [self.collection.document(doc_id) for doc_id in by_id]
+            async for snapshot in self.db.get_all(refs, field_paths=["email"]):
+                if snapshot.exists:
+                    found.add(by_id[snapshot.id])
+        else:
+            for start in range(0, len(emails), IN_QUERY_LIMIT):
+                chunk = emails[start : start + IN_QUERY_LIMIT]
+                docs = await self.collection.where("email", "in", chunk).get()
+                found.update(doc.to_dict()["email"] for doc in docs)
+        return found
+
+    def _ordered_query(self):
+        query = self.collection
+        for field, direction in LISTING_ORDER:
+            query = query.order_by(field, direction=direction)
+        return query
+
+    def _listing_query(
+        self,
+        filters: Optional[EntryFilter] = None,
+        fields: Optional[Sequence[str]] = None,
+    ):
+        """``_ordered_query`` narrowed by ``filters`` and projected to ``fields``.
+
+        Each combination of equality filters is served by one of
+        ``composite_indexes``; tests/test_indexes.py checks the two agree.
+        """
+        query = self._ordered_query()
+        if filters is not None:
+            for field, value in filters.equalities().items():
+                query = query.where(field, "==", value)
+            if filters.created_from is not None:
+                query = query.where("created_at", ">=", filters.created_from)
+            if filters.created_to is not None:
+                query = query.where("created_at", "<", filters.created_to)
+        if fields is not None:
+            # The cursor is built from created_at, so it is always fetched
+            query = query.select(sorted({*fields, "created_at"}))
+        return query
+
+    @timed("list_page")
+    @guarded("list_page", retry=True)
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[Cursor] = None,
+        filters: Optional[EntryFilter] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+        """Pages are fetched with ``start_after`` on the last entry of the
+        previous page, so Firestore never reads (or bills) the entries before it.
+        Filters run server-side and ``fields`` becomes a ``select()``, so only
+        matching entries and the requested fields are transferred.
+        """
+        query = self._listing_query(filters, fields)
+        if cursor is not None:
+            query = query.start_after(_start_after(cursor))
+
+        docs = await query.limit(limit).get()
+        next_cursor = _cursor(docs[-1]) if len(docs) == limit else None
+        entries = [project({"id": doc.id, **doc.to_dict()}, fields) for doc in docs]
+        return entries, next_cursor
+
+    async def stream(
+        self, page_size: int = EXPORT_PAGE_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Each page is a ``stream()`` query resumed from the previous page's
+        last document, which keeps individual RPCs short on large collections.
+        """
+        cursor = None
+        while True:
+            query = self._ordered_query().limit(page_size)
+            if cursor is not None:
+                query = query.start_after(_start_after(cursor))
+
+            fetched = 0
+            async for doc in query.stream():
+                fetched += 1
+                cursor = _cursor(doc)
+                yield {"id": doc.id, **doc.to_dict()}
+
+            if fetched < page_size:
+                return
+
+    async def stream_emails(
+        self, page_size: int = EXPORT_PAGE_SIZE
+    ) -> AsyncIterator[str]:
+        """Pages select only ``email`` and run in document ID order, which
+        needs no index, each resumed after the previous page's last document.
+        """
+        last_id = None
+        while True:
+            query = self.collection.select(["email"]).order_by("__name__")
+            if last_id is not None:
+                query = query.start_after({"__name__": last_id})
+
+            fetched = 0
+            async for doc in query.limit(page_size).stream():
+                fetched += 1
+                last_id = doc.id
+                email = (doc.to_dict() or {}).get("email")
+                if email:
+                    yield email
+
+            if fetched < page_size:
+                return
+
+    def watch_emails(self, since: datetime, callback: Callable[[str], None]):
+        """Listen with ``on_snapshot`` to entries with ``created_at >= since``.
+
+        The async client has no listeners, so this uses the synchronous one;
+        Firestore calls ``callback`` on its watch thread. The initial snapshot
+        holds only the entries created since ``since``.
+        """
+        client = self._watch_client
+        if client is None:
+            client = self._watch_client = get_firestore_client()
+        query = client.collection(collection_path(self.list_id)).where(
+            "created_at", ">=", since
+        )
+
+        def on_snapshot(docs, changes, read_time):
+            for change in changes:
+                if change.type.name == "ADDED":
+                    email = (change.document.to_dict() or {}).get("email")
+                    if email:
+                        callback(email)
+
+        return query.on_snapshot(on_snapshot)
+
+    @timed("count")
+    @guarded("count", retry=True)
+    async def count(self) -> int:
+        """Sum the counter shards, a constant number of reads regardless of
+        list size. Falls back to an aggregation query while the counter is
+        unseeded."""
+        if not self._counter_ready:
+            counter = await self.counter_ref.get()
+            self._counter_ready = counter.exists
+
+        if self._counter_ready:
+            shards = await self.counter_ref.collection("shards").get()
+            return sum((shard.to_dict() or {}).get("count", 0) for shard in shards)
+
+        logger.info("Waitlist counter not seeded, using aggregation count")
+        result = await self.collection.count().get()
+        return result[0][0].value
+
+    @timed("rebuild_counter")
+    async def rebuild_counter(self) -> int:
+        """Seed or repair the sharded counter from the collection.
+
+        Run once after deploying to an existing collection, or whenever the
+        counter is suspected to have drifted.
+        """
+        total = await _reset_counter(
+            self.db.transaction(), self.collection, self.counter_ref, self.num_shards
+        )
+        self._counter_ready = True
+        logger.info(f"Rebuilt waitlist counter with total {total}")
+        return total
+
+    @timed("list_unnotified")
+    @guarded("list_unnotified", retry=True)
+    async def list_unnotified(self, limit: int) -> List[Dict[str, Any]]:
+        docs = await self.collection.where("notified", "==", False).limit(limit).get()
+        return [{"id": doc.id, **doc.to_dict()} for doc in docs]
+
+    @timed("mark_notified")
+    @guarded("mark_notified")
+    async def mark_notified(
+        self, entry_ids: List[str], error: Optional[str] = None
+    ) -> None:
+        """Update the entries in batches of up to ``MAX_BATCH_WRITES``."""
+        fields = {"notified": True, "notified_at": datetime.utcnow()}
+        if error is not None:
+            fields["notification_error"] = error
+        for start in range(0, len(entry_ids), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for entry_id in entry_ids[start : start + MAX_BATCH_WRITES]:
+                batch.update(self.collection.document(entry_id), fields)
+            await batch.commit()
+
+    @timed("acquire_lease")
+    @guarded("acquire_lease")
+    async def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        lease_ref = self.db.collection(self.LEASE_COLLECTION).document(name)
+        return await _take_lease(self.db.transaction(), lease_ref, owner, ttl)
+
+    async def migrate_to_email_ids(self, dry_run: bool = False) -> Dict[str, int]:
+        """Rewrite auto-ID entries as email-keyed documents.
+
+        Entries are grouped by normalized email; the earliest entry of each
+        group is copied to its ``email_document_id`` and every auto-ID document
+        is deleted, which also folds existing duplicates into one entry. An
+        email that already has its keyed document keeps it. Writes are
+        committed in batches of up to ``MAX_BATCH_WRITES`` and the counter is
+        rebuilt at the end. Safe to re-run.
+        """
+        groups: Dict[str, List[Any]] = {}
+        async for doc in self.collection.stream():
+            data = doc.to_dict() or {}
+            email = normalize_email(data.get("email", ""))
+            if email:
+                groups.setdefault(email, []).append(doc)
+
+        stats = {"scanned": 0, "migrated": 0, "already_keyed": 0, "duplicates": 0}
+        batch = self.db.batch()
+        pending = 0
+
+        for email, docs in groups.items():
+            stats["scanned"] += len(docs)
+            target_id = email_document_id(email)
+            keyed = [doc for doc in docs if doc.id == target_id]
+            legacy = [doc for doc in docs if doc.id != target_id]
+            if not legacy:
+                stats["already_keyed"] += 1
+                continue
+
+            # Keep all writes for one email in the same batch
+            writes = len(legacy) + (0 if keyed else 1)
+            if pending + writes > MAX_BATCH_WRITES:
+                if not dry_run:
+                    await batch.commit()
+                batch = self.db.batch()
+                pending = 0
+
+            if keyed:
+                stats["already_keyed"] += 1
+                stats["duplicates"] += len(legacy)
+            else:
+                stats["migrated"] += 1
+                stats["duplicates"] += len(legacy) - 1
+                earliest = min(legacy, key=_created_at_sort_key)
+                data = {**earliest.to_dict(), "email": email}
+                batch.set(self.collection.document(target_id), data)
+
+            for doc in legacy:
+                batch.delete(doc.reference)
+            pending += writes
+
+        if pending and not dry_run:
+            await batch.commit()
+
+        if not dry_run:
+            await self.rebuild_counter()
+
+        logger.info(f"Email-keyed migration {'(dry run) ' if dry_run else ''}{stats}")
+        return stats
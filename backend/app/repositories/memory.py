@@ -0,0 +1,180 @@
+import bisect
+import itertools
+import secrets
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.repositories.base import (
+    DEFAULT_LIST_ID,
+    EXPORT_PAGE_SIZE,
+    Cursor,
+    DuplicateEmailError,
+    EntryFilter,
+    TooManyListsError,
+    WaitlistRepository,
+    project,
+)
+
+
+class InMemoryWaitlistRepository(WaitlistRepository):
+    """Waitlist entries held in process memory, for tests and load runs.
+
+    These indexes are kept in step with every write:
+
+    - ``_by_email``: hash index from normalized email to entry, so duplicate
+      checks and lookups are O(1).
+    - ``_order``: ``(created_at, id)`` keys sorted ascending, so a page is a
+      bisect plus a slice. Signups arrive in timestamp order, so inserts land
+      at the end of the list.
+    - ``_unnotified``: IDs of entries not emailed yet, in insertion order.
+
+    Nothing is persisted and each worker process has its own data. Named
+    lists (``for_list``) are separate instances kept for the life of the
+    process, at most ``MAX_LISTS`` of them. No method
+    awaits between reading and updating the indexes, so calls are atomic on
+    the event loop without a lock.
+    """
+
+    backend = "memory"
+    MAX_LISTS = 1000
+
+    def __init__(self, list_id: str = DEFAULT_LIST_ID):
+        self.list_id = list_id
+        self._lists: Dict[str, "InMemoryWaitlistRepository"] = {}
+        self._by_email: Dict[str, Dict[str, Any]] = {}
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._order: List[Cursor] = []
+        self._unnotified: Dict[str, None] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+
+    def describe(self) -> Dict[str, Any]:
+        return {**super().describe(), "entries": len(self._by_id)}
+
+    def for_list(self, list_id: str) -> "InMemoryWaitlistRepository":
+        if list_id == self.list_id:
+            return self
+        repository = self._lists.get(list_id)
+        if repository is None:
+            if len(self._lists) >= self.MAX_LISTS:
+                raise TooManyListsError(f"At most {self.MAX_LISTS} named waitlists")
+            repository = self._lists[list_id] = InMemoryWaitlistRepository(list_id)
+        return repository
+
+    async def create_list(self, list_id: str) -> bool:
+        if list_id in self._lists:
+            return False
+        self.for_list(list_id)
+        return True
+
+    async def list_exists(self, list_id: str) -> bool:
+        return list_id in self._lists
+
+    async def list_ids(self) -> List[str]:
+        return sorted(self._lists)
+
+    def _insert(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        stored = {"id": entry.get("id") or secrets.token_hex(10), **entry}
+        self._by_email[stored["email"]] = stored
+        self._by_id[stored["id"]] = stored
+        bisect.insort(self._order, (stored["created_at"], stored["id"]))
+        if not stored.get("notified"):
+            self._unnotified[stored["id"]] = None
+        return dict(stored)
+
+    async def create(self, entry: Dict[str, Any]) -> str:
+        if entry["email"] in self._by_email:
+            raise DuplicateEmailError("Email already registered")
+        return self._insert(entry)["id"]
+
+    async def create_many(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            self._insert(entry)
+            for entry in entries
+            if entry["email"] not in self._by_email
+        ]
+
+    async def get(self, email: str) -> Optional[Dict[str, Any]]:
+        entry = self._by_email.get(email)
+        return dict(entry) if entry is not None else None
+
+    async def existing(self, emails: List[str]) -> Set[str]:
+        return {email for email in emails if email in self._by_email}
+
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[Cursor] = None,
+        filters: Optional[EntryFilter] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Cursor]]:
+        """The ``created_at`` range narrows the bisect; other filters are
+        checked entry by entry while walking back from its end."""
+        end = (
+            len(self._order)
+            if cursor is None
+            else bisect.bisect_left(self._order, cursor)
+        )
+        if filters is None:
+            keys = self._order[max(0, end - limit) : end][::-1]
+        else:
+            if filters.created_to is not None:
+                end = min(end, bisect.bisect_left(self._order, (filters.created_to,)))
+            start = (
+                0
+                if filters.created_from is None
+                else bisect.bisect_left(self._order, (filters.created_from,))
+            )
+            keys = []
+            for index in range(end - 1, start - 1, -1):
+                if len(keys) == limit:
+                    break
+                key = self._order[index]
+                if filters.matches(self._by_id[key[1]]):
+                    keys.append(key)
+        next_cursor = keys[-1] if len(keys) == limit else None
+        entries = [project(dict(self._by_id[entry_id]), fields) for _, entry_id in keys]
+        return entries, next_cursor
+
+    async def stream(
+        self, page_size: int = EXPORT_PAGE_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        cursor = None
+        while True:
+            entries, cursor = await self.list_page(page_size, cursor)
+            for entry in entries:
+                yield entry
+            if cursor is None:
+                return
+
+    async def count(self) -> int:
+        return len(self._by_id)
+
+    async def rebuild_counter(self) -> int:
+        return len(self._by_id)
+
+    async def list_unnotified(self, limit: int) -> List[Dict[str, Any]]:
+        return [
+            dict(self._by_id[entry_id])
+            for entry_id in itertools.islice(self._unnotified, limit)
+        ]
+
+    async def mark_notified(
+        self, entry_ids: List[str], error: Optional[str] = None
+    ) -> None:
+        fields = {"notified": True, "notified_at": datetime.utcnow()}
+        if error is not None:
+            fields["notification_error"] = error
+        for entry_id in entry_ids:
+            self._unnotified.pop(entry_id, None)
+            entry = self._by_id.get(entry_id)
+            if entry is not None:
+                entry.update(fields)
+
+    async def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.monotonic()
+        holder, expires_at = self._leases.get(name, (owner, now))
+        if holder != owner and expires_at > now:
+            return False
+        self._leases[name] = (owner, now + ttl)
+        return True
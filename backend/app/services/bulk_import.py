@@ -0,0 +1,183 @@
+import codecs
+import csv
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from operator import attrgetter
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+
+from app.repositories.base import MAX_BATCH_WRITES
+from app.schemas.waitlist import WaitlistEntry
+from app.services.waitlist import AsyncWaitlistService, normalize_email
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+@dataclass
+class RowOutcome:
+    """Result of importing one input row.
+
+    ``status`` is one of ``created``, ``exists`` (already on the waitlist),
+    ``duplicate`` (repeated earlier in the same input), ``invalid`` or
+    ``error``.
+    """
+
+    row: int
+    email: str
+    status: str
+    detail: Optional[str] = None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+class BulkImporter:
+    """Import waitlist addresses in batches.
+
+    Rows are parsed, validated, normalized and deduplicated as they stream
+    in. Every ``chunk_size`` unique addresses, those the cache does not
+    already know are handed to the repository's ``create_many``, which looks
+    existing entries up in bulk and writes the rest together. With Firestore
+    that is a single ``WriteBatch`` plus one counter-shard increment, so a
+    chunk is at most ``MAX_BATCH_WRITES`` operations.
+
+    With email-keyed IDs each entry is created in its own document, so an
+    address signing up during the import is stored once. With auto IDs the
+    look-up and the write are separate, and such an address can be stored
+    twice: import while signups are paused.
+    """
+
+    def __init__(
+        self,
+        service: AsyncWaitlistService,
+        source: str = "import",
+        chunk_size: int = MAX_BATCH_WRITES - 1,
+    ):
+        self.service = service
+        self.source = source
+        self.chunk_size = min(chunk_size, MAX_BATCH_WRITES - 1)
+        self.outcomes: List[RowOutcome] = []
+        self._seen: Set[str] = set()
+        self._pending: List[Tuple[int, str]] = []
+
+    async def run(self, lines: AsyncIterator[str], fmt: str = "csv") -> Dict[str, Any]:
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+
+        started = time.perf_counter()
+        email_column: Optional[int] = None
+        row = 0
+
+        async for line in lines:
+            row += 1
+            if not line.strip():
+                continue
+
+            if fmt == "csv":
+                cells = next(csv.reader([line]))
+                if email_column is None:
+                    header = [cell.strip().lower() for cell in cells]
+                    if "email" in header:
+                        email_column = header.index("email")
+                        continue
+                    email_column = 0
+                raw = cells[email_column] if email_column < len(cells) else ""
+            else:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    self._record(row, line.strip(), "invalid", f"Bad JSON: {e.msg}")
+                    continue
+                raw = record.get("email", "") if isinstance(record, dict) else record
+
+            self._accept(row, str(raw))
+            if len(self._pending) >= self.chunk_size:
+                await self._flush()
+
+        await self._flush()
+        return self.report(time.perf_counter() - started)
+
+    def _record(self, row: int, email: str, status: str, detail=None) -> None:
+        self.outcomes.append(RowOutcome(row, email, status, detail))
+
+    def _accept(self, row: int, raw: str) -> None:
+        try:
+            email = normalize_email(WaitlistEntry(email=raw.strip()).email)
+        except ValidationError:
+            self._record(row, raw.strip(), "invalid", "Invalid email address")
+            return
+
+        if email in self._seen:
+            self._record(row, email, "duplicate")
+            return
+        self._seen.add(email)
+        self._pending.append((row, email))
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        service = self.service
+        known = {
+            email
+            for _, email in pending
+            if service.cache is not None and service.cache.is_registered(email)
+        }
+        entries = [
+            service.new_entry(email, source=self.source)
+            for _, email in pending
+            if email not in known
+        ]
+        try:
+            created = await service.repository.create_many(entries)
+        except Exception as e:
+            logger.error(f"Bulk import batch failed: {str(e)}")
+            for row, email in pending:
+                self._record(row, email, "error", str(e))
+            return
+
+        if service.cache is not None:
+            for entry in created:
+                service.cache.record_signup(entry)
+        if service.email_index is not None:
+            for _, email in pending:
+                service.email_index.add(email)
+
+        created_emails = {entry["email"] for entry in created}
+        for row, email in pending:
+            self._record(row, email, "created" if email in created_emails else "exists")
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        counts = dict.fromkeys(
+            ("created", "exists", "duplicate", "invalid", "error"), 0
+        )
+        for outcome in self.outcomes:
+            counts[outcome.status] += 1
+        total = len(self.outcomes)
+        return {
+            "total_rows": total,
+            "counts": counts,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(total / elapsed, 1) if elapsed > 0 else None,
+            "rows": [
+                asdict(outcome)
+                for outcome in sorted(self.outcomes, key=attrgetter("row"))
+            ],
+        }
@@ -0,0 +1,91 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.cache import LRUCache, TTLValue
+
+# Stored for addresses known to be registered when the entry itself is unknown,
+# e.g. after a write was rejected as a duplicate
+_REGISTERED = object()
+
+
+class WaitlistCache:
+    """Per-worker cache in front of the waitlist's Firestore reads.
+
+    - ``count``: the entry count, reloaded at most once per TTL and bumped
+      locally on each successful signup in this worker.
+    - ``registered``: LRU of addresses known to be on the list. Entries are
+      never deleted from the waitlist, so a hit is authoritative and a repeat
+      signup is rejected without touching Firestore.
+    - ``missing``: short-lived negative cache of ``get_email`` lookups that
+      found nothing, so lookup bursts for the same address share one read.
+    """
+
+    def __init__(
+        self,
+        count_ttl: Optional[float] = None,
+        email_cache_size: Optional[int] = None,
+        email_ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+    ):
+        size = email_cache_size or settings.waitlist_email_cache_size
+        self.count = TTLValue(
+            settings.waitlist_count_cache_ttl if count_ttl is None else count_ttl,
+            name="count",
+        )
+        self.registered = LRUCache(
+            size,
+            settings.waitlist_email_cache_ttl if email_ttl is None else email_ttl,
+            name="registered_emails",
+        )
+        self.missing = LRUCache(
+            size,
+            (
+                settings.waitlist_negative_cache_ttl
+                if negative_ttl is None
+                else negative_ttl
+            ),
+            name="missing_emails",
+        )
+
+    def is_registered(self, email: str) -> bool:
+        hit, _ = self.registered.lookup(email)
+        return hit
+
+    def lookup(self, email: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Return ``(hit, entry)`` for a ``get_email`` call."""
+        hit, entry = self.registered.lookup(email)
+        if hit and entry is not _REGISTERED:
+            return True, entry
+        hit, _ = self.missing.lookup(email)
+        return (True, None) if hit else (False, None)
+
+    def remember(self, email: str, entry: Optional[Dict[str, Any]]) -> None:
+        if entry is None:
+            self.missing.set(email, None)
+        else:
+            self.registered.set(email, entry)
+
+    def mark_registered(self, email: str) -> None:
+        self.missing.pop(email)
+        self.registered.set(email, _REGISTERED)
+
+    def record_signup(self, entry: Dict[str, Any]) -> None:
+        self.missing.pop(entry["email"])
+        self.registered.set(entry["email"], entry)
+        self.count.update(lambda count: count + 1)
+
+    async def get_count(self, loader: Callable[[], Awaitable[int]]) -> int:
+        return await self.count.get_or_load(loader)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "count": self.count.stats.as_dict(),
+            "registered_emails": {
+                **self.registered.stats.as_dict(),
+                "size": len(self.registered),
+            },
+            "missing_emails": {
+                **self.missing.stats.as_dict(),
+                "size": len(self.missing),
+            },
+        }
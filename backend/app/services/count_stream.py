@@ -0,0 +1,218 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import orjson
+
+from app.config import settings
+from app.services.waitlist import AsyncWaitlistService
+
+logger = logging.getLogger(__name__)
+
+# Sent first on every stream: how long EventSource waits before reconnecting
+RETRY_EVENT = b"retry: 3000\n\n"
+KEEPALIVE_EVENT = b": keepalive\n\n"
+
+
+class TooManySubscribersError(Exception):
+    """Raised when a worker already streams the count to its maximum of clients."""
+
+
+class CountBroadcaster:
+    """Per-worker source of the live waitlist count for Server-Sent Events.
+
+    However many clients subscribe, one task per worker loads the count and
+    fans it out, so the storage load does not grow with the audience. The
+    task runs while someone is subscribed and for ``idle_timeout`` seconds
+    after the last one leaves, so clients reconnecting at the end of a
+    stream find the listener running and get the last count at once. It reloads after a signup,
+    at most once per ``min_interval`` however many signups arrive in it, and
+    every ``refresh_interval`` otherwise. Signups through this worker are
+    reported by the service (``on_signup``), and those through other workers
+    by a listener on new entries (``watch_emails``) where storage has one.
+
+    Each subscriber has a queue holding only the latest count: a client that
+    reads slowly skips intermediate values instead of buffering them.
+    """
+
+    def __init__(
+        self,
+        service: AsyncWaitlistService,
+        min_interval: Optional[float] = None,
+        refresh_interval: Optional[float] = None,
+        max_subscribers: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+    ):
+        self.service = service
+        self.min_interval = (
+            settings.count_stream_min_interval if min_interval is None else min_interval
+        )
+        self.refresh_interval = (
+            refresh_interval or settings.count_stream_refresh_interval
+        )
+        self.max_subscribers = max_subscribers or settings.count_stream_max_subscribers
+        self.idle_timeout = (
+            settings.count_stream_idle_timeout if idle_timeout is None else idle_timeout
+        )
+        self.count: Optional[int] = None
+        self.refreshes = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._idle: Optional[asyncio.TimerHandle] = None
+        self._watch = None
+        service.on_signup = self.changed
+
+    def changed(self) -> None:
+        """Note that the count has changed; the next refresh picks it up."""
+        self._changed.set()
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_subscribers
+
+    def subscribe(self) -> asyncio.Queue:
+        """Return a queue that receives the count now and on every change.
+
+        Raises:
+            TooManySubscribersError: If the worker has no room for another client
+        """
+        if self.full:
+            raise TooManySubscribersError("Too many live count subscribers")
+        queue = asyncio.Queue(maxsize=1)
+        if self.count is not None:
+            queue.put_nowait(self.count)
+        self._subscribers.add(queue)
+        self._cancel_idle()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None and self._idle is None:
+            self._idle = asyncio.get_running_loop().call_later(
+                self.idle_timeout, self._stop_idle
+            )
+
+    def _cancel_idle(self) -> None:
+        if self._idle is not None:
+            self._idle.cancel()
+            self._idle = None
+
+    def _stop_idle(self) -> None:
+        self._idle = None
+        if not self._subscribers and self._task is not None:
+            # Nobody is listening: stop reading storage until someone is. The
+            # last count is kept for the next subscriber until it is reloaded
+            self._task.cancel()
+            self._task = None
+
+    def _publish(self, count: int) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(count)
+
+    async def _refresh(self) -> None:
+        try:
+            # Cached counts only include this worker's signups, so read
+            # storage whenever a listener reports everyone's
+            count = await self.service.get_count(fresh=self._watch is not None)
+        except Exception as e:
+            logger.warning(f"Live count refresh failed: {str(e)}")
+            return
+        self.refreshes += 1
+        if count != self.count:
+            self.count = count
+            self._publish(count)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        watch = None
+        try:
+            # The listener may call back on another thread
+            watch = self.service.repository.watch_emails(
+                datetime.utcnow(), lambda email: loop.call_soon_threadsafe(self.changed)
+            )
+        except Exception as e:
+            logger.warning(f"Live count listener unavailable: {str(e)}")
+        self._watch = watch
+
+        try:
+            while True:
+                self._changed.clear()
+                await self._refresh()
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait(), timeout=self.refresh_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                # Let a burst of signups settle into one refresh
+                await asyncio.sleep(self.min_interval)
+        finally:
+            if watch is not None:
+                watch.unsubscribe()
+            if self._watch is watch:
+                self._watch = None
+
+    async def stop(self) -> None:
+        """Stop the refresh task; called from the application lifespan."""
+        self._subscribers.clear()
+        self._cancel_idle()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "count": self.count,
+            "refreshes": self.refreshes,
+            "running": self._task is not None,
+            "listening": self._watch is not None,
+        }
+
+
+async def count_events(
+    broadcaster: CountBroadcaster,
+    keepalive: Optional[float] = None,
+    max_duration: Optional[float] = None,
+) -> AsyncIterator[bytes]:
+    """Yield one client's Server-Sent Events stream of the count.
+
+    A ``count`` event carries ``{"count": n}``; a comment is sent after
+    ``keepalive`` seconds without one, so proxies keep the connection open.
+    The stream ends after ``max_duration`` seconds and the client reconnects.
+    The subscription is made here, so it is released however the stream ends.
+    """
+    keepalive = keepalive or settings.count_stream_keepalive
+    max_duration = max_duration or settings.count_stream_max_duration
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_duration
+    try:
+        queue = broadcaster.subscribe()
+    except TooManySubscribersError:
+        return
+    try:
+        yield RETRY_EVENT
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                count = await asyncio.wait_for(
+                    queue.get(), timeout=min(keepalive, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield KEEPALIVE_EVENT
+                continue
+            yield b"event: count\ndata: " + orjson.dumps({"count": count}) + b"\n\n"
+    finally:
+        broadcaster.unsubscribe(queue)
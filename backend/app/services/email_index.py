@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.core.bloom import BloomFilter
+from app.core.metrics import CACHE_LOOKUPS, EMAIL_INDEX_BYTES, EMAIL_INDEX_ITEMS
+from app.repositories.base import WaitlistRepository
+
+logger = logging.getLogger(__name__)
+
+# The listener starts this far before the load, so entries written while the
+# load runs, or stamped by a worker whose clock is behind, are not missed
+LISTENER_OVERLAP = timedelta(minutes=5)
+# The listener is restarted this often with a fresh start time, so the
+# entries it matches, which Firestore keeps watching, stay few
+LISTENER_REFRESH = timedelta(minutes=30)
+
+
+class EmailIndex:
+    """Per-worker Bloom filter of every registered email.
+
+    ``start`` loads it in the background by streaming only the ``email``
+    field, after subscribing to new entries (``watch_emails``) so signups
+    stored by other workers keep it current. Until the load has finished,
+    ``contains`` answers None and callers fall back to storage. The listener
+    is then replaced every ``LISTENER_REFRESH``, overlapping the old one by
+    ``LISTENER_OVERLAP``, rather than matching every entry since startup.
+
+    ``contains`` answering False means the address is definitely not
+    registered and needs no read. True means it probably is: the filter has
+    false positives at about ``error_rate``, so a True must be confirmed by a
+    read before it is reported as a duplicate.
+    """
+
+    def __init__(
+        self,
+        repository: WaitlistRepository,
+        capacity: Optional[int] = None,
+        error_rate: Optional[float] = None,
+    ):
+        self.repository = repository
+        self.filter = BloomFilter(
+            capacity or settings.email_index_capacity,
+            error_rate or settings.email_index_error_rate,
+        )
+        EMAIL_INDEX_BYTES.set(self.filter.size_bytes)
+        self.ready = False
+        self.load_seconds: Optional[float] = None
+        self._hit_metric = CACHE_LOOKUPS.labels("email_index", "hit")
+        self._miss_metric = CACHE_LOOKUPS.labels("email_index", "miss")
+        self._task: Optional[asyncio.Task] = None
+        self._watch = None
+
+    def contains(self, email: str) -> Optional[bool]:
+        """Whether ``email`` may be registered; None while loading."""
+        if not self.ready:
+            return None
+        if email in self.filter:
+            self._hit_metric.inc()
+            return True
+        self._miss_metric.inc()
+        return False
+
+    def add(self, email: str) -> None:
+        self.filter.add(email)
+        EMAIL_INDEX_ITEMS.set(len(self.filter))
+
+    def _subscribe(self) -> None:
+        """Listen to entries from ``LISTENER_OVERLAP`` ago on, dropping the
+        previous listener only once the new one is in place."""
+        loop = asyncio.get_running_loop()
+        since = datetime.utcnow() - LISTENER_OVERLAP
+        # The listener may call back on another thread
+        watch = self.repository.watch_emails(
+            since, lambda email: loop.call_soon_threadsafe(self.add, email)
+        )
+        self._unsubscribe()
+        self._watch = watch
+
+    async def load(self) -> None:
+        """Subscribe to new entries, then add every stored email."""
+        self._subscribe()
+
+        started = time.perf_counter()
+        async for email in self.repository.stream_emails():
+            self.filter.add(email)
+        EMAIL_INDEX_ITEMS.set(len(self.filter))
+        self.load_seconds = time.perf_counter() - started
+        self.ready = True
+        logger.info(
+            f"📇 Email index loaded {len(self.filter)} addresses in "
+            f"{self.load_seconds:.2f}s ({self.filter.size_bytes} bytes)"
+        )
+
+    async def _run(self) -> None:
+        try:
+            await self.load()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Without a complete index every lookup keeps going to storage
+            logger.error(f"Email index load failed, index disabled: {str(e)}")
+            self._unsubscribe()
+            return
+
+        while self._watch is not None:
+            await asyncio.sleep(LISTENER_REFRESH.total_seconds())
+            try:
+                self._subscribe()
+            except Exception as e:
+                logger.warning(
+                    f"Email index listener restart failed, keeping the old one: "
+                    f"{str(e)}"
+                )
+
+    def start(self) -> None:
+        """Load in the background; called from the application lifespan."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def _unsubscribe(self) -> None:
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._unsubscribe()
+        self.ready = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.filter.stats(),
+            "ready": self.ready,
+            "listening": self._watch is not None,
+            "load_seconds": (
+                round(self.load_seconds, 3) if self.load_seconds is not None else None
+            ),
+        }
@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict
+
+EXPORT_FIELDS = ("id", "email", "created_at", "source", "notified")
+# Rows joined into one response chunk, to avoid a socket write per row
+ROWS_PER_CHUNK = 200
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def export_chunks(
+    entries: AsyncIterator[Dict[str, Any]], fmt: str
+) -> AsyncIterator[str]:
+    """Serialize entries as CSV or NDJSON, a few hundred rows per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(EXPORT_FIELDS)
+
+    rows = 0
+    async for entry in entries:
+        values = [_value(entry.get(field)) for field in EXPORT_FIELDS]
+        if writer is not None:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(EXPORT_FIELDS, values))) + "\n")
+
+        rows += 1
+        if rows % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
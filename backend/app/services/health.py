@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.core.circuit import CLOSED, CircuitBreaker
+from app.repositories import WaitlistRepository
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Background storage ping whose cached result backs ``/readyz``.
+
+    Every ``interval`` seconds it calls ``repository.ping()`` (a single read
+    on Firestore) with a ``timeout``, and feeds the outcome to a
+    ``CircuitBreaker``. After ``failure_threshold`` failures in a row the
+    breaker opens and the worker reports unready until a ping succeeds again.
+    Probes only read the cached state, so a probe never reaches storage
+    however often it is called.
+    """
+
+    def __init__(
+        self,
+        repository: WaitlistRepository,
+        interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+        failure_threshold: Optional[int] = None,
+    ):
+        self.repository = repository
+        self.interval = interval or settings.health_check_interval
+        self.timeout = timeout or settings.health_check_timeout
+        self.breaker = CircuitBreaker(
+            failure_threshold or settings.health_failure_threshold,
+            reset_timeout=self.interval,
+        )
+        self.checked_at: Optional[datetime] = None
+        self.latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.breaker.state == CLOSED
+
+    async def check(self) -> bool:
+        """Ping storage once and record the outcome; returns ``healthy``."""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.repository.ping(), self.timeout)
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {str(e)}"
+            was_healthy = self.healthy
+            self.breaker.record_failure()
+            if was_healthy and not self.healthy:
+                logger.error(f"Storage unreachable, reporting unready: {str(e)}")
+        else:
+            if not self.healthy:
+                logger.info("Storage reachable again, reporting ready")
+            self.breaker.record_success()
+            self.last_error = None
+        self.latency = time.perf_counter() - started
+        self.checked_at = datetime.now(timezone.utc)
+        return self.healthy
+
+    async def _run(self) -> None:
+        # Warm-up has just reached storage, so the first ping waits an interval
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.breaker.stats(),
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "latency_ms": (
+                round(self.latency * 1000, 1) if self.latency is not None else None
+            ),
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,47 @@
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.core.cache import LRUCache
+
+
+class IdempotencyKeyReusedError(ValueError):
+    """Raised when an ``Idempotency-Key`` comes back with a different email."""
+
+
+class IdempotencyStore:
+    """Per-worker replay store for signups sent with an ``Idempotency-Key``.
+
+    Maps each key to the entry its signup created, in an LRU bounded to
+    ``max_size`` keys that expire after ``ttl`` seconds, so a retry answered
+    by the same worker needs no storage round-trip. The entry itself records
+    its key (``idempotency_key``), which is the persisted record: a retry
+    that reaches another worker, or arrives after the key expired here, is
+    matched against the stored entry when its write is rejected as a
+    duplicate.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[float] = None):
+        self.entries = LRUCache(
+            max_size or settings.idempotency_cache_size,
+            settings.idempotency_ttl if ttl is None else ttl,
+            name="idempotency_keys",
+        )
+
+    def lookup(self, key: str, email: str) -> Optional[Dict[str, Any]]:
+        """Return the entry created under ``key``, if this worker knows it.
+
+        Raises:
+            IdempotencyKeyReusedError: If the key was used for another email
+        """
+        entry = self.entries.get(key)
+        if entry is not None and entry["email"] != email:
+            raise IdempotencyKeyReusedError(
+                "Idempotency-Key was already used for a different request"
+            )
+        return entry
+
+    def remember(self, key: str, entry: Dict[str, Any]) -> None:
+        self.entries.set(key, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.entries.stats.as_dict(), "size": len(self.entries)}
@@ -0,0 +1,327 @@
+import asyncio
+import json
+import logging
+import os
+import secrets
+import socket
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.repositories import WaitlistRepository
+
+logger = logging.getLogger(__name__)
+
+# Mailgun accepts up to 1,000 recipients per batch message
+MAILGUN_MAX_RECIPIENTS = 1000
+# Lease held by the worker process currently sending confirmations. It is
+# renewed before every Mailgun send for that send's worst case plus
+# LEASE_MARGIN seconds, so it cannot lapse while a batch is being retried.
+LEASE_NAME = "waitlist-notifications"
+LEASE_MARGIN = 30.0
+# Deadline of one Mailgun request, and cap on the wait between attempts
+# (including a server's Retry-After), in seconds
+REQUEST_TIMEOUT = 15.0
+MAX_RETRY_DELAY = 30.0
+# Mailgun requests spent splitting a rejected batch to find the addresses it
+# refuses, per run
+MAX_SPLIT_SENDS = 32
+
+CONFIRMATION_SUBJECT = "You're on the waitlist!"
+CONFIRMATION_TEXT = (
+    "Thanks for joining the waitlist!\n\n"
+    "We'll write to %recipient.email% as soon as there's news."
+)
+
+
+class MailgunError(Exception):
+    """Raised when Mailgun does not accept a batch."""
+
+
+class MailgunRejectedError(MailgunError):
+    """Raised when Mailgun answers 400: something in the batch is invalid."""
+
+
+class LeaseLostError(Exception):
+    """Raised when another worker process took the notification lease."""
+
+
+class MailgunClient:
+    """Sends batch messages through the Mailgun HTTP API.
+
+    Uses one pooled ``httpx.AsyncClient`` for the life of the process. A batch
+    goes out as a single request with ``recipient-variables``, so each
+    recipient gets their own copy. Rate-limited (429), 5xx, timed-out and
+    transport failures are retried with exponential backoff; 4xx responses
+    are not. A 400 raises ``MailgunRejectedError``, as it usually means an
+    address Mailgun refuses; other 4xx (bad key, unknown domain) are settings
+    problems and raise ``MailgunError``.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        domain: Optional[str] = None,
+        from_email: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        backoff: float = 0.5,
+    ):
+        self.domain = domain or settings.mailgun_domain
+        self.from_email = from_email or settings.mailgun_from_email
+        self.max_retries = (
+            settings.notification_max_retries if max_retries is None else max_retries
+        )
+        self.backoff = backoff
+        self._http = httpx.AsyncClient(
+            base_url=base_url or settings.mailgun_base_url,
+            auth=("api", api_key or settings.mailgun_api_key or ""),
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+
+    @property
+    def max_send_seconds(self) -> float:
+        """Longest ``send_batch`` can take: every attempt times out and the
+        server asks for the longest wait between them."""
+        return (
+            self.max_retries + 1
+        ) * REQUEST_TIMEOUT + self.max_retries * MAX_RETRY_DELAY
+
+    async def send_batch(self, entries: List[Dict[str, Any]]) -> None:
+        """Send the confirmation email to every entry in one request.
+
+        Raises:
+            MailgunRejectedError: If Mailgun answered 400
+            MailgunError: If the batch was otherwise refused or every attempt
+                failed
+        """
+        data = {
+            "from": self.from_email,
+            "to": [entry["email"] for entry in entries],
+            "subject": CONFIRMATION_SUBJECT,
+            "text": CONFIRMATION_TEXT,
+            "recipient-variables": json.dumps(
+                {entry["email"]: {"email": entry["email"]} for entry in entries}
+            ),
+        }
+
+        error = ""
+        for attempt in range(self.max_retries + 1):
+            delay = self.backoff * 2**attempt
+            try:
+                response = await asyncio.wait_for(
+                    self._http.post(f"/{self.domain}/messages", data=data),
+                    REQUEST_TIMEOUT,
+                )
+            except (httpx.TransportError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {str(e)}"
+            else:
+                if response.status_code < 400:
+                    return
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code == 400:
+                    raise MailgunRejectedError(f"Mailgun rejected the batch: {error}")
+                if response.status_code != 429 and response.status_code < 500:
+                    raise MailgunError(f"Mailgun refused the batch: {error}")
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+            delay = min(delay, MAX_RETRY_DELAY)
+
+            if attempt < self.max_retries:
+                logger.warning(
+                    f"Mailgun send failed ({error}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+        raise MailgunError(
+            f"Mailgun send failed after {self.max_retries + 1} attempts: {error}"
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+class NotificationWorker:
+    """Background task that emails confirmations to new waitlist entries.
+
+    Every ``poll_interval`` seconds it takes the ``LEASE_NAME`` lease, so only
+    one worker process sends at a time, and for the default waitlist and each
+    named list reads up to ``batch_size`` entries with ``notified == False``,
+    sends them one Mailgun batch and marks them notified. A full batch is
+    followed straight away by the next run.
+
+    Delivery is at least once: a batch that was sent but could not be marked
+    is sent again on the next run. A batch Mailgun did not accept stays
+    unnotified and is retried on the next poll, except when Mailgun rejects
+    it with a 400: the batch is then split in halves, down to single entries,
+    to send everything Mailgun accepts and mark the addresses it rejects
+    notified with a ``notification_error``, so one bad address does not hold
+    up the queue. If no part of the batch is accepted, the cause is taken to
+    be the message rather than the addresses and nothing is marked.
+    """
+
+    def __init__(
+        self,
+        repository: WaitlistRepository,
+        mailer: MailgunClient,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.repository = repository
+        self.mailer = mailer
+        self.batch_size = min(
+            batch_size or settings.notification_batch_size, MAILGUN_MAX_RECIPIENTS
+        )
+        self.poll_interval = (
+            settings.notification_poll_interval
+            if poll_interval is None
+            else poll_interval
+        )
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        self.sent = 0
+        self.rejected = 0
+        # Whether the last run left a full batch behind in some list
+        self.backlog = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def _hold_lease(self) -> bool:
+        return await self.repository.acquire_lease(
+            LEASE_NAME, self.owner, self.mailer.max_send_seconds + LEASE_MARGIN
+        )
+
+    async def _send(self, entries: List[Dict[str, Any]]) -> None:
+        if not await self._hold_lease():
+            raise LeaseLostError(f"lease {LEASE_NAME} taken by another worker")
+        await self.mailer.send_batch(entries)
+
+    async def _split(
+        self,
+        entries: List[Dict[str, Any]],
+        accepted: List[Dict[str, Any]],
+        rejected: List[Tuple[Dict[str, Any], str]],
+        sends: List[int],
+    ) -> None:
+        """Send the halves of a rejected batch, collecting what is accepted
+        and the single entries rejected, within ``MAX_SPLIT_SENDS``."""
+        middle = len(entries) // 2
+        for part in (entries[:middle], entries[middle:]):
+            if sends[0] >= MAX_SPLIT_SENDS:
+                return
+            sends[0] += 1
+            try:
+                await self._send(part)
+            except MailgunRejectedError as e:
+                if len(part) == 1:
+                    rejected.append((part[0], str(e)))
+                else:
+                    await self._split(part, accepted, rejected, sends)
+            else:
+                accepted.extend(part)
+
+    async def list_repositories(self) -> List[WaitlistRepository]:
+        """The default list's repository and those of every named list:
+        registered with ``create_list`` or allowed by ``waitlist_lists``."""
+        list_ids = set(settings.waitlist_lists)
+        list_ids.update(await self.repository.list_ids())
+        list_ids.discard(self.repository.list_id)
+        return [self.repository] + [
+            self.repository.for_list(list_id) for list_id in sorted(list_ids)
+        ]
+
+    async def run_once(self) -> int:
+        """Send one batch per waitlist; returns the number of entries notified.
+
+        A list whose batch fails does not hold up the others; the first
+        error is raised once every list has had its turn.
+        """
+        if not await self._hold_lease():
+            return 0
+
+        notified = 0
+        self.backlog = False
+        errors: List[Exception] = []
+        for repository in await self.list_repositories():
+            try:
+                count = await self._notify(repository)
+            except LeaseLostError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "Sending confirmation emails for waitlist %s failed: %s",
+                    repository.list_id,
+                    e,
+                )
+                errors.append(e)
+                continue
+            notified += count
+            self.backlog = self.backlog or count >= self.batch_size
+        if errors:
+            raise errors[0]
+        return notified
+
+    async def _notify(self, repository: WaitlistRepository) -> int:
+        entries = await repository.list_unnotified(self.batch_size)
+        if not entries:
+            return 0
+
+        try:
+            await self._send(entries)
+        except MailgunRejectedError:
+            if len(entries) == 1:
+                raise
+            accepted: List[Dict[str, Any]] = []
+            rejected: List[Tuple[Dict[str, Any], str]] = []
+            await self._split(entries, accepted, rejected, [0])
+            if not accepted:
+                raise
+        else:
+            accepted, rejected = entries, []
+
+        await repository.mark_notified([entry["id"] for entry in accepted])
+        for entry, error in rejected:
+            logger.warning(
+                "Mailgun rejected the confirmation to waitlist entry %s: %s",
+                entry["id"],
+                error,
+            )
+            await repository.mark_notified([entry["id"]], error=error)
+        self.sent += len(accepted)
+        self.rejected += len(rejected)
+        logger.info(
+            "Sent confirmation emails to %d entries of waitlist %s",
+            len(accepted),
+            repository.list_id,
+        )
+        return len(accepted) + len(rejected)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Sending confirmation emails failed: {str(e)}")
+                self.backlog = False
+            if not self.backlog:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.mailer.aclose()
+
+
+def create_notification_worker(repository: WaitlistRepository) -> NotificationWorker:
+    """Build the confirmation-email worker from the Mailgun settings."""
+    return NotificationWorker(repository, MailgunClient())
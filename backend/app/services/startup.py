@@ -0,0 +1,40 @@
+import logging
+from typing import Any
+
+from app.config import settings
+from app.services.health import HealthMonitor
+from app.services.waitlist import AsyncWaitlistService, create_waitlist_service
+
+logger = logging.getLogger(__name__)
+
+
+async def start_waitlist_service(state: Any) -> AsyncWaitlistService:
+    """Build the waitlist service and start what runs beside it in the worker.
+
+    Opens the storage connection (the Firestore channel), starts loading the
+    email index, the health monitor and, if enabled, the confirmation email
+    worker, then marks the worker ready on ``state`` (the app's state). Run by
+    the app lifespan and, when storage was unreachable at startup, by the
+    first request that needs the service.
+
+    Raises:
+        Exception: If the service cannot be built or storage reached
+    """
+    service = create_waitlist_service()
+    await service.repository.warm_up()
+    # Loads the email index in the background, if enabled
+    service.start()
+    state.waitlist_service = service
+    logger.info(f"🔥 Waitlist storage warmed up ({service.repository.backend})")
+
+    state.health_monitor = HealthMonitor(service.repository)
+    state.health_monitor.start()
+    if settings.notifications_enabled:
+        from app.services.notifications import create_notification_worker
+
+        state.notifier = create_notification_worker(service.repository)
+        state.notifier.start()
+        logger.info("📧 Confirmation email worker started")
+
+    state.ready = True
+    return service
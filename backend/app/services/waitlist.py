@@ -1,118 +1,351 @@
 import logging
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
 
-from google.api_core import exceptions as gcp_exceptions
-from google.cloud.firestore_v1 import DocumentReference
-
-from app.core.firebase import get_firestore_client
+from app.config import settings
+from app.repositories import WaitlistRepository, create_repository
+from app.repositories.base import (
+    EXPORT_PAGE_SIZE,
+    DuplicateEmailError,
+    EntryFilter,
+    StorageUnavailableError,
+    decode_page_token,
+    encode_page_token,
+    normalize_email,
+)
+from app.services.cache import WaitlistCache
+from app.services.email_index import EmailIndex
+from app.services.idempotency import IdempotencyStore
+from app.services.write_behind import WriteBehindQueue
 
 logger = logging.getLogger(__name__)
 
 
-class WaitlistService:
-    """Service for managing waitlist entries in Firestore."""
+class AsyncWaitlistService:
+    """Service for managing waitlist entries.
+
+    Storage is delegated to a ``WaitlistRepository``: Firestore in production,
+    or the in-memory engine for tests and load runs (``STORAGE_BACKEND``).
+    Repository calls are async, so a route awaiting this service yields the
+    event loop while a Firestore round-trip is in flight.
+
+    An optional ``WaitlistCache`` sits in front of the reads: the count is
+    served from a short-TTL value and addresses already seen as registered are
+    rejected without a storage round-trip.
+
+    An ``IdempotencyStore`` lets ``add_email`` answer a repeated signup with
+    the same ``Idempotency-Key`` with the original entry instead of a
+    duplicate error.
+
+    An ``EmailIndex`` holds every registered address in a Bloom filter, so
+    an address it has never seen is known to be new without a storage read.
+    An address it may have seen is confirmed with a read before it is
+    rejected.
 
-    COLLECTION_NAME = "waitlist"
+    With a ``WriteBehindQueue``, ``add_email`` only checks for duplicates
+    locally and enqueues the entry; the queue writes it shortly after in a
+    batch. ``close`` must be awaited on shutdown to flush the queue.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        repository: Optional[WaitlistRepository] = None,
+        cache: Optional[WaitlistCache] = None,
+        write_behind: Optional[WriteBehindQueue] = None,
+        idempotency: Optional[IdempotencyStore] = None,
+        email_index: Optional[EmailIndex] = None,
+    ):
         try:
-            self.db = get_firestore_client()
-            self.collection = self.db.collection(self.COLLECTION_NAME)
+            self.repository = (
+                repository if repository is not None else create_repository()
+            )
+            self.cache = cache
+            self.write_behind = write_behind
+            self.idempotency = idempotency
+            self.email_index = email_index
+            # Called after each accepted signup, e.g. by the count stream
+            self.on_signup: Optional[Callable[[], None]] = None
+            if write_behind is not None:
+                write_behind.on_written = self._record_written
             logger.info(
-                f"WaitlistService initialized with collection: {self.COLLECTION_NAME}"
+                f"AsyncWaitlistService initialized with {self.repository.backend} storage"
             )
         except Exception as e:
-            logger.error(f"Failed to initialize WaitlistService: {str(e)}")
+            logger.error(f"Failed to initialize AsyncWaitlistService: {str(e)}")
             raise
 
-    def add_email(self, email: str) -> Dict[str, Any]:
+    async def add_email(
+        self, email: str, idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Add an email to the waitlist.
 
         Args:
             email: The email address to add
+            idempotency_key: Client-chosen key identifying this signup attempt;
+                a repeat with the same key returns the original entry
 
         Returns:
             Dict containing the created entry data
 
         Raises:
             ValueError: If email already exists
+            IdempotencyKeyReusedError: If the key was used for another email
+            QueueFullError: If the write-behind queue cannot take the entry
+            StorageUnavailableError: If storage is failing; retry later
             Exception: For Firestore connection or other errors
         """
         # Normalize email
-        email = email.lower().strip()
-        logger.info(f"Attempting to add email to waitlist: {email}")
+        email = normalize_email(email)
+        logger.debug("Attempting to add email to waitlist: %s", email)
 
-        try:
-            # Check if email already exists
-            logger.debug(f"Checking if email {email} already exists")
-            existing = self.collection.where("email", "==", email).limit(1).get()
-            existing_list = list(existing)
+        if idempotency_key is not None and self.idempotency is not None:
+            entry = self.idempotency.lookup(idempotency_key, email)
+            if entry is not None:
+                logger.debug("Replaying signup of %s", email)
+                return entry
 
-            if len(existing_list) > 0:
-                logger.warning(f"Email {email} already exists in waitlist")
-                raise ValueError("Email already registered")
+        if self.cache is not None and self.cache.is_registered(email):
+            logger.debug("Email %s already exists in waitlist (cached)", email)
+            return await self._replay_or_reject(email, idempotency_key)
 
+        if self.write_behind is not None:
+            # Written later, so a duplicate must be caught before answering.
+            # Without write-behind, create() checks for it and a read here
+            # would only add one. The index rules most addresses out without
+            # a read; a match, or any address while it loads, is read.
+            indexed = (
+                self.email_index.contains(email)
+                if self.email_index is not None
+                else None
+            )
+            if indexed is not False and await self.get_email(email) is not None:
+                logger.debug("Email %s already exists in waitlist (stored)", email)
+                return await self._replay_or_reject(email, idempotency_key)
+            entry = self._enqueue(email, idempotency_key)
+            self._remember_key(idempotency_key, entry)
+            self._signed_up()
+            return entry
+
+        try:
             # Create new entry
-            timestamp = datetime.utcnow()
-            entry_data = {
-                "email": email,
-                "created_at": timestamp,
-                "source": "landing_page",
-                "notified": False,
-                "ip_address": None,  # Can be added later from request
-                "user_agent": None,  # Can be added later from request
-            }
-
-            # Add to Firestore
-            logger.debug(f"Adding new entry to Firestore: {entry_data}")
-            doc_time, doc_ref = self.collection.add(entry_data)
+            entry_data = self.new_entry(email, idempotency_key=idempotency_key)
 
-            logger.info(
-                f"Successfully added email {email} to waitlist with document ID: {doc_ref.id}"
-            )
+            entry_id = await self.repository.create(entry_data)
+            logger.debug("Added email %s to waitlist as %s", email, entry_id)
 
-            return {"id": doc_ref.id, **entry_data}
+            entry = {"id": entry_id, **entry_data}
+            if self.cache is not None:
+                self.cache.record_signup(entry)
+            if self.email_index is not None:
+                self.email_index.add(email)
+            self._remember_key(idempotency_key, entry)
+            self._signed_up()
+            return entry
 
-        except ValueError:
-            # Re-raise ValueError (email already exists)
+        except DuplicateEmailError:
+            # The address is registered: a retry of this signup, or a duplicate
+            if self.cache is not None:
+                self.cache.mark_registered(email)
+            if self.email_index is not None:
+                self.email_index.add(email)
+            return await self._replay_or_reject(email, idempotency_key)
+        except StorageUnavailableError:
             raise
-        except gcp_exceptions.PermissionDenied as e:
-            logger.error(f"Permission denied accessing Firestore: {str(e)}")
-            raise Exception("Database permission error. Check Firebase authentication.")
-        except gcp_exceptions.GoogleAPIError as e:
-            logger.error(f"Google API error: {str(e)}")
-            raise Exception(f"Database connection error: {str(e)}")
         except Exception as e:
-            logger.error(f"Unexpected error adding email {email}: {str(e)}")
-            raise Exception(f"Failed to add email to waitlist: {str(e)}")
+            raise _storage_error(email, e)
+
+    async def _replay_or_reject(
+        self, email: str, idempotency_key: Optional[str]
+    ) -> Dict[str, Any]:
+        """Return the stored entry if it was created with ``idempotency_key``.
+
+        Raises:
+            DuplicateEmailError: If the address was registered by another request
+        """
+        if idempotency_key is not None:
+            entry = await self.get_email(email)
+            if entry is not None and entry.get("idempotency_key") == idempotency_key:
+                logger.debug("Replaying signup of %s from storage", email)
+                self._remember_key(idempotency_key, entry)
+                return entry
+        raise DuplicateEmailError("Email already registered")
+
+    def _remember_key(
+        self, idempotency_key: Optional[str], entry: Dict[str, Any]
+    ) -> None:
+        if idempotency_key is not None and self.idempotency is not None:
+            self.idempotency.remember(idempotency_key, entry)
+
+    def _signed_up(self) -> None:
+        if self.on_signup is not None:
+            self.on_signup()
+
+    def _enqueue(
+        self, email: str, idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Accept a signup into the write-behind queue; its ID is not known yet."""
+        if self.write_behind.is_pending(email):
+            logger.debug("Email %s already exists in waitlist (queued)", email)
+            raise DuplicateEmailError("Email already registered")
 
-    def get_email(self, email: str) -> Optional[Dict[str, Any]]:
+        entry_data = self.new_entry(email, idempotency_key=idempotency_key)
+        self.write_behind.submit(entry_data)
+        logger.debug("Queued email %s for the waitlist", email)
+        return {"id": None, **entry_data}
+
+    def _record_written(self, entries: List[Dict[str, Any]]) -> None:
+        for entry in entries:
+            if self.cache is not None:
+                self.cache.record_signup(entry)
+            if self.email_index is not None:
+                self.email_index.add(entry["email"])
+
+    def new_entry(
+        self,
+        email: str,
+        source: str = "landing_page",
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build the document for a new waitlist entry."""
+        return {
+            "email": normalize_email(email),
+            "created_at": datetime.utcnow(),
+            "source": source,
+            "notified": False,
+            "ip_address": None,  # Can be added later from request
+            "user_agent": None,  # Can be added later from request
+            "idempotency_key": idempotency_key,
+        }
+
+    async def get_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get a waitlist entry by email."""
-        email = email.lower().strip()
-        docs = self.collection.where("email", "==", email).limit(1).get()
+        email = normalize_email(email)
+        if self.cache is not None:
+            hit, entry = self.cache.lookup(email)
+            if hit:
+                return entry
+        if self.email_index is not None and self.email_index.contains(email) is False:
+            return None
+
+        entry = await self.repository.get(email)
+        if self.cache is not None:
+            self.cache.remember(email, entry)
+        return entry
+
+    async def get_all_emails(
+        self,
+        limit: int = 100,
+        page_token: Optional[str] = None,
+        filters: Optional[EntryFilter] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of waitlist entries, newest first.
+
+        Pages resume from a cursor on the last entry of the previous page, so
+        the entries before it are never read again. The token only holds that
+        position: later pages must be requested with the same ``filters``.
+        ``fields`` limits each entry to those fields and its ``id``.
+
+        Returns:
+            The page of entries and the token of the next page, or None after
+            the last page
+
+        Raises:
+            ValueError: If page_token is malformed
+        """
+        cursor = decode_page_token(page_token) if page_token else None
+        entries, next_cursor = await self.repository.list_page(
+            limit, cursor, filters=filters, fields=fields
+        )
+        next_token = encode_page_token(next_cursor) if next_cursor else None
+        return entries, next_token
+
+    def stream_entries(
+        self, page_size: int = EXPORT_PAGE_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every waitlist entry, newest first, one page in memory at a time."""
+        return self.repository.stream(page_size)
+
+    async def get_count(self, fresh: bool = False) -> int:
+        """Get total count of waitlist entries.
+
+        With Firestore this sums the counter shards, a constant number of
+        reads regardless of list size. Signups still in the write-behind queue
+        are included. ``fresh=True`` reads storage even if the count is
+        cached, to pick up signups made through other workers.
+        """
+        if self.cache is not None and not fresh:
+            count = await self.cache.get_count(self.repository.count)
+        else:
+            count = await self.repository.count()
+            if self.cache is not None:
+                self.cache.count.set(count)
+        if self.write_behind is not None:
+            count += len(self.write_behind)
+        return count
+
+    async def rebuild_counter(self) -> int:
+        """Seed or repair the stored count from the entries.
+
+        Run once after deploying to an existing collection, or whenever the
+        counter is suspected to have drifted. Returns the new total.
+        """
+        total = await self.repository.rebuild_counter()
+        if self.cache is not None:
+            self.cache.count.set(total)
+        return total
 
-        for doc in docs:
-            return {"id": doc.id, **doc.to_dict()}
+    def start(self) -> None:
+        """Start background work; called from the application lifespan."""
+        if self.email_index is not None:
+            self.email_index.start()
 
-        return None
+    async def close(self) -> None:
+        """Flush queued signups; called from the application lifespan."""
+        if self.email_index is not None:
+            await self.email_index.stop()
+        if self.write_behind is not None:
+            await self.write_behind.drain()
 
-    def get_all_emails(self, limit: int = 100, offset: int = 0) -> list[Dict[str, Any]]:
-        """Get all waitlist entries with pagination."""
-        query = self.collection.order_by("created_at", direction="DESCENDING")
 
-        if offset > 0:
-            query = query.offset(offset)
+def _storage_error(email: str, e: Exception) -> Exception:
+    """Map a failed write to the error reported to the caller."""
+    # Imported here, on the error path, so the Google client libraries are only
+    # loaded at startup when the Firestore backend is in use
+    from google.api_core import exceptions as gcp_exceptions
 
-        if limit > 0:
-            query = query.limit(limit)
+    if isinstance(e, gcp_exceptions.PermissionDenied):
+        logger.error(f"Permission denied accessing Firestore: {str(e)}")
+        return Exception("Database permission error. Check Firebase authentication.")
+    if isinstance(e, gcp_exceptions.GoogleAPIError):
+        logger.error(f"Google API error: {str(e)}")
+        return Exception(f"Database connection error: {str(e)}")
+    logger.error(f"Unexpected error adding email {email}: {str(e)}")
+    return Exception(f"Failed to add email to waitlist: {str(e)}")
 
-        docs = query.get()
-        return [{"id": doc.id, **doc.to_dict()} for doc in docs]
 
-    def get_count(self) -> int:
-        """Get total count of waitlist entries."""
-        # Note: This is not efficient for large collections
-        # Consider using a counter document for production
-        return len(list(self.collection.get()))
+def create_waitlist_service(
+    repository: Optional[WaitlistRepository] = None,
+) -> AsyncWaitlistService:
+    """Build the process-wide waitlist service with the layers enabled in settings."""
+    if repository is None:
+        repository = create_repository()
+    cache = WaitlistCache() if settings.waitlist_cache_enabled else None
+    write_behind = (
+        WriteBehindQueue(repository) if settings.waitlist_write_behind else None
+    )
+    idempotency = IdempotencyStore() if settings.idempotency_enabled else None
+    # Write-behind relies on the index to catch duplicates before answering
+    email_index = (
+        EmailIndex(repository)
+        if settings.email_index_enabled or settings.waitlist_write_behind
+        else None
+    )
+    return AsyncWaitlistService(
+        repository=repository,
+        cache=cache,
+        write_behind=write_behind,
+        idempotency=idempotency,
+        email_index=email_index,
+    )
@@ -0,0 +1,116 @@
+import logging
+import re
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.core.cache import LRUCache
+from app.repositories.base import DEFAULT_LIST_ID, LIST_ID_PATTERN
+from app.services.cache import WaitlistCache
+from app.services.idempotency import IdempotencyStore
+from app.services.waitlist import AsyncWaitlistService
+
+logger = logging.getLogger(__name__)
+
+_LIST_ID = re.compile(LIST_ID_PATTERN)
+# Unknown list IDs remembered per worker
+UNKNOWN_CACHE_SIZE = 10_000
+
+
+class UnknownWaitlistError(LookupError):
+    """Raised for a list ID that is malformed, or neither in ``waitlist_lists``
+    nor created through the admin API."""
+
+
+class WaitlistRegistry:
+    """Services of the named waitlists behind ``/api/waitlists/{list_id}``.
+
+    ``default`` serves ``DEFAULT_LIST_ID``, the list of ``/api/waitlist``.
+    Other lists must be in ``waitlist_lists`` or registered in storage by
+    ``POST /api/admin/waitlists/{list_id}``, so callers cannot create lists.
+    Whether an ID is registered is read once per worker, and an unknown ID is
+    remembered for ``waitlist_negative_cache_ttl`` seconds, so requests for
+    made-up IDs cost at most one read each per worker and TTL.
+
+    Known lists get a service on first use, over ``repository.for_list``, so
+    every list shares the default's storage client and its deadlines, retry
+    budget and breaker. Each list has its own collection, counter, cache and
+    idempotency keys, so duplicates are scoped to the list.
+
+    Services are kept in an LRU of ``max_lists``, so the memory they hold
+    stays flat however many lists there are; an evicted list is rebuilt on
+    its next request. They have no background work to stop: write-behind,
+    the email index and the live count only run for the default list.
+    """
+
+    def __init__(self, default: AsyncWaitlistService, max_lists: Optional[int] = None):
+        self.default = default
+        self.services = LRUCache(
+            max_lists or settings.waitlist_max_cached_lists,
+            float("inf"),
+            name="waitlist_services",
+        )
+        self.unknown = LRUCache(
+            UNKNOWN_CACHE_SIZE,
+            settings.waitlist_negative_cache_ttl,
+            name="waitlist_unknown_lists",
+        )
+
+    async def _exists(self, list_id: str) -> bool:
+        if list_id in settings.waitlist_lists:
+            return True
+        if self.unknown.get(list_id) is not None:
+            return False
+        if await self.default.repository.list_exists(list_id):
+            return True
+        self.unknown.set(list_id, True)
+        return False
+
+    async def get(self, list_id: str) -> AsyncWaitlistService:
+        """Return the service of ``list_id``.
+
+        Raises:
+            UnknownWaitlistError: If the list ID is malformed or not a list
+            TooManyListsError: If the storage backend cannot hold another list
+        """
+        if list_id == DEFAULT_LIST_ID:
+            return self.default
+        if not _LIST_ID.match(list_id):
+            raise UnknownWaitlistError(f"No waitlist named {list_id!r}")
+
+        service = self.services.get(list_id)
+        if service is None:
+            if not await self._exists(list_id):
+                raise UnknownWaitlistError(f"No waitlist named {list_id!r}")
+            service = AsyncWaitlistService(
+                repository=self.default.repository.for_list(list_id),
+                cache=WaitlistCache() if settings.waitlist_cache_enabled else None,
+                idempotency=(
+                    IdempotencyStore() if settings.idempotency_enabled else None
+                ),
+            )
+            self.services.set(list_id, service)
+        return service
+
+    async def create(self, list_id: str) -> bool:
+        """Register ``list_id`` in storage, for every worker.
+
+        Returns:
+            False if it was registered already
+
+        Raises:
+            UnknownWaitlistError: If the list ID is malformed
+            TooManyListsError: If the storage backend cannot hold another list
+        """
+        if list_id == DEFAULT_LIST_ID or not _LIST_ID.match(list_id):
+            raise UnknownWaitlistError(f"Invalid waitlist ID {list_id!r}")
+        created = await self.default.repository.create_list(list_id)
+        self.unknown.pop(list_id)
+        return created
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.services.stats.as_dict(),
+            "size": len(self.services),
+            "max_size": self.services.maxsize,
+            "unknown_cached": len(self.unknown),
+        }
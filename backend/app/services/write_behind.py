@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.config import settings
+from app.core.metrics import WRITE_BEHIND_DUPLICATES, WRITE_BEHIND_QUEUED
+from app.repositories import WaitlistRepository
+
+logger = logging.getLogger(__name__)
+
+# Retries of a failed batch once shutdown has started, before giving up on it
+DRAIN_ATTEMPTS = 3
+# Cap on the delay between retries of a failed batch, in seconds
+MAX_RETRY_DELAY = 5.0
+
+
+class QueueFullError(Exception):
+    """Raised when the write-behind queue cannot accept another signup."""
+
+
+class WriteBehindQueue:
+    """Accept signups into memory and write them to storage in batches.
+
+    ``submit`` only enqueues, so a signup returns without waiting on storage.
+    A background task started on the first ``submit`` collects entries until
+    ``batch_size`` are waiting or ``flush_interval`` seconds have passed since
+    the first one, then writes them with a single ``create_many``. A failed
+    batch is retried with capped exponential backoff.
+
+    The queue holds at most ``max_size`` entries; beyond that ``submit``
+    raises ``QueueFullError`` so callers can shed load instead of growing
+    memory. ``drain`` stops intake and waits for everything accepted to be
+    written. ``on_written``, if set, is called with the entries each batch
+    created; an error it raises is logged and does not stop the writer.
+
+    The caller checks storage for duplicates before submitting (see
+    ``AsyncWaitlistService.add_email``), and ``is_pending`` catches repeats
+    still queued in this worker. What remains is the same address queued by
+    two workers at once: ``create_many`` writes it once and drops the other
+    at flush time, after its signup has been answered 200. Such drops are
+    counted in ``already_registered`` and
+    ``waitlist_write_behind_duplicates_total``.
+    """
+
+    def __init__(
+        self,
+        repository: WaitlistRepository,
+        max_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.repository = repository
+        self.max_size = max_size or settings.waitlist_queue_max_size
+        self.batch_size = batch_size or settings.waitlist_batch_size
+        self.flush_interval = (
+            settings.waitlist_flush_interval
+            if flush_interval is None
+            else flush_interval
+        )
+        self.written = 0
+        self.already_registered = 0
+        self.failed_batches = 0
+        self.on_written: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._pending: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def is_pending(self, email: str) -> bool:
+        return email in self._pending
+
+    def submit(self, entry: Dict[str, Any]) -> None:
+        """Enqueue a new entry for writing.
+
+        Raises:
+            QueueFullError: If the queue is full or shutting down
+        """
+        if self._closing:
+            raise QueueFullError("Signup queue is shutting down")
+        if self._queue is None:
+            # Created lazily so the queue binds to the serving event loop
+            self._queue = asyncio.Queue(self.max_size)
+            self._wakeup = asyncio.Event()
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            raise QueueFullError("Signup queue is full")
+        self._pending.add(entry["email"])
+        WRITE_BEHIND_QUEUED.inc()
+        if self._queue.qsize() >= self.batch_size - 1:
+            self._wakeup.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Wait for a full batch, the flush interval or a drain, whichever
+            # comes first
+            if self._queue.qsize() < self.batch_size - 1 and not self._closing:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._write(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                try:
+                    created = await self.repository.create_many(batch)
+                    break
+                except Exception as e:
+                    self.failed_batches += 1
+                    if self._closing and attempt >= DRAIN_ATTEMPTS:
+                        emails = [entry["email"] for entry in batch]
+                        logger.error(
+                            "Dropping %d queued signups after %d failed writes: "
+                            "%s; emails: %s",
+                            len(batch),
+                            attempt,
+                            e,
+                            emails,
+                        )
+                        return
+                    delay = min(0.1 * 2**attempt, MAX_RETRY_DELAY)
+                    logger.warning(
+                        "Writing %d queued signups failed, retrying in %.1fs: %s",
+                        len(batch),
+                        delay,
+                        e,
+                    )
+                    await asyncio.sleep(delay)
+
+            duplicates = len(batch) - len(created)
+            self.written += len(created)
+            self.already_registered += duplicates
+            WRITE_BEHIND_DUPLICATES.inc(duplicates)
+            logger.info("Wrote %d of %d queued signups", len(created), len(batch))
+            if self.on_written is not None:
+                try:
+                    self.on_written(created)
+                except Exception as e:
+                    logger.error(
+                        "Recording %d written signups failed: %s", len(created), e
+                    )
+        finally:
+            for entry in batch:
+                self._pending.discard(entry["email"])
+                self._queue.task_done()
+            WRITE_BEHIND_QUEUED.dec(len(batch))
+
+    async def drain(self) -> None:
+        """Stop accepting signups and write out everything already queued."""
+        self._closing = True
+        if self._queue is None:
+            return
+        logger.info("Draining %d queued signups", len(self._pending))
+        self._wakeup.set()
+        await self._queue.join()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._pending),
+            "max_size": self.max_size,
+            "written": self.written,
+            "already_registered": self.already_registered,
+            "failed_batches": self.failed_batches,
+        }
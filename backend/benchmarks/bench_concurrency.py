@@ -0,0 +1,75 @@
+"""Concurrency benchmark for the waitlist write path within one worker.
+
+Fires N concurrent ``POST /api/waitlist`` requests at the ASGI app in-process
+against a fake Firestore client with a fixed per-call latency, once with the
+latency awaited (async client) and once with it blocking the event loop (what
+the previous synchronous client did). The overlap factor is the total
+simulated Firestore time divided by the wall-clock time; ~1 means requests ran
+one after another, larger means they overlapped.
+
+Usage:
+    uv run python -m benchmarks.bench_concurrency --requests 50 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.repositories import FirestoreWaitlistRepository
+from app.services.waitlist import AsyncWaitlistService
+from main import app
+from tests.fakes import FakeAsyncClient
+
+# Each signup is one duplicate-check query plus one write.
+ROUND_TRIPS_PER_SIGNUP = 2
+
+
+async def run(requests: int, latency: float, blocking: bool) -> dict:
+    fake = FakeAsyncClient(latency=latency, blocking=blocking)
+    app.state.waitlist_service = AsyncWaitlistService(
+        FirestoreWaitlistRepository(client=fake)
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(
+                client.post("/api/waitlist", json={"email": f"bench{i}@example.com"})
+                for i in range(requests)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    assert all(r.status_code == 200 for r in responses), "benchmark requests failed"
+    simulated = requests * ROUND_TRIPS_PER_SIGNUP * latency
+    return {
+        "mode": "blocking" if blocking else "async",
+        "requests": requests,
+        "wall_s": elapsed,
+        "rps": requests / elapsed,
+        "overlap": simulated / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    for blocking in (True, False):
+        result = asyncio.run(run(args.requests, args.latency, blocking))
+        print(
+            f"{result['mode']:>8}: {result['requests']} requests in "
+            f"{result['wall_s']:.3f}s ({result['rps']:.0f} req/s), "
+            f"overlap x{result['overlap']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""Load test for the API tier, with a saved report to compare runs against.
+
+Runs each scenario with a fixed number of concurrent clients and records
+every request's latency:
+
+- ``signup_new``: ``POST /api/waitlist`` with a fresh address each time
+- ``signup_duplicate``: ``POST /api/waitlist`` with addresses already on the list
+- ``count``: ``GET /api/waitlist/count``
+- ``health``: ``GET /health``
+
+By default requests go through the ASGI app in-process, against the
+Firestore repository on the fake client from ``tests/fakes.py`` with
+``--latency`` seconds per storage call, so no network or database is needed.
+With ``--url`` they go to a running server instead (for example gunicorn with
+``STORAGE_BACKEND=memory``).
+
+The report holds requests/s, p50/p95/p99 latency and, in-process, the peak
+and retained memory allocated per request (from a separate ``tracemalloc``
+pass, so tracing does not slow the timed run). ``--compare`` checks the run
+against an earlier report and exits 1 if any scenario's requests/s fell or
+p95 rose by more than ``--tolerance``.
+
+Usage:
+    uv run python -m benchmarks.bench_load --requests 2000 --concurrency 50 \\
+        --output benchmarks/reports/baseline.json
+    uv run python -m benchmarks.bench_load --compare benchmarks/reports/baseline.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+REPORTS_DIR = Path(__file__).resolve().parent / "reports"
+SCENARIOS = ("signup_new", "signup_duplicate", "count", "health")
+# Addresses registered before the duplicate-signup scenario runs
+DUPLICATE_POOL = 100
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+def _requests(scenario: str, run_id: str) -> Callable[[int], Request]:
+    if scenario == "signup_new":
+        return lambda i: (
+            "POST",
+            "/api/waitlist",
+            {"email": f"load-{run_id}-{i}@example.com"},
+        )
+    if scenario == "signup_duplicate":
+        return lambda i: (
+            "POST",
+            "/api/waitlist",
+            {"email": f"dup-{run_id}-{i % DUPLICATE_POOL}@example.com"},
+        )
+    if scenario == "count":
+        return lambda i: ("GET", "/api/waitlist/count", None)
+    return lambda i: ("GET", "/health", None)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of ``samples`` (0 < q <= 100)."""
+    ordered = sorted(samples)
+    return ordered[max(0, int(round(q / 100 * len(ordered))) - 1)]
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    make_request: Callable[[int], Request],
+    total: int,
+    concurrency: int,
+) -> Tuple[List[float], Dict[int, int], float]:
+    counter = itertools.count()
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+
+    async def worker() -> None:
+        while (i := next(counter)) < total:
+            method, path, body = make_request(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+            except httpx.TransportError:
+                # Counted as status 0: a connection reset or refused, as when
+                # a server worker restarts
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+def _summary(
+    latencies: List[float], statuses: Dict[int, int], elapsed: float
+) -> Dict[str, Any]:
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+    }
+
+
+def _in_process_client(latency: float) -> httpx.AsyncClient:
+    from app.repositories import FirestoreWaitlistRepository
+    from app.services.waitlist import create_waitlist_service
+    from main import app
+    from tests.fakes import FakeAsyncClient
+
+    app.state.waitlist_service = create_waitlist_service(
+        FirestoreWaitlistRepository(client=FakeAsyncClient(latency=latency))
+    )
+    app.state.rate_limiter = None  # the load comes from one address
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    )
+
+
+async def _allocations(
+    client: httpx.AsyncClient, make_request: Callable[[int], Request], total: int
+) -> Dict[str, float]:
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await _drive(client, make_request, total, concurrency=1)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_kb": round((peak - before) / 1024, 1),
+        "retained_bytes_per_request": round((after - before) / total, 1),
+    }
+
+
+async def run(
+    requests: int,
+    concurrency: int,
+    latency: float,
+    url: Optional[str] = None,
+    scenarios=SCENARIOS,
+) -> Dict[str, Any]:
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S%f")
+    client = (
+        httpx.AsyncClient(base_url=url, timeout=30.0)
+        if url
+        else _in_process_client(latency)
+    )
+    results: Dict[str, Any] = {}
+    async with client:
+        if "signup_duplicate" in scenarios:
+            await _drive(
+                client,
+                _requests("signup_duplicate", run_id),
+                DUPLICATE_POOL,
+                concurrency,
+            )
+        for scenario in scenarios:
+            make_request = _requests(scenario, run_id)
+            # Warm up connections, caches and code paths before timing
+            await _drive(client, _requests(scenario, f"warm{run_id}"), 50, 10)
+            latencies, statuses, elapsed = await _drive(
+                client, make_request, requests, concurrency
+            )
+            results[scenario] = _summary(latencies, statuses, elapsed)
+            if not url:
+                results[scenario].update(
+                    await _allocations(
+                        client,
+                        _requests(scenario, f"alloc{run_id}"),
+                        min(requests, 500),
+                    )
+                )
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "target": url or "in-process",
+        "concurrency": concurrency,
+        "storage_latency_s": None if url else latency,
+        "scenarios": results,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Return a description of every scenario that regressed past ``tolerance``."""
+    regressions = []
+    for scenario, current in report["scenarios"].items():
+        previous = baseline["scenarios"].get(scenario)
+        if previous is None:
+            continue
+        if current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(
+                f"{scenario}: {current['rps']} req/s, was {previous['rps']}"
+            )
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{scenario}: p95 {current['p95_ms']} ms, was {previous['p95_ms']}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--latency", type=float, default=0.005, help="simulated seconds per call"
+    )
+    parser.add_argument("--url", help="load a running server instead")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS)
+    parser.add_argument("--output", type=Path, help="report path")
+    parser.add_argument("--compare", type=Path, help="baseline report")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    # Per-request log lines would dominate the measurement
+    logging.disable(logging.WARNING)
+
+    report = asyncio.run(
+        run(
+            args.requests,
+            args.concurrency,
+            args.latency,
+            args.url,
+            tuple(args.scenario or SCENARIOS),
+        )
+    )
+
+    print(
+        f"{'scenario':<18} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'peak KB':>8}  statuses"
+    )
+    for scenario, result in report["scenarios"].items():
+        print(
+            f"{scenario:<18} {result['rps']:>9.1f} {result['p50_ms']:>8.2f} "
+            f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+            f"{result.get('alloc_peak_kb', float('nan')):>8.1f}  "
+            f"{result['statuses']}"
+        )
+
+    output = args.output or REPORTS_DIR / f"load-{report['created_at'][:19]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nreport: {output}")
+
+    if args.compare:
+        regressions = compare(
+            report, json.loads(args.compare.read_text()), args.tolerance
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} of {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
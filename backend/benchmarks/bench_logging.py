@@ -0,0 +1,95 @@
+"""Per-request cost of logging on the signup path.
+
+Sends sequential ``POST /api/waitlist`` requests for new addresses through
+the ASGI app in-process on the in-memory backend, with logs going to a real
+file, three ways:
+
+- ``off``: logging disabled, the floor
+- ``sync, every line``: what the app used to do. Every per-signup line is
+  written by a ``StreamHandler`` on the request path (root level DEBUG, so
+  the service's per-signup lines are included) and every request is logged.
+- ``queued, sampled``: the current setup. JSON lines are formatted on the
+  listener thread, the level is INFO and request logs use the default
+  per-route sample rates.
+
+Usage:
+    uv run python -m benchmarks.bench_logging --requests 3000
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+
+import httpx
+
+from app.config import settings
+from app.core import logs
+from app.repositories import InMemoryWaitlistRepository
+from app.services.waitlist import create_waitlist_service
+from main import app
+
+
+async def run(name: str, requests: int) -> float:
+    app.state.waitlist_service = create_waitlist_service(InMemoryWaitlistRepository())
+    app.state.rate_limiter = None
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        started = time.perf_counter()
+        for i in range(requests):
+            await client.post("/api/waitlist", json={"email": f"{name}{i}@example.com"})
+        elapsed = time.perf_counter() - started
+    return elapsed / requests * 1e6
+
+
+def _use(handler: logging.Handler, level: int) -> None:
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+    # The client library's own request logs are not part of the app's cost
+    logging.getLogger("httpx").disabled = True
+    logs.stop_logging()
+    default_rates = dict(settings.log_sample_rates)
+
+    with tempfile.TemporaryFile("w") as sink:
+        results = {}
+
+        logging.disable(logging.CRITICAL)
+        results["off"] = asyncio.run(run("off", args.requests))
+        logging.disable(logging.NOTSET)
+
+        sync_handler = logging.StreamHandler(sink)
+        sync_handler.setFormatter(logging.Formatter("%(levelname)s:%(message)s"))
+        _use(sync_handler, logging.DEBUG)
+        settings.log_sample_rates = {}
+        results["sync, every line"] = asyncio.run(run("sync", args.requests))
+
+        formatted = logging.StreamHandler(sink)
+        formatted.setFormatter(logs.CloudLoggingFormatter())
+        _use(formatted, logging.INFO)
+        settings.log_sample_rates = default_rates
+        logs._start_listener(formatted)
+        logging.getLogger().removeHandler(formatted)
+        results["queued, sampled"] = asyncio.run(run("queued", args.requests))
+        logs.stop_logging()
+
+    floor = results["off"]
+    print(f"{'logging':<20} {'us/request':>11} {'logging cost':>13}")
+    for name, per_request in results.items():
+        print(f"{name:<20} {per_request:>11.1f} {per_request - floor:>+12.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Offset vs cursor pagination over the whole waitlist.
+
+Pages through N entries with ``offset()`` (the old ``get_all_emails``) and with
+``start_after`` page tokens, against the in-process fake client. Firestore bills
+and scans every document an offset skips, so the report counts billed document
+reads and models wall time as ``round_trips * rtt + reads * per_doc``.
+
+Usage:
+    uv run python -m benchmarks.bench_pagination --sizes 10000 50000 --page-size 500
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from app.repositories import FirestoreWaitlistRepository
+from app.services.waitlist import AsyncWaitlistService
+from tests.fakes import FakeAsyncClient
+
+
+def seed(service: AsyncWaitlistService, size: int) -> None:
+    start = datetime(2025, 1, 1)
+    for i in range(size):
+        entry = service.new_entry(f"user{i}@example.com")
+        entry["created_at"] = start + timedelta(seconds=i)
+        service.repository.collection.document(f"id{i:08d}")._write(entry)
+
+
+async def page_with_offset(service: AsyncWaitlistService, page_size: int) -> int:
+    offset = 0
+    while True:
+        query = service.repository.collection.order_by(
+            "created_at", direction="DESCENDING"
+        )
+        docs = await query.offset(offset).limit(page_size).get()
+        offset += len(docs)
+        if len(docs) < page_size:
+            return offset
+
+
+async def page_with_cursor(service: AsyncWaitlistService, page_size: int) -> int:
+    total, token = 0, None
+    while True:
+        entries, token = await service.get_all_emails(page_size, page_token=token)
+        total += len(entries)
+        if token is None:
+            return total
+
+
+async def run(size: int, page_size: int, rtt: float, per_doc: float) -> None:
+    client = FakeAsyncClient()
+    service = AsyncWaitlistService(FirestoreWaitlistRepository(client=client))
+    seed(service, size)
+
+    for name, pager in (("offset", page_with_offset), ("cursor", page_with_cursor)):
+        client.calls = client.reads = 0
+        started = time.perf_counter()
+        fetched = await pager(service, page_size)
+        elapsed = time.perf_counter() - started
+        modeled = client.calls * rtt + client.reads * per_doc
+        print(
+            f"{size:>8} {name:>7}: {fetched} entries, {client.calls} queries, "
+            f"{client.reads} billed reads, modeled {modeled:.2f}s "
+            f"(in-process {elapsed:.2f}s)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--rtt", type=float, default=0.02, help="Seconds per query")
+    parser.add_argument(
+        "--per-doc", type=float, default=0.00005, help="Seconds per document read"
+    )
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        asyncio.run(run(size, args.page_size, args.rtt, args.per_doc))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Requests/s and memory of the production server, per worker configuration.
+
+Boots gunicorn with ``gunicorn.conf.py`` once per configuration in
+``CONFIGURATIONS`` (``SERVER_*`` settings layered over the environment), on
+the in-memory backend with rate limiting off, drives it with the
+``bench_load`` scenarios and then reads the memory of the master and its
+workers from ``/proc`` (Linux only):
+
+- ``rss_mb``: resident memory summed over the processes, counting pages the
+  workers share with the master once per process;
+- ``pss_mb``: proportional set size, which splits shared pages between the
+  processes sharing them, so it shows what preloading saves.
+
+``errors`` counts requests whose connection was reset, as happens when
+``SERVER_MAX_REQUESTS`` restarts a worker under load.
+
+``--storage-backend firestore`` serves ``benchmarks/firestore_app.py``
+instead: still from memory, but with the Firestore modules (grpc and the
+Google client libraries) loaded as ``STORAGE_BACKEND=firestore`` loads them,
+which is most of what preloading can share.
+
+Usage:
+    uv run python -m benchmarks.bench_server --requests 5000 --concurrency 100 \\
+        --output benchmarks/reports/server.json
+    uv run python -m benchmarks.bench_server --config cpus --config cpus-preload \\
+        --storage-backend firestore
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+from app.core.server import available_cpus, resolve_http, resolve_loop
+from benchmarks.bench_load import REPORTS_DIR, _git_commit, run
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SCENARIOS = ("signup_new", "count", "health")
+# App served for each --storage-backend
+APPS = {"memory": "main:app", "firestore": "benchmarks.firestore_app:app"}
+BOOT_TIMEOUT = 30.0
+
+_CPUS = available_cpus()
+# Settings per configuration; anything not set keeps its default
+CONFIGURATIONS: Dict[str, Dict[str, str]] = {
+    "1-asyncio-h11": {
+        "SERVER_WORKERS": "1",
+        "SERVER_LOOP": "asyncio",
+        "SERVER_HTTP": "h11",
+        "SERVER_PRELOAD": "false",
+    },
+    "1-auto": {"SERVER_WORKERS": "1", "SERVER_PRELOAD": "false"},
+    "cpus-asyncio-h11": {
+        "SERVER_LOOP": "asyncio",
+        "SERVER_HTTP": "h11",
+        "SERVER_PRELOAD": "false",
+    },
+    "cpus": {"SERVER_PRELOAD": "false"},
+    "cpus-preload": {"SERVER_PRELOAD": "true"},
+    "cpus-preload-recycle": {
+        "SERVER_PRELOAD": "true",
+        "SERVER_MAX_REQUESTS": "1000",
+    },
+    "2xcpus-preload": {
+        "SERVER_WORKERS": str(2 * _CPUS),
+        "SERVER_PRELOAD": "true",
+    },
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _server_env(overrides: Dict[str, str], port: int) -> Dict[str, str]:
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.startswith("SERVER_") and key != "PROMETHEUS_MULTIPROC_DIR"
+    }
+    env.update(
+        {
+            "PORT": str(port),
+            "STORAGE_BACKEND": "memory",
+            # The load comes from one address
+            "RATE_LIMIT_ENABLED": "false",
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    env.update(overrides)
+    return env
+
+
+def _wait_until_ready(url: str) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < BOOT_TIMEOUT:
+        try:
+            if httpx.get(f"{url}/readyz", timeout=1.0).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"server at {url} not ready after {BOOT_TIMEOUT}s")
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name may hold spaces; fields after it are fixed
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            children.append(int(entry.name))
+    return children
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    memory = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        key, _, value = line.partition(":")
+        if key in ("Rss", "Pss"):
+            memory[key.lower()] = int(value.split()[0])
+    return memory
+
+
+def _memory(master: int) -> Dict[str, Any]:
+    workers = _children(master)
+    processes = [_memory_kb(pid) for pid in [master, *workers]]
+    return {
+        "workers": len(workers),
+        "rss_mb": round(sum(p["rss"] for p in processes) / 1024, 1),
+        "pss_mb": round(sum(p["pss"] for p in processes) / 1024, 1),
+        "worker_pss_mb": round(
+            sum(p["pss"] for p in processes[1:]) / max(1, len(workers)) / 1024, 1
+        ),
+    }
+
+
+def bench_configuration(
+    overrides: Dict[str, str],
+    requests: int,
+    concurrency: int,
+    storage_backend: str = "memory",
+) -> Dict[str, Any]:
+    """Boot gunicorn with ``overrides``, load it and measure its memory."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            APPS[storage_backend],
+            "-c",
+            "gunicorn.conf.py",
+        ],
+        cwd=BACKEND_DIR,
+        env=_server_env(overrides, port),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        boot_seconds = _wait_until_ready(url)
+        report = asyncio.run(run(requests, concurrency, 0, url, SCENARIOS))
+        memory = _memory(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    return {
+        "settings": overrides,
+        "loop": resolve_loop(overrides.get("SERVER_LOOP", "auto")),
+        "http": resolve_http(overrides.get("SERVER_HTTP", "auto")),
+        "boot_s": round(boot_seconds, 2),
+        **memory,
+        "errors": sum(
+            result["statuses"].get("0", 0) for result in report["scenarios"].values()
+        ),
+        "scenarios": report["scenarios"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--config", action="append", choices=list(CONFIGURATIONS))
+    parser.add_argument("--storage-backend", choices=list(APPS), default="memory")
+    parser.add_argument("--output", type=Path, help="report path")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    results = {}
+    for name in args.config or CONFIGURATIONS:
+        print(f"{name} ...", file=sys.stderr)
+        results[name] = bench_configuration(
+            CONFIGURATIONS[name], args.requests, args.concurrency, args.storage_backend
+        )
+
+    print(
+        f"{'configuration':<22} {'workers':>7} {'loop/http':<16} {'RSS MB':>7} "
+        f"{'PSS MB':>7} {'errors':>6} "
+        + " ".join(f"{s + ' req/s':>17}" for s in SCENARIOS)
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<22} {result['workers']:>7} "
+            f"{result['loop'] + '/' + result['http']:<16} "
+            f"{result['rss_mb']:>7} {result['pss_mb']:>7} "
+            f"{result['errors']:>6} "
+            + " ".join(f"{result['scenarios'][s]['rps']:>17}" for s in SCENARIOS)
+        )
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "cpus": _CPUS,
+        "storage_backend": args.storage_backend,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "configurations": results,
+    }
+    output = args.output or REPORTS_DIR / (
+        f"server-{args.storage_backend}-{report['created_at'][:19]}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nreport: {output}")
+
+
+if __name__ == "__main__":
+    main()
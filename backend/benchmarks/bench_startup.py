@@ -0,0 +1,140 @@
+"""Cold-start cost of importing ``main:app``.
+
+Imports the app in a fresh interpreter, as a gunicorn worker does, and reports
+the import time, peak RSS and the packages that took longest to import
+(from ``python -X importtime``). With the Firestore backend it also imports
+the Firestore repository, which a worker loads before serving and a
+preloading master imports up front (see ``app/core/server.py``).
+
+``tests/test_startup.py`` fails if importing the app loads one of
+``LAZY_MODULES``, and, with ``TEST_STARTUP_BUDGET=1``, if either backend's
+import takes longer than ``IMPORT_BUDGET_SECONDS`` or more than
+``RSS_BUDGET_MB``. Timings depend on the machine, so the budgets are opt-in.
+
+Usage:
+    uv run python -m benchmarks.bench_startup --runs 5 --top 15
+    uv run python -m benchmarks.bench_startup --storage-backend firestore
+    TEST_STARTUP_BUDGET=1 uv run pytest tests/test_startup.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Budgets per storage backend for importing main:app (and the Firestore
+# repository); about 2x what a laptop measures, so slower machines stay under
+IMPORT_BUDGET_SECONDS = {"memory": 1.5, "firestore": 2.0}
+RSS_BUDGET_MB = {"memory": 120.0, "firestore": 180.0}
+
+# Imported after main:app, as the backend loads them before serving
+STORAGE_MODULES = {"memory": [], "firestore": ["app.repositories.firestore"]}
+
+# Loaded on first use, never by importing the app: the Firebase/Google client
+# stack only with the Firestore backend, httpx only with notifications
+LAZY_MODULES = (
+    "firebase_admin",
+    "google.api_core",
+    "google.cloud.firestore_v1",
+    "grpc",
+    "httpx",
+)
+
+_PROBE = """
+import importlib, json, resource, sys, time
+started = time.perf_counter()
+import main
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - started
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mb": rss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def _run(args: List[str], storage_backend: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "STORAGE_BACKEND": storage_backend}
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def measure_startup(storage_backend: str = "memory") -> Dict[str, Any]:
+    """Import ``main`` and the backend's modules in a fresh interpreter and
+    return the cost.
+
+    Returns:
+        ``seconds`` spent importing, peak ``rss_mb`` of the process and the
+        names of all imported ``modules``
+    """
+    result = _run(["-c", _PROBE, *STORAGE_MODULES[storage_backend]], storage_backend)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_profile(storage_backend: str = "memory") -> List[Tuple[str, float]]:
+    """Import self-time per top-level package, slowest first, in milliseconds."""
+    code = "; ".join(
+        f"import {name}" for name in ["main", *STORAGE_MODULES[storage_backend]]
+    )
+    result = _run(["-X", "importtime", "-c", code], storage_backend)
+    totals: Dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--storage-backend", choices=list(STORAGE_MODULES), default="memory"
+    )
+    args = parser.parse_args()
+
+    samples = [measure_startup(args.storage_backend) for _ in range(args.runs)]
+    seconds = [sample["seconds"] for sample in samples]
+    rss = max(sample["rss_mb"] for sample in samples)
+    eager = [
+        name
+        for name in LAZY_MODULES
+        if any(name in sample["modules"] for sample in samples)
+    ]
+
+    print(f"import main ({args.storage_backend} backend, {args.runs} runs)")
+    time_budget = IMPORT_BUDGET_SECONDS[args.storage_backend]
+    print(
+        f"  time: median {statistics.median(seconds) * 1000:.0f} ms, "
+        f"max {max(seconds) * 1000:.0f} ms (budget {time_budget:.1f} s)"
+    )
+    print(
+        f"  peak RSS: {rss:.1f} MB (budget {RSS_BUDGET_MB[args.storage_backend]:.0f})"
+    )
+    if not STORAGE_MODULES[args.storage_backend]:
+        print(f"  lazy modules imported eagerly: {', '.join(eager) or 'none'}")
+    print("\nslowest packages (self time, -X importtime):")
+    for package, ms in import_profile(args.storage_backend)[: args.top]:
+        print(f"  {package:<28} {ms:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Throughput benchmark for the API tier alone, on the in-memory backend.
+
+Drives ``POST /api/waitlist`` (new and repeat addresses) and
+``GET /api/waitlist/count`` through the ASGI app in-process with a fixed
+number of concurrent clients. Storage is ``InMemoryWaitlistRepository``, so
+the numbers measure routing, validation, the service and the cache layer with
+no network in the loop.
+
+Usage:
+    uv run python -m benchmarks.bench_throughput --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.repositories import InMemoryWaitlistRepository
+from app.services.waitlist import create_waitlist_service
+from main import app
+
+
+async def _worker(client: httpx.AsyncClient, requests, statuses: dict) -> None:
+    for method, path, body in requests:
+        response = await client.request(method, path, json=body)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def run(name: str, requests: list, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    statuses: dict = {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                _worker(client, requests[i::concurrency], statuses)
+                for i in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "scenario": name,
+        "requests": len(requests),
+        "wall_s": elapsed,
+        "rps": len(requests) / elapsed,
+        "statuses": statuses,
+    }
+
+
+async def main_async(total: int, concurrency: int) -> None:
+    app.state.waitlist_service = create_waitlist_service(InMemoryWaitlistRepository())
+
+    scenarios = [
+        (
+            "signup",
+            [
+                ("POST", "/api/waitlist", {"email": f"bench{i}@example.com"})
+                for i in range(total)
+            ],
+        ),
+        (
+            "duplicate",
+            [
+                ("POST", "/api/waitlist", {"email": f"bench{i % 100}@example.com"})
+                for i in range(total)
+            ],
+        ),
+        ("count", [("GET", "/api/waitlist/count", None)] * total),
+    ]
+    for name, requests in scenarios:
+        result = await run(name, requests, concurrency)
+        print(
+            f"{result['scenario']:>9}: {result['requests']} requests in "
+            f"{result['wall_s']:.3f}s ({result['rps']:.0f} req/s) "
+            f"statuses={result['statuses']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""The app with the Firestore repository imported, for ``bench_server``.
+
+Serves from the in-memory backend like the other configurations, but loads
+grpc and the Google client libraries where ``STORAGE_BACKEND=firestore``
+does: in the master when the app is preloaded (``preload_storage``),
+otherwise in each worker. No client is created, so no credentials or
+emulator are needed.
+"""
+
+import app.repositories.firestore  # noqa: F401
+from main import app  # noqa: F401
@@ -0,0 +1,135 @@
+"""Micro-benchmarks for the hot path of a signup, with pytest-benchmark.
+
+Not part of the default test run (``testpaths`` is ``tests``). Save a baseline
+and compare later runs against it:
+
+    uv run pytest benchmarks --benchmark-autosave
+    uv run pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:20%
+"""
+
+import asyncio
+import itertools
+import logging
+from datetime import datetime
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.config import settings
+from app.core.cache import LRUCache
+from app.core.responses import ORJSONResponse
+from app.repositories import FirestoreWaitlistRepository
+from app.repositories.base import decode_page_token, encode_page_token
+from app.schemas.waitlist import WaitlistEntry, WaitlistResponse
+from app.services.waitlist import create_waitlist_service
+from main import app
+from tests.fakes import FakeAsyncClient
+
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    # Per-call log lines would dominate the measurement
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "storage_backend", "memory")
+    with TestClient(app) as client:
+        app.state.rate_limiter = None
+        yield client
+
+
+def test_validate_waitlist_entry(benchmark):
+    benchmark(WaitlistEntry.model_validate, {"email": "Person@Example.com"})
+
+
+def test_reject_invalid_waitlist_entry(benchmark):
+    def validate():
+        with pytest.raises(ValidationError):
+            WaitlistEntry.model_validate({"email": "not-an-email"})
+
+    benchmark(validate)
+
+
+def test_page_token_round_trip(benchmark):
+    token = encode_page_token((datetime(2025, 1, 28), "abc123"))
+    benchmark(lambda: encode_page_token(decode_page_token(token)))
+
+
+def test_lru_cache_hit(benchmark):
+    cache = LRUCache(10_000, ttl=600)
+    for i in range(10_000):
+        cache.set(f"user{i}@example.com", True)
+    keys = itertools.cycle([f"user{i}@example.com" for i in range(0, 10_000, 7)])
+    benchmark(lambda: cache.get(next(keys)))
+
+
+SIGNUP_RESULT = {
+    "message": "Successfully joined the waiting list!",
+    "email": "person@example.com",
+    "timestamp": datetime(2025, 1, 28, 10, 0, 0, 123456),
+}
+
+
+@pytest.mark.benchmark(group="signup response")
+def test_render_signup_response_model(benchmark):
+    """What FastAPI 0.116 does for a ``response_model`` route with the default
+    response class: build the model, validate it again, encode, dump with json."""
+
+    def render():
+        model = WaitlistResponse(**SIGNUP_RESULT)
+        content = WaitlistResponse.model_validate(model.model_dump())
+        return JSONResponse(jsonable_encoder(content)).body
+
+    benchmark(render)
+
+
+@pytest.mark.benchmark(group="signup response")
+def test_render_signup_response_orjson(benchmark):
+    """What ``join_waitlist`` does now."""
+    body = benchmark(lambda: ORJSONResponse(SIGNUP_RESULT).body)
+    assert body == JSONResponse(jsonable_encoder(SIGNUP_RESULT)).body
+
+
+def test_service_add_email(benchmark):
+    service = create_waitlist_service(
+        FirestoreWaitlistRepository(client=FakeAsyncClient())
+    )
+    loop = asyncio.new_event_loop()
+    emails = (f"micro{i}@example.com" for i in itertools.count())
+    try:
+        benchmark(lambda: loop.run_until_complete(service.add_email(next(emails))))
+    finally:
+        loop.close()
+
+
+def test_post_signup(benchmark, client):
+    emails = (f"api{i}@example.com" for i in itertools.count())
+    response = benchmark(
+        lambda: client.post("/api/waitlist", json={"email": next(emails)})
+    )
+    assert response.status_code == 200
+
+
+def test_post_duplicate_signup(benchmark, client):
+    client.post("/api/waitlist", json={"email": "dup@example.com"})
+    response = benchmark(
+        lambda: client.post("/api/waitlist", json={"email": "dup@example.com"})
+    )
+    assert response.status_code == 400
+
+
+def test_get_count(benchmark, client):
+    response = benchmark(lambda: client.get("/api/waitlist/count"))
+    assert response.status_code == 200
+
+
+def test_health(benchmark, client):
+    response = benchmark(lambda: client.get("/health"))
+    assert response.status_code == 200
@@ -0,0 +1,166 @@
+"""Maintenance commands for the waitlist.
+
+Usage:
+    uv run python cli.py rebuild-count [--list LIST_ID]
+    uv run python cli.py migrate-email-ids [--list LIST_ID] [--dry-run]
+    uv run python cli.py import FILE [--list LIST_ID] [--format csv|ndjson]
+                                     [--source NAME] [--report OUTCOMES.ndjson]
+    uv run python cli.py firestore-indexes [--output PATH]
+
+``--list`` picks a named waitlist (``/api/waitlists/{list_id}``); the default
+is the list of ``/api/waitlist``. ``import`` creates the named list if needed.
+
+With ``WAITLIST_ID_MODE=auto``, ``import`` looks addresses up and then writes
+them, so a signup of the same address in between can store it twice: run it
+while signups are paused. With ``email`` IDs each write is a create of the
+address's own document and the import is safe alongside signups.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.repositories import (  # noqa: E402
+    FirestoreWaitlistRepository,
+    create_repository,
+)
+from app.repositories.base import DEFAULT_LIST_ID, LIST_ID_PATTERN  # noqa: E402
+from app.repositories.firestore import indexes_document  # noqa: E402
+from app.services.bulk_import import BulkImporter  # noqa: E402
+from app.services.waitlist import AsyncWaitlistService  # noqa: E402
+
+# Deployed by `firebase deploy --only firestore:indexes` (see cloudbuild.yaml)
+INDEXES_FILE = Path(__file__).resolve().parent.parent / "firestore.indexes.json"
+
+
+async def rebuild_count(args: argparse.Namespace) -> None:
+    repository = FirestoreWaitlistRepository(list_id=args.list)
+    count = await repository.rebuild_counter()
+    print(json.dumps({"count": count, "num_shards": repository.num_shards}))
+
+
+async def migrate_email_ids(args: argparse.Namespace) -> None:
+    repository = FirestoreWaitlistRepository(list_id=args.list)
+    stats = await repository.migrate_to_email_ids(dry_run=args.dry_run)
+    print(json.dumps({"dry_run": args.dry_run, **stats}))
+
+
+async def _file_lines(path: str):
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8-sig")
+    try:
+        for line in handle:
+            yield line.rstrip("\r\n")
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+async def import_waitlist(args: argparse.Namespace) -> None:
+    fmt = args.format
+    if fmt is None:
+        fmt = "ndjson" if args.file.endswith((".ndjson", ".jsonl")) else "csv"
+
+    repository = create_repository()
+    if args.list != DEFAULT_LIST_ID:
+        # Served at /api/waitlists/{list_id} once registered
+        await repository.create_list(args.list)
+    service = AsyncWaitlistService(repository.for_list(args.list))
+    importer = BulkImporter(service, source=args.source)
+    report = await importer.run(_file_lines(args.file), fmt)
+
+    rows = report.pop("rows")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as out:
+            for row in rows:
+                out.write(json.dumps(row) + "\n")
+    print(json.dumps(report))
+
+
+async def firestore_indexes(args: argparse.Namespace) -> None:
+    with open(args.output, "w", encoding="utf-8") as out:
+        json.dump(indexes_document(), out, indent=2)
+        out.write("\n")
+    print(json.dumps({"output": str(args.output)}))
+
+
+def _list_id(value: str) -> str:
+    if value != DEFAULT_LIST_ID and not re.match(LIST_ID_PATTERN, value):
+        raise argparse.ArgumentTypeError(
+            f"invalid list ID {value!r}: lowercase letters, digits and hyphens, "
+            "up to 63 characters"
+        )
+    return value
+
+
+def _add_list_argument(command: argparse.ArgumentParser) -> None:
+    command.add_argument(
+        "--list",
+        type=_list_id,
+        default=DEFAULT_LIST_ID,
+        help="Named waitlist to work on",
+    )
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Waitlist maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-count", help="Seed or repair the sharded waitlist counter"
+    )
+    _add_list_argument(rebuild)
+    rebuild.set_defaults(handler=rebuild_count)
+
+    migrate = commands.add_parser(
+        "migrate-email-ids",
+        help="Rewrite auto-ID waitlist entries as email-keyed documents",
+    )
+    migrate.add_argument(
+        "--dry-run", action="store_true", help="Report what would change only"
+    )
+    _add_list_argument(migrate)
+    migrate.set_defaults(handler=migrate_email_ids)
+
+    importer = commands.add_parser(
+        "import",
+        help="Bulk-import addresses from a CSV or NDJSON file",
+        description="Bulk-import addresses from a CSV or NDJSON file. With "
+        "WAITLIST_ID_MODE=auto, run it while signups are paused: an address "
+        "signing up during the import can be stored twice.",
+    )
+    importer.add_argument("file", help="Input file, or - for stdin")
+    importer.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        help="Input format (default: from the file extension, else csv)",
+    )
+    importer.add_argument(
+        "--source", default="import", help="Value stored in each entry's source"
+    )
+    importer.add_argument("--report", help="Write per-row outcomes as NDJSON here")
+    _add_list_argument(importer)
+    importer.set_defaults(handler=import_waitlist)
+
+    indexes = commands.add_parser(
+        "firestore-indexes",
+        help="Regenerate firestore.indexes.json from the listing queries",
+    )
+    indexes.add_argument("--output", default=INDEXES_FILE, help="Where to write it")
+    indexes.set_defaults(handler=firestore_indexes)
+
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
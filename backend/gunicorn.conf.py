@@ -0,0 +1,50 @@
+"""Gunicorn settings and hooks for the production server.
+
+Run as ``gunicorn main:app -c gunicorn.conf.py``. Every setting comes from
+``app.config.Settings`` (``SERVER_*`` in the environment); the worker model is
+described in ``app/core/server.py``.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.config import settings  # noqa: E402
+from app.core import server as worker_model  # noqa: E402
+
+bind = f"0.0.0.0:{settings.port}"
+workers = worker_model.worker_count()
+worker_class = "app.core.server.UvicornWorker"
+keepalive = settings.server_keepalive
+timeout = settings.server_timeout
+graceful_timeout = settings.server_graceful_timeout
+max_requests = settings.server_max_requests
+max_requests_jitter = worker_model.max_requests_jitter()
+preload_app = settings.server_preload
+
+loglevel = settings.log_level.lower()
+errorlog = "-"
+# Requests are logged by the app (see app/core/logs.py)
+accesslog = None
+
+
+def on_starting(server):
+    worker_model.preload_storage()
+
+
+def when_ready(server):
+    server.log.info(
+        f"Serving with {workers} workers (loop={worker_model.resolve_loop()}, "
+        f"http={worker_model.resolve_http()}, preload={preload_app}, "
+        f"max_requests={max_requests}+{max_requests_jitter})"
+    )
+
+
+def child_exit(server, worker):
+    """Drop an exited worker's live gauges from the merged Prometheus metrics."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -5,21 +5,36 @@ from pathlib import Path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
+import asyncio
 import logging
+import math
 import os
+import time
 from contextlib import asynccontextmanager
 
+import orjson
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+
+from app.api.endpoints import admin, debug, waitlist
+from app.config import settings
+from app.core.logs import RequestLogMiddleware, configure_logging
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.rate_limit import RateLimitMiddleware, create_rate_limiter
+from app.core.responses import (
+    ORJSONResponse,
+    cacheable_json_response,
+    etag,
+    json_bytes_response,
+)
+from app.repositories import StorageUnavailableError
+from app.services.startup import start_waitlist_service
 
-from app.api.endpoints import debug, waitlist
-
-# Configure logging - worker-safe approach
-# When running under Gunicorn, let Gunicorn handle the logging configuration
-# Only configure logging if running directly (e.g., with uvicorn for development)
-if __name__ == "__main__" or "gunicorn" not in os.environ.get("SERVER_SOFTWARE", ""):
-    logging.basicConfig(level=logging.INFO)
+# Logs go through a queue to a background thread in every worker, so request
+# handlers never wait on stdout (see app/core/logs.py)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -40,10 +55,55 @@ logger.info(f"Python path: {sys.executable}")
 logger.info(f"Working directory: {os.getcwd()}")
 logger.info("=" * 50)
 
+# Probe and root payloads are fixed for the life of the process, so they are
+# serialized once here. /health only appends its timestamp per request.
+ROOT_PAYLOAD = orjson.dumps({"message": "Welcome to API"})
+ALIVE_PAYLOAD = orjson.dumps({"status": "alive"})
+READY_PAYLOAD = orjson.dumps({"status": "ready"})
+STARTING_PAYLOAD = orjson.dumps({"status": "starting"})
+UNAVAILABLE_PAYLOAD = orjson.dumps({"status": "unavailable"})
+HEALTH_PAYLOAD_PREFIX = (
+    orjson.dumps(
+        {
+            "status": "healthy",
+            "service": "backend",
+            "port": os.getenv("PORT", 8000),
+            "firebase_project": os.getenv("FIREBASE_PROJECT_ID", "not set"),
+            "firestore_database": os.getenv("FIRESTORE_DATABASE_ID", "not set"),
+            "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
+            "working_directory": os.getcwd(),
+            "message": "🚀 Backend is running!",
+        }
+    )[:-1]
+    + b',"timestamp":'
+)
+# Validators for conditional GETs. /health differs only in its timestamp, so
+# its tag is weak and covers the fixed fields.
+ROOT_ETAG = etag(ROOT_PAYLOAD)
+HEALTH_ETAG = etag(HEALTH_PAYLOAD_PREFIX, weak=True)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: build the shared service and open its storage connection (the
+    # Firestore channel) before the worker accepts traffic, so no user request
+    # pays for initialization
+    app.state.ready = False
+    app.state.waitlist_service = None
+    app.state.notifier = None
+    app.state.health_monitor = None
+    app.state.count_broadcaster = None
+    app.state.rate_limiter = (
+        create_rate_limiter() if settings.rate_limit_enabled else None
+    )
+    # Guards building the service on first use if this start fails
+    app.state.startup_lock = asyncio.Lock()
+    try:
+        await start_waitlist_service(app.state)
+    except Exception as e:
+        # Stay up but unready; the service is built on first use instead
+        logger.error(f"Storage warm-up failed: {str(e)}")
+
     logger.info("✅ FastAPI application startup complete!")
     logger.info("🔥 Backend ready to accept requests")
     logger.info(f"🌐 Health check available at: /health")
@@ -51,10 +111,39 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("🛑 Backend shutting down")
+    app.state.ready = False
+    if app.state.health_monitor is not None:
+        await app.state.health_monitor.stop()
+        app.state.health_monitor = None
+    if app.state.notifier is not None:
+        await app.state.notifier.stop()
+        app.state.notifier = None
+    if app.state.count_broadcaster is not None:
+        await app.state.count_broadcaster.stop()
+        app.state.count_broadcaster = None
+    service = app.state.waitlist_service
+    if service is not None:
+        # Write out any signups still queued before the worker exits
+        await service.close()
+    app.state.waitlist_service = None
+    if app.state.rate_limiter is not None:
+        await app.state.rate_limiter.close()
+        app.state.rate_limiter = None
+    # Firebase is only imported once something has used Firestore
+    firebase = sys.modules.get("app.core.firebase")
+    if firebase is not None:
+        await firebase.close_firestore_clients()
+
+
+app = FastAPI(
+    title="API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
-
-app = FastAPI(title="API", version="1.0.0", lifespan=lifespan)
-
+# Added before CORS so CORS stays outermost and 429s carry its headers too
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[os.getenv("FRONTEND_URL", "http://localhost:5173")],
@@ -62,32 +151,73 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so request timings include the other middleware and 429s
+app.add_middleware(RequestLogMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(waitlist.router, prefix="/api")
 app.include_router(debug.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+
+
+@app.exception_handler(StorageUnavailableError)
+async def storage_unavailable(request: Request, exc: StorageUnavailableError):
+    """Answer 503 while storage is failing, telling the client when to retry."""
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": "We're busy right now. Please try again in a moment."},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
 
 
 @app.get("/")
-async def root():
-    return {"message": "Welcome to API"}
+async def root(request: Request):
+    return cacheable_json_response(
+        request, ROOT_PAYLOAD, settings.root_max_age, tag=ROOT_ETAG
+    )
 
 
 @app.get("/health")
-async def health_check():
-    import time
-
-    return {
-        "status": "healthy",
-        "service": "backend",
-        "timestamp": time.time(),
-        "port": os.getenv("PORT", 8000),
-        "firebase_project": os.getenv("FIREBASE_PROJECT_ID", "not set"),
-        "firestore_database": os.getenv("FIRESTORE_DATABASE_ID", "not set"),
-        "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
-        "working_directory": os.getcwd(),
-        "message": "🚀 Backend is running!",
-    }
+async def health_check(request: Request):
+    return cacheable_json_response(
+        request,
+        HEALTH_PAYLOAD_PREFIX + orjson.dumps(time.time()) + b"}",
+        settings.health_max_age,
+        tag=HEALTH_ETAG,
+    )
+
+
+@app.get("/livez")
+async def liveness_check():
+    """Report that the worker's event loop is serving requests; no I/O."""
+    return json_bytes_response(ALIVE_PAYLOAD)
+
+
+@app.get("/readyz")
+async def readiness_check():
+    """Report whether this worker can serve traffic.
+
+    Unready until startup warm-up has finished, and while the background
+    storage ping's breaker is open. Never touches storage itself.
+    """
+    if not getattr(app.state, "ready", False):
+        return json_bytes_response(STARTING_PAYLOAD, status_code=503)
+    monitor = getattr(app.state, "health_monitor", None)
+    if monitor is not None and not monitor.healthy:
+        return json_bytes_response(
+            UNAVAILABLE_PAYLOAD,
+            status_code=503,
+            headers={"Retry-After": str(int(monitor.interval))},
+        )
+    return json_bytes_response(READY_PAYLOAD)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics, merged across gunicorn workers in multiprocess mode."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 
 if __name__ == "__main__":
@@ -4,11 +4,18 @@ import firebase_admin
 import pytest
 
 import app.core.firebase
+from app.config import settings
 
 
 @pytest.fixture(autouse=True)
 def setup_test_environment(monkeypatch):
     """Automatically set up test environment for all tests."""
+    # Run offline against the in-memory backend; set TEST_STORAGE_BACKEND=firestore
+    # to run the API tests against the test project below instead
+    monkeypatch.setattr(
+        settings, "storage_backend", os.getenv("TEST_STORAGE_BACKEND", "memory")
+    )
+
     # Ensure we're using the test project
     monkeypatch.setenv("FIREBASE_PROJECT_ID", "multivac-internal-dev")
     # Use test database if specified, otherwise fall back to main database
@@ -18,6 +25,7 @@ def setup_test_environment(monkeypatch):
     # Reset Firebase singleton before each test
     app.core.firebase._firebase_app = None
     app.core.firebase._firestore_client = None
+    app.core.firebase._async_firestore_client = None
 
     # Delete all Firebase apps to avoid "app already exists" errors
     try:
@@ -31,6 +39,7 @@ def setup_test_environment(monkeypatch):
     # Reset Firebase singleton after each test
     app.core.firebase._firebase_app = None
     app.core.firebase._firestore_client = None
+    app.core.firebase._async_firestore_client = None
 
     # Clean up Firebase apps after each test
     try:
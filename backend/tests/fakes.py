@@ -0,0 +1,419 @@
+"""In-process stand-ins used by tests: the async Firestore client and a clock."""
+
+import asyncio
+import itertools
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from google.api_core import exceptions as gcp_exceptions
+from google.cloud.firestore_v1.transforms import Increment
+
+
+def _apply(
+    current: Optional[Dict[str, Any]], data: Dict[str, Any], merge: bool
+) -> Dict[str, Any]:
+    result = dict(current or {}) if merge else {}
+    for field, value in data.items():
+        if isinstance(value, Increment):
+            result[field] = result.get(field, 0) + value.value
+        else:
+            result[field] = value
+    return result
+
+
+_COMPARISONS = {
+    "==": lambda actual, value: actual == value,
+    "in": lambda actual, value: actual in value,
+    "<": lambda actual, value: actual < value,
+    "<=": lambda actual, value: actual <= value,
+    ">": lambda actual, value: actual > value,
+    ">=": lambda actual, value: actual >= value,
+}
+
+
+def _matches(actual: Any, op: str, value: Any) -> bool:
+    if op not in ("==", "in") and actual is None:
+        # Like Firestore, a range filter skips documents without the field
+        return False
+    return _COMPARISONS[op](actual, value)
+
+
+class FakeSnapshot:
+    def __init__(self, reference: "FakeDocumentReference", data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocumentReference:
+    def __init__(self, collection: "FakeCollection", doc_id: str):
+        self._collection = collection
+        self._client = collection._client
+        self.id = doc_id
+        self.path = f"{collection.path}/{doc_id}"
+
+    def collection(self, name: str) -> "FakeCollection":
+        return FakeCollection(self._client, f"{self.path}/{name}")
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        return self._collection._docs.get(self.id)
+
+    def _write(self, data: Dict[str, Any], merge: bool = False) -> None:
+        data = self._collection._docs[self.id] = _apply(self._read(), data, merge)
+        for watch in list(self._client._watches):
+            watch._written(self._collection.path, self.id, data)
+
+    async def get(self, transaction=None) -> FakeSnapshot:
+        await self._client._round_trip()
+        return FakeSnapshot(self, self._read())
+
+    async def set(self, data: Dict[str, Any], merge: bool = False) -> None:
+        await self._client._round_trip()
+        self._write(data, merge)
+
+    async def delete(self) -> None:
+        await self._client._round_trip()
+        self._collection._docs.pop(self.id, None)
+
+
+class FakeAggregationQuery:
+    def __init__(self, query: "FakeQuery"):
+        self._query = query
+
+    async def get(self, transaction=None):
+        await self._query._client._round_trip()
+        return [[SimpleNamespace(alias="count", value=len(self._query._matches()))]]
+
+
+class FakeQuery:
+    def __init__(self, collection: "FakeCollection"):
+        self._collection = collection
+        self._client = collection._client
+        self._filters: List[tuple] = []
+        self._orders: List[tuple] = []
+        self._start_after: Optional[Dict[str, Any]] = None
+        self._offset = 0
+        self._limit: Optional[int] = None
+        self._fields: Optional[List[str]] = None
+
+    def _copy(self) -> "FakeQuery":
+        query = FakeQuery(self._collection)
+        query._filters = list(self._filters)
+        query._orders = list(self._orders)
+        query._start_after = self._start_after
+        query._offset = self._offset
+        query._limit = self._limit
+        query._fields = self._fields
+        return query
+
+    def where(self, field: str, op: str, value: Any) -> "FakeQuery":
+        if op not in _COMPARISONS:
+            raise NotImplementedError(f"FakeQuery does not support {op!r}")
+        if op == "in" and len(value) > 30:
+            raise gcp_exceptions.InvalidArgument("'in' supports up to 30 values")
+        query = self._copy()
+        query._filters.append((field, op, value))
+        return query
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "FakeQuery":
+        query = self._copy()
+        query._orders.append((field, direction))
+        return query
+
+    def start_after(self, values: Dict[str, Any]) -> "FakeQuery":
+        query = self._copy()
+        query._start_after = values
+        return query
+
+    def offset(self, offset: int) -> "FakeQuery":
+        query = self._copy()
+        query._offset = offset
+        return query
+
+    def limit(self, limit: int) -> "FakeQuery":
+        query = self._copy()
+        query._limit = limit
+        return query
+
+    def select(self, field_paths: List[str]) -> "FakeQuery":
+        query = self._copy()
+        query._fields = list(field_paths)
+        return query
+
+    def count(self) -> FakeAggregationQuery:
+        return FakeAggregationQuery(self)
+
+    @staticmethod
+    def _field(doc_id: str, data: Dict[str, Any], field: str) -> Any:
+        return doc_id if field == "__name__" else data.get(field)
+
+    def _after_cursor(self, doc_id: str, data: Dict[str, Any]) -> bool:
+        for field, direction in self._orders:
+            value = self._field(doc_id, data, field)
+            cursor = self._start_after[field]
+            if value != cursor:
+                return value < cursor if direction == "DESCENDING" else value > cursor
+        return False
+
+    def _accepts(self, data: Dict[str, Any]) -> bool:
+        return all(
+            _matches(data.get(field), op, value) for field, op, value in self._filters
+        )
+
+    def _matches(self) -> List[tuple]:
+        items = [
+            (doc_id, data)
+            for doc_id, data in self._collection._docs.items()
+            if self._accepts(data)
+        ]
+        for field, direction in reversed(self._orders):
+            items.sort(
+                key=lambda item: self._field(item[0], item[1], field),
+                reverse=direction == "DESCENDING",
+            )
+        if self._start_after is not None:
+            items = [item for item in items if self._after_cursor(*item)]
+        # Like Firestore, documents skipped by an offset are still read
+        self._client.reads += min(self._offset, len(items))
+        items = items[self._offset :]
+        if self._limit is not None:
+            items = items[: self._limit]
+        self._client.reads += len(items)
+        return items
+
+    async def get(self, transaction=None) -> List[FakeSnapshot]:
+        matches = self._matches()
+        await self._client._round_trip(documents=self._offset + len(matches))
+        if self._fields is not None:
+            matches = [
+                (doc_id, {f: data[f] for f in self._fields if f in data})
+                for doc_id, data in matches
+            ]
+        return [
+            FakeSnapshot(self._collection.document(doc_id), dict(data))
+            for doc_id, data in matches
+        ]
+
+    async def stream(self, transaction=None):
+        for snapshot in await self.get(transaction=transaction):
+            yield snapshot
+
+    def on_snapshot(self, callback) -> "FakeWatch":
+        return FakeWatch(self, callback)
+
+
+class FakeWatch:
+    """Listener returned by ``FakeQuery.on_snapshot``, like the synchronous
+    client's ``Watch``: the callback gets the matching documents as ADDED
+    changes at once, then a change for each later write that matches. It runs
+    on the writer's thread instead of a watch thread.
+    """
+
+    def __init__(self, query: FakeQuery, callback):
+        self._query = query
+        self._callback = callback
+        self._ids = set()
+        query._client._watches.append(self)
+        self._notify(query._matches())
+
+    def _notify(self, items) -> None:
+        changes = []
+        for doc_id, data in items:
+            kind = "MODIFIED" if doc_id in self._ids else "ADDED"
+            self._ids.add(doc_id)
+            snapshot = FakeSnapshot(self._query._collection.document(doc_id), data)
+            changes.append(
+                SimpleNamespace(type=SimpleNamespace(name=kind), document=snapshot)
+            )
+        if changes:
+            self._callback(
+                [change.document for change in changes], changes, datetime.utcnow()
+            )
+
+    def _written(self, path: str, doc_id: str, data: Dict[str, Any]) -> None:
+        if path == self._query._collection.path and self._query._accepts(data):
+            self._notify([(doc_id, dict(data))])
+
+    def unsubscribe(self) -> None:
+        if self in self._query._client._watches:
+            self._query._client._watches.remove(self)
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, client: "FakeAsyncClient", path: str):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+        self._docs: Dict[str, Dict[str, Any]] = client._store.setdefault(path, {})
+        super().__init__(self)
+
+    def document(self, doc_id: Optional[str] = None) -> FakeDocumentReference:
+        return FakeDocumentReference(self, doc_id or self._client._next_id())
+
+    async def add(self, data: Dict[str, Any]):
+        await self._client._round_trip()
+        doc_ref = self.document()
+        doc_ref._write(data)
+        return datetime.utcnow(), doc_ref
+
+
+class FakeWriteBatch:
+    """Buffers writes and applies them atomically on commit, like a WriteBatch."""
+
+    def __init__(self, client: "FakeAsyncClient"):
+        self._client = client
+        self._checks: List[Callable[[], None]] = []
+        self._writes: List[Callable[[], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._writes)
+
+    def _clean_up(self) -> None:
+        self._checks = []
+        self._writes = []
+
+    async def commit(self) -> None:
+        await self._client._round_trip()
+        # Check every precondition before applying anything so a failed commit
+        # leaves the store untouched.
+        try:
+            for check in self._checks:
+                check()
+            for write in self._writes:
+                write()
+        finally:
+            self._clean_up()
+
+    def create(self, reference: FakeDocumentReference, data: Dict[str, Any]):
+        def check():
+            if reference._read() is not None:
+                raise gcp_exceptions.AlreadyExists(f"{reference.path} already exists")
+
+        self._checks.append(check)
+        self._writes.append(lambda: reference._write(data))
+
+    def set(self, reference: FakeDocumentReference, data: Dict[str, Any], merge=False):
+        self._writes.append(lambda: reference._write(data, merge))
+
+    def update(self, reference: FakeDocumentReference, data: Dict[str, Any]):
+        def check():
+            if reference._read() is None:
+                raise gcp_exceptions.NotFound(f"{reference.path} does not exist")
+
+        self._checks.append(check)
+        self._writes.append(lambda: reference._write(data, merge=True))
+
+    def delete(self, reference: FakeDocumentReference):
+        self._writes.append(lambda: reference._collection._docs.pop(reference.id, None))
+
+
+class FakeTransaction(FakeWriteBatch):
+    """A write batch driven through the private hooks ``async_transactional`` uses,
+    so service code runs unchanged against the fake.
+    """
+
+    def __init__(self, client: "FakeAsyncClient"):
+        super().__init__(client)
+        self._max_attempts = 5
+        self._read_only = False
+        self._id = None
+
+    def _clean_up(self) -> None:
+        super()._clean_up()
+        self._id = None
+
+    async def _begin(self, retry_id=None) -> None:
+        self._id = b"fake-transaction"
+
+    async def _rollback(self) -> None:
+        self._clean_up()
+
+    async def _commit(self) -> None:
+        await self.commit()
+
+    async def get(self, ref_or_query):
+        return await ref_or_query.get(transaction=self)
+
+
+class FakeAsyncClient:
+    """Dict-backed async client that can simulate network latency.
+
+    ``latency`` is paid per call and ``document_latency`` per document a query
+    reads, including ones skipped by an offset. ``blocking=True`` sleeps with
+    ``time.sleep`` instead of ``asyncio.sleep`` to mimic a synchronous client
+    being called from an async route. ``calls`` and ``reads`` count round-trips
+    and billed document reads.
+
+    Exceptions appended to ``faults`` are raised by the next round-trips, one
+    each, before any data is touched; ``stall`` adds a delay to every call to
+    simulate a backend that has stopped answering. Queries also take
+    ``on_snapshot`` listeners, which the real async client does not.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        blocking: bool = False,
+        document_latency: float = 0.0,
+    ):
+        self.latency = latency
+        self.document_latency = document_latency
+        self.blocking = blocking
+        self.calls = 0
+        self.reads = 0
+        self.faults: List[BaseException] = []
+        self.stall = 0.0
+        self._store: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._ids = itertools.count(1)
+        self._watches: List["FakeWatch"] = []
+
+    def _next_id(self) -> str:
+        return f"doc{next(self._ids):08d}"
+
+    async def _round_trip(self, documents: int = 0) -> None:
+        self.calls += 1
+        if self.faults:
+            raise self.faults.pop(0)
+        delay = self.latency + documents * self.document_latency + self.stall
+        if delay <= 0:
+            return
+        if self.blocking:
+            time.sleep(delay)
+        else:
+            await asyncio.sleep(delay)
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self, name)
+
+    async def get_all(self, references, field_paths=None, transaction=None):
+        await self._round_trip()
+        for reference in references:
+            yield FakeSnapshot(reference, reference._read())
+
+    def transaction(self) -> FakeTransaction:
+        return FakeTransaction(self)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeClock:
+    """Monotonic clock for code that takes a ``clock``; tests move ``now``."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
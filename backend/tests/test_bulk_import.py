@@ -0,0 +1,98 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.repositories import FirestoreWaitlistRepository
+from app.services.bulk_import import BulkImporter
+from app.services.email_index import EmailIndex
+from app.services.waitlist import AsyncWaitlistService
+from main import app
+from tests.fakes import FakeAsyncClient
+
+
+async def _lines(text: str):
+    for line in text.splitlines():
+        yield line
+
+
+@pytest.mark.parametrize("id_mode", ["auto", "email"])
+@pytest.mark.asyncio
+async def test_import_reports_each_row(id_mode):
+    """Test rows are validated, deduplicated and checked against existing entries."""
+    client = FakeAsyncClient()
+    service = AsyncWaitlistService(
+        FirestoreWaitlistRepository(client=client, id_mode=id_mode)
+    )
+    await service.rebuild_counter()
+    await service.add_email("existing@example.com")
+
+    csv_body = "name,email\nA,new@example.com\nB,Existing@example.com\n"
+    csv_body += "C,not-an-email\nD,NEW@example.com \n"
+    report = await BulkImporter(service, source="event").run(_lines(csv_body), "csv")
+
+    assert [(r["row"], r["status"]) for r in report["rows"]] == [
+        (2, "created"),
+        (3, "exists"),
+        (4, "invalid"),
+        (5, "duplicate"),
+    ]
+    assert report["counts"]["created"] == 1
+    assert (await service.get_email("new@example.com"))["source"] == "event"
+    assert await service.get_count() == 2
+
+
+@pytest.mark.asyncio
+async def test_imported_addresses_join_the_email_index():
+    """Test created and already-registered addresses are added to the index."""
+    repository = FirestoreWaitlistRepository(client=FakeAsyncClient(), id_mode="email")
+    index = EmailIndex(repository, capacity=1_000, error_rate=0.001)
+    service = AsyncWaitlistService(repository, email_index=index)
+    await repository.create(service.new_entry("old@example.com"))
+    index.ready = True  # empty: the index has not heard of old@ yet
+
+    await BulkImporter(service).run(_lines("new@example.com\nold@example.com"))
+
+    assert index.contains("new@example.com")
+    assert index.contains("old@example.com")
+    assert index.contains("other@example.com") is False
+
+
+@pytest.mark.asyncio
+async def test_import_writes_in_batches():
+    """Test a large import commits one batch per chunk of new addresses."""
+    client = FakeAsyncClient()
+    service = AsyncWaitlistService(
+        FirestoreWaitlistRepository(client=client, id_mode="email")
+    )
+    await service.rebuild_counter()
+    body = "\n".join(f'{{"email": "user{i}@example.com"}}' for i in range(1200))
+
+    calls_before = client.calls
+    report = await BulkImporter(service).run(_lines(body), "ndjson")
+
+    assert report["counts"]["created"] == 1200
+    # Three chunks of up to 499 entries: one get_all and one commit each
+    assert client.calls - calls_before == 6
+    assert await service.get_count() == 1200
+
+
+def test_import_endpoint_requires_admin_key(monkeypatch):
+    """Test the import endpoint authenticates and accepts a streamed body."""
+    monkeypatch.setattr(settings, "admin_api_key", "secret")
+    service = AsyncWaitlistService(
+        FirestoreWaitlistRepository(client=FakeAsyncClient())
+    )
+    monkeypatch.setattr(app.state, "waitlist_service", service, raising=False)
+    client = TestClient(app)
+
+    body = b"email\nbulk@example.com\n"
+    response = client.post("/api/admin/waitlist/import", content=body)
+    assert response.status_code == 401
+
+    response = client.post(
+        "/api/admin/waitlist/import",
+        content=body,
+        headers={"Authorization": "Bearer secret"},
+    )
+    assert response.status_code == 200
+    assert response.json()["counts"]["created"] == 1
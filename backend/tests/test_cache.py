@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import LRUCache, TTLValue
+from app.repositories import FirestoreWaitlistRepository
+from app.services.cache import WaitlistCache
+from app.services.waitlist import AsyncWaitlistService, DuplicateEmailError
+from tests.fakes import FakeAsyncClient, FakeClock
+
+
+def test_lru_cache_evicts_and_expires():
+    """Test the LRU drops the least recently used key and expired entries."""
+    clock = FakeClock()
+    cache = LRUCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now most recently used
+    cache.set("c", 3)
+    assert cache.lookup("b") == (False, None)
+
+    clock.now = 11
+    assert cache.lookup("a") == (False, None)
+    assert cache.stats.as_dict() == {"hits": 1, "misses": 2, "hit_ratio": 0.3333}
+
+
+@pytest.mark.asyncio
+async def test_ttl_value_loads_once_for_concurrent_callers():
+    """Test concurrent readers of an expired value share a single reload."""
+    loads = 0
+
+    async def loader():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    value = TTLValue(ttl=60)
+    assert (
+        await asyncio.gather(*(value.get_or_load(loader) for _ in range(5))) == [42] * 5
+    )
+    assert loads == 1
+
+
+@pytest.mark.asyncio
+async def test_service_cache_skips_firestore_for_repeats():
+    """Test repeat duplicates and count reads are answered without Firestore."""
+    client = FakeAsyncClient()
+    service = AsyncWaitlistService(
+        FirestoreWaitlistRepository(client=client), cache=WaitlistCache(count_ttl=60)
+    )
+    await service.rebuild_counter()
+    assert await service.get_count() == 0
+
+    await service.add_email("repeat@example.com")
+    calls_before = client.calls
+    for _ in range(3):
+        with pytest.raises(DuplicateEmailError):
+            await service.add_email("Repeat@example.com")
+    # The cached count was bumped locally by the signup
+    assert await service.get_count() == 1
+    assert (await service.get_email("repeat@example.com"))["email"] == (
+        "repeat@example.com"
+    )
+    assert client.calls == calls_before
+
+    # Misses are cached briefly, then a signup clears the negative entry
+    assert await service.get_email("new@example.com") is None
+    assert await service.get_email("new@example.com") is None
+    assert client.calls == calls_before + 1
+    await service.add_email("new@example.com")
+    assert (await service.get_email("new@example.com")) is not None
+
+    stats = service.cache.stats()
+    assert stats["registered_emails"]["hits"] >= 4
+    # Seeded by rebuild_counter, so both count reads were hits
+    assert stats["count"] == {"hits": 2, "misses": 0, "hit_ratio": 1.0}
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.repositories import FirestoreWaitlistRepository, InMemoryWaitlistRepository
+from app.services.count_stream import CountBroadcaster, count_events
+from app.services.waitlist import AsyncWaitlistService
+from main import app
+from tests.fakes import FakeAsyncClient
+
+
+@pytest.mark.asyncio
+async def test_signups_are_coalesced_and_fanned_out():
+    """Test one refresh serves every subscriber and a burst is read once."""
+    service = AsyncWaitlistService(InMemoryWaitlistRepository())
+    broadcaster = CountBroadcaster(service, min_interval=0.05)
+
+    queues = [broadcaster.subscribe() for _ in range(100)]
+    assert await asyncio.wait_for(queues[0].get(), 1) == 0
+
+    for i in range(10):
+        await service.add_email(f"user{i}@example.com")
+    await asyncio.sleep(0.2)
+
+    # Every subscriber holds only the latest count, however many changes
+    assert all(queue.qsize() == 1 for queue in queues)
+    assert [queue.get_nowait() for queue in queues] == [10] * 100
+    assert broadcaster.refreshes == 2
+
+    for queue in queues:
+        broadcaster.unsubscribe(queue)
+    assert broadcaster.stats()["subscribers"] == 0
+    await broadcaster.stop()
+
+
+@pytest.mark.asyncio
+async def test_listener_reports_signups_from_other_workers():
+    """Test entries stored by another worker reach this worker's subscribers."""
+    fake = FakeAsyncClient()
+    repository = FirestoreWaitlistRepository(client=fake, watch_client=fake)
+    broadcaster = CountBroadcaster(AsyncWaitlistService(repository), min_interval=0)
+    other_worker = AsyncWaitlistService(repository)
+
+    events = count_events(broadcaster, keepalive=5, max_duration=5)
+    assert await events.__anext__() == b"retry: 3000\n\n"
+    assert await events.__anext__() == b'event: count\ndata: {"count":0}\n\n'
+
+    await other_worker.add_email("person@example.com")
+    assert await events.__anext__() == b'event: count\ndata: {"count":1}\n\n'
+    assert broadcaster.stats()["listening"]
+
+    await events.aclose()
+    assert broadcaster.stats()["subscribers"] == 0
+    await broadcaster.stop()
+
+
+@pytest.mark.asyncio
+async def test_refreshes_outlive_the_last_subscriber_briefly():
+    """Test a client reconnecting within the idle timeout gets the count at once."""
+    service = AsyncWaitlistService(InMemoryWaitlistRepository())
+    broadcaster = CountBroadcaster(service, min_interval=0, idle_timeout=0.1)
+
+    queue = broadcaster.subscribe()
+    assert await asyncio.wait_for(queue.get(), 1) == 0
+    broadcaster.unsubscribe(queue)
+    assert broadcaster.stats()["running"]
+
+    queue = broadcaster.subscribe()
+    assert queue.get_nowait() == 0
+    assert broadcaster.refreshes == 1
+    broadcaster.unsubscribe(queue)
+
+    await asyncio.sleep(0.2)
+    assert not broadcaster.stats()["running"]
+    # Kept for the next subscriber until the restarted task reloads it
+    assert broadcaster.subscribe().get_nowait() == 0
+    await broadcaster.stop()
+
+
+def test_stream_endpoint_sends_events_and_ends(monkeypatch):
+    """Test the endpoint streams the count and closes after its duration."""
+    monkeypatch.setattr(settings, "count_stream_max_duration", 0.3)
+    monkeypatch.setattr(settings, "count_stream_keepalive", 0.1)
+    service = AsyncWaitlistService(InMemoryWaitlistRepository())
+    monkeypatch.setattr(app.state, "waitlist_service", service, raising=False)
+    monkeypatch.setattr(app.state, "count_broadcaster", None, raising=False)
+
+    with TestClient(app).stream("GET", "/api/waitlist/count/stream") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = response.read()
+
+    assert body.startswith(b'retry: 3000\n\nevent: count\ndata: {"count":0}\n\n')
+    assert b": keepalive\n\n" in body
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.core.bloom import BloomFilter
+from app.repositories import FirestoreWaitlistRepository
+from app.services import email_index
+from app.services.email_index import EmailIndex
+from app.services.waitlist import AsyncWaitlistService, DuplicateEmailError
+from tests.fakes import FakeAsyncClient
+
+
+def test_bloom_filter_is_sized_for_its_error_rate():
+    """Test the filter has no false negatives and about the configured rate."""
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"user{i}@example.com")
+
+    assert all(f"user{i}@example.com" in bloom for i in range(10_000))
+    false_positives = sum(f"other{i}@example.com" in bloom for i in range(10_000))
+    assert false_positives < 200
+    stats = bloom.stats()
+    assert stats["num_hashes"] == 7
+    assert stats["bytes_per_million"] == pytest.approx(1_198_000, rel=0.01)
+    assert stats["estimated_error_rate"] == pytest.approx(0.01, rel=0.2)
+
+
+def indexed_service(fake):
+    repository = FirestoreWaitlistRepository(
+        client=fake, id_mode="email", watch_client=fake
+    )
+    index = EmailIndex(repository, capacity=1_000, error_rate=0.001)
+    return AsyncWaitlistService(repository, email_index=index), index
+
+
+@pytest.mark.asyncio
+async def test_index_loads_stored_emails_and_follows_other_workers():
+    """Test the index loads existing addresses and hears of new ones."""
+    fake = FakeAsyncClient()
+    other_worker, _ = indexed_service(fake)
+    await other_worker.add_email("early@example.com")
+
+    service, index = indexed_service(fake)
+    assert index.contains("early@example.com") is None
+    await index.load()
+    assert index.stats()["items"] == 1
+    assert index.contains("early@example.com")
+
+    await other_worker.add_email("late@example.com")
+    await asyncio.sleep(0)  # the listener's callback is scheduled on the loop
+    assert index.contains("late@example.com")
+
+    await service.close()
+    assert not index.stats()["listening"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_addresses_skip_the_read():
+    """Test lookups of new addresses need no read and signups add none."""
+    fake = FakeAsyncClient()
+    service, index = indexed_service(fake)
+    await index.load()
+
+    calls = fake.calls
+    assert await service.get_email("person@example.com") is None
+    assert fake.calls == calls
+
+    await service.add_email("person@example.com")
+    calls = fake.calls
+    with pytest.raises(DuplicateEmailError):
+        await service.add_email("person@example.com")
+    assert fake.calls == calls + 1  # only the failed create, no confirming read
+    assert await service.get_count() == 1
+
+
+@pytest.mark.asyncio
+async def test_listener_is_restarted_from_a_recent_time(monkeypatch):
+    """Test the listener is replaced periodically and keeps following signups."""
+    monkeypatch.setattr(email_index, "LISTENER_REFRESH", timedelta(seconds=0.01))
+    fake = FakeAsyncClient()
+    other_worker, _ = indexed_service(fake)
+    service, index = indexed_service(fake)
+    index.start()
+    while not index.ready:
+        await asyncio.sleep(0.001)
+    first = index._watch
+
+    await asyncio.sleep(0.05)
+    assert index._watch is not first
+    assert fake._watches == [index._watch]  # the old listener was dropped
+
+    await other_worker.add_email("late@example.com")
+    await asyncio.sleep(0)
+    assert index.contains("late@example.com")
+
+    await service.close()
+    assert not fake._watches
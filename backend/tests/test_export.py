@@ -0,0 +1,93 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.repositories import FirestoreWaitlistRepository
+from app.services.waitlist import AsyncWaitlistService
+from main import app
+from tests.fakes import FakeAsyncClient
+
+
+async def _seed(service: AsyncWaitlistService, count: int) -> None:
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        entry = service.new_entry(f"user{i:03d}@example.com")
+        # Pairs of entries share a timestamp to exercise the ID tie-breaker
+        entry["created_at"] = start + timedelta(minutes=i // 2)
+        await service.repository.collection.document(f"id{i:03d}").set(entry)
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_cover_every_entry_once():
+    """Test page tokens walk the list newest first without skipping or repeating."""
+    client = FakeAsyncClient()
+    service = AsyncWaitlistService(FirestoreWaitlistRepository(client=client))
+    await _seed(service, 25)
+
+    seen, token, pages = [], None, 0
+    client.reads = 0
+    while True:
+        entries, token = await service.get_all_emails(limit=10, page_token=token)
+        seen.extend(entry["id"] for entry in entries)
+        pages += 1
+        if token is None:
+            break
+
+    assert seen == [f"id{i:03d}" for i in reversed(range(25))]
+    assert pages == 3
+    # Cursor paging reads only the returned documents
+    assert client.reads == 25
+
+
+@pytest.mark.asyncio
+async def test_stream_entries_resumes_across_pages():
+    """Test streaming yields every entry while fetching small pages."""
+    client = FakeAsyncClient()
+    service = AsyncWaitlistService(FirestoreWaitlistRepository(client=client))
+    await _seed(service, 7)
+
+    calls_before = client.calls
+    emails = [entry["email"] async for entry in service.stream_entries(page_size=3)]
+    assert len(emails) == len(set(emails)) == 7
+    assert client.calls - calls_before == 3
+
+
+@pytest.mark.asyncio
+async def test_invalid_page_token_is_rejected():
+    service = AsyncWaitlistService(
+        FirestoreWaitlistRepository(client=FakeAsyncClient())
+    )
+    with pytest.raises(ValueError, match="Invalid page token"):
+        await service.get_all_emails(page_token="not-a-token")
+
+
+def test_export_streams_ndjson_and_csv(monkeypatch):
+    """Test the export endpoint streams every entry in both formats."""
+    monkeypatch.setattr(settings, "admin_api_key", "secret")
+    service = AsyncWaitlistService(
+        FirestoreWaitlistRepository(client=FakeAsyncClient())
+    )
+    monkeypatch.setattr(app.state, "waitlist_service", service, raising=False)
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer secret"}
+
+    asyncio.run(_seed(service, 5))
+
+    response = client.get("/api/admin/waitlist/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["email"] for row in rows][:2] == [
+        "user004@example.com",
+        "user003@example.com",
+    ]
+    assert len(rows) == 5
+
+    response = client.get("/api/admin/waitlist/export?format=csv", headers=headers)
+    lines = response.text.splitlines()
+    assert lines[0] == "id,email,created_at,source,notified"
+    assert len(lines) == 6
@@ -0,0 +1,116 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import debug
+from app.config import settings
+from app.core import firebase
+from app.core.circuit import CircuitBreaker
+from app.repositories import FirestoreWaitlistRepository
+from app.services.health import HealthMonitor
+from main import app
+from tests.fakes import FakeAsyncClient, FakeClock
+
+
+def test_breaker_opens_and_recovers_through_one_trial():
+    """Test the breaker trips on repeated failures and half-opens after a wait."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    assert breaker.retry_after() == 10
+
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_monitor_pings_without_writing():
+    """Test a failing ping makes the worker unready and a success recovers it."""
+    fake = FakeAsyncClient()
+    repository = FirestoreWaitlistRepository(client=fake)
+    monitor = HealthMonitor(repository, interval=1, timeout=1, failure_threshold=2)
+
+    assert await monitor.check()
+    assert fake.calls == 1
+    assert not any(fake._store.values())
+
+    async def unreachable():
+        raise ConnectionError("channel closed")
+
+    repository.ping = unreachable
+    assert await monitor.check()
+    assert not await monitor.check()
+    assert monitor.stats()["last_error"] == "ConnectionError: channel closed"
+
+    del repository.ping
+    assert await monitor.check()
+    assert monitor.stats()["state"] == "closed"
+
+
+def test_probes_read_cached_state(monkeypatch):
+    """Test /livez never depends on storage and /readyz follows the breaker."""
+    with TestClient(app) as client:
+        monitor = client.app.state.health_monitor
+        for _ in range(settings.health_failure_threshold):
+            monitor.breaker.record_failure()
+
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json() == {"status": "unavailable"}
+        assert client.get("/livez").json() == {"status": "alive"}
+
+        monitor.breaker.record_success()
+        assert client.get("/readyz").json() == {"status": "ready"}
+
+
+def test_debug_endpoints_need_admin_key_and_are_rate_limited(monkeypatch):
+    """Test debug checks are closed without the key and limited per client."""
+    monkeypatch.setattr(settings, "admin_api_key", "secret")
+    monkeypatch.setattr(settings, "rate_limit_debug_burst", 2)
+    fake = FakeAsyncClient()
+    firebase._async_firestore_client = fake
+    headers = {"Authorization": "Bearer secret"}
+
+    with TestClient(app) as client:
+        assert client.get("/api/debug/firebase").status_code == 401
+
+        response = client.get("/api/debug/firebase", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["firebase_connection"]["can_read"] is True
+        assert not any(fake._store.values())  # the connection test writes nothing
+
+        assert client.get("/api/debug/waitlist", headers=headers).status_code == 200
+        response = client.get("/api/debug/waitlist", headers=headers)
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+
+
+def test_every_debug_route_needs_the_admin_key(monkeypatch):
+    """Test the mutating debug routes, such as rebuild-count, are closed too."""
+    monkeypatch.setattr(settings, "admin_api_key", "secret")
+    paths = [
+        f"/api{route.path}" for route in debug.router.routes if "POST" in route.methods
+    ]
+    assert "/api/debug/waitlist/rebuild-count" in paths
+
+    with TestClient(app) as client:
+        for path in paths:
+            assert client.post(path).status_code == 401
+
+        response = client.post(
+            "/api/debug/waitlist/rebuild-count",
+            headers={"Authorization": "Bearer secret"},
+        )
+        assert response.status_code == 200
+        assert response.json()["success"] is True
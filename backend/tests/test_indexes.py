@@ -0,0 +1,121 @@
+import itertools
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.repositories import FirestoreWaitlistRepository, InMemoryWaitlistRepository
+from app.repositories.base import FILTER_FIELDS, EntryFilter
+from app.repositories.firestore import indexes_document
+from app.services.waitlist import AsyncWaitlistService
+from main import app
+from tests.fakes import FakeAsyncClient
+
+INDEXES_FILE = Path(__file__).resolve().parents[2] / "firestore.indexes.json"
+FILTER_VALUES = {"source": "landing_page", "notified": False}
+
+
+def listing_filters():
+    """Every combination of equality filters, with and without a date range."""
+    for size in range(len(FILTER_FIELDS) + 1):
+        for combination in itertools.combinations(FILTER_FIELDS, size):
+            equalities = {field: FILTER_VALUES[field] for field in combination}
+            yield EntryFilter(**equalities)
+            yield EntryFilter(
+                **equalities,
+                created_from=datetime(2025, 1, 1),
+                created_to=datetime(2026, 1, 1),
+            )
+
+
+def needed_index(query):
+    """The composite index Firestore needs for a query, or None."""
+    equalities = sorted(field for field, op, _ in query._filters if op == "==")
+    ranges = {field for field, op, _ in query._filters if op not in ("==", "in")}
+    orders = [(field, d) for field, d in query._orders if field != "__name__"]
+    # Range filters must be on the first ordered field
+    assert ranges <= {orders[0][0]}
+    if not equalities:
+        return None
+    return [
+        *({"fieldPath": field, "order": "ASCENDING"} for field in equalities),
+        *({"fieldPath": field, "order": d} for field, d in orders),
+    ]
+
+
+def test_indexes_file_is_up_to_date():
+    """Test firestore.indexes.json is what `cli.py firestore-indexes` writes."""
+    assert json.loads(INDEXES_FILE.read_text()) == indexes_document()
+
+
+def test_every_listing_query_has_an_index():
+    """Test each filter combination the listing builds is served by an index."""
+    repository = FirestoreWaitlistRepository(client=FakeAsyncClient())
+    declared = [index["fields"] for index in indexes_document()["indexes"]]
+
+    for filters in listing_filters():
+        index = needed_index(repository._listing_query(filters, ["email"]))
+        assert index is None or index in declared, filters
+
+
+@pytest.mark.asyncio
+async def test_filtered_pages_project_fields():
+    """Test filters, projection and cursors agree across both backends."""
+    fake = FakeAsyncClient()
+    repositories = [
+        FirestoreWaitlistRepository(client=fake),
+        InMemoryWaitlistRepository(),
+    ]
+    for repository in repositories:
+        service = AsyncWaitlistService(repository)
+        for i in range(10):
+            entry = service.new_entry(
+                f"user{i}@example.com", source="ads" if i % 2 else "landing_page"
+            )
+            entry["created_at"] = datetime(2025, 1, 1 + i)
+            await repository.create(entry)
+
+        filters = EntryFilter(source="ads", created_from=datetime(2025, 1, 4))
+        entries, token = await service.get_all_emails(
+            2, filters=filters, fields=["email"]
+        )
+        rest, end = await service.get_all_emails(
+            2, token, filters=filters, fields=["email"]
+        )
+        assert [set(entry) for entry in entries] == [{"id", "email"}] * 2
+        assert [entry["email"] for entry in entries + rest] == [
+            "user9@example.com",
+            "user7@example.com",
+            "user5@example.com",
+            "user3@example.com",
+        ]
+        last_page, _ = await service.get_all_emails(2, end, filters=filters)
+        assert last_page == []
+
+
+def test_admin_listing_endpoint(monkeypatch):
+    """Test the listing is admin-only and validates its parameters."""
+    monkeypatch.setattr(settings, "admin_api_key", "secret")
+    headers = {"Authorization": "Bearer secret"}
+
+    with TestClient(app) as client:
+        assert client.get("/api/admin/waitlist").status_code == 401
+
+        client.post("/api/waitlist", json={"email": "listed@example.com"})
+        response = client.get(
+            "/api/admin/waitlist",
+            params={"source": "landing_page", "notified": "false", "fields": "email"},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["next_page_token"] is None
+        assert [set(entry) for entry in body["entries"]] == [{"id", "email"}]
+
+        response = client.get(
+            "/api/admin/waitlist", params={"fields": "password"}, headers=headers
+        )
+        assert response.status_code == 400
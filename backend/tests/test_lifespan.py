@@ -0,0 +1,71 @@
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core import firebase
+from app.repositories import InMemoryWaitlistRepository
+from main import app
+from tests.fakes import FakeAsyncClient
+
+
+def test_lifespan_warms_up_and_shares_service(monkeypatch):
+    """Test startup builds one service on the warmed client and shutdown closes it."""
+    monkeypatch.setattr(settings, "storage_backend", "firestore")
+    fake = FakeAsyncClient()
+    firebase._async_firestore_client = fake
+
+    with TestClient(app) as client:
+        assert client.get("/readyz").json() == {"status": "ready"}
+        service = client.app.state.waitlist_service
+        assert service.repository.db is fake
+        # The warm-up read happened before any request
+        assert fake.calls == 1
+
+        response = client.post("/api/waitlist", json={"email": "warm@example.com"})
+        assert response.status_code == 200
+        assert client.get("/api/waitlist/count").json() == {"count": 1}
+        assert client.app.state.waitlist_service is service
+
+    assert firebase._async_firestore_client is None
+    assert app.state.ready is False
+
+
+def test_readiness_false_when_warm_up_fails(monkeypatch):
+    """Test the app starts unready when Firestore cannot be initialized."""
+    monkeypatch.setattr(settings, "storage_backend", "firestore")
+    monkeypatch.delenv("FIREBASE_PROJECT_ID")
+
+    with TestClient(app) as client:
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json() == {"status": "starting"}
+        assert client.get("/api/waitlist/count").status_code == 503
+
+
+def test_service_started_on_first_use_after_failed_warm_up(monkeypatch):
+    """Test a request after a failed startup runs the lifespan's startup steps."""
+    monkeypatch.setattr(settings, "storage_backend", "firestore")
+    monkeypatch.delenv("FIREBASE_PROJECT_ID")
+
+    with TestClient(app) as client:
+        assert client.get("/readyz").status_code == 503
+
+        # Firestore becomes reachable
+        fake = FakeAsyncClient()
+        firebase._async_firestore_client = fake
+        assert client.get("/api/waitlist/count").json() == {"count": 0}
+        assert fake.calls >= 2  # the warm-up read, then the count
+
+        assert client.get("/readyz").json() == {"status": "ready"}
+        assert client.app.state.health_monitor is not None
+        assert client.app.state.health_monitor.repository.db is fake
+
+    assert client.app.state.health_monitor is None
+
+
+def test_storage_backend_selected_by_settings():
+    """Test the memory backend needs no Firestore client and starts ready."""
+    with TestClient(app) as client:
+        assert client.get("/readyz").json() == {"status": "ready"}
+        service = client.app.state.waitlist_service
+        assert isinstance(service.repository, InMemoryWaitlistRepository)
+        assert firebase._async_firestore_client is None
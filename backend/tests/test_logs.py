@@ -0,0 +1,69 @@
+import json
+import logging
+import queue
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core.logs import CloudLoggingFormatter, _DeferredQueueHandler
+from main import app
+
+
+def test_json_lines_are_structured_and_redacted():
+    """Test a record becomes a Cloud Logging entry with every email masked."""
+    record = logging.makeLogRecord(
+        {
+            "name": "app.test",
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": "Rejecting signup for %s",
+            "args": ("Person@Example.com",),
+            "httpRequest": {"requestUrl": "/api/x?email=other@example.org"},
+        }
+    )
+
+    entry = json.loads(CloudLoggingFormatter().format(record))
+
+    assert entry["severity"] == "WARNING"
+    assert entry["message"] == "Rejecting signup for P***@Example.com"
+    assert entry["httpRequest"] == {"requestUrl": "/api/x?email=o***@example.org"}
+    assert entry["logger"] == "app.test"
+
+
+def test_records_are_queued_unformatted():
+    """Test the caller only enqueues; message arguments are merged later."""
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("app.test.deferred")
+    logger.addHandler(_DeferredQueueHandler(log_queue))
+    logger.propagate = False
+    try:
+        logger.warning("Added %s", "person@example.com")
+    finally:
+        logger.handlers.clear()
+        logger.propagate = True
+
+    record = log_queue.get_nowait()
+    assert record.msg == "Added %s"
+    assert record.args == ("person@example.com",)
+
+
+def test_request_logs_sampled_by_route(monkeypatch, caplog):
+    """Test successful requests follow their route's rate and errors always log."""
+    monkeypatch.setattr(
+        settings, "log_sample_rates", {"/health": 0.0, "/api/waitlist": 0.0}
+    )
+    monkeypatch.setattr(settings, "log_sample_default", 1.0)
+    caplog.set_level(logging.INFO, logger="app.requests")
+
+    with TestClient(app) as client:
+        client.get("/health")
+        client.post("/api/waitlist", json={"email": "sampled@example.com"})
+        client.post("/api/waitlist", json={"email": "sampled@example.com"})
+        client.get("/readyz")
+
+    logged = [
+        (record.httpRequest["requestUrl"], record.httpRequest["status"])
+        for record in caplog.records
+        if record.name == "app.requests"
+    ]
+    assert logged == [("/api/waitlist", 400), ("/readyz", 200)]
@@ -0,0 +1,76 @@
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.repositories import FirestoreWaitlistRepository
+from app.services.waitlist import create_waitlist_service
+from main import app
+from tests.fakes import FakeAsyncClient
+
+
+def _sample(name, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_labels_requests_by_route():
+    """Test /metrics reports request timings under the route template."""
+    with TestClient(app) as client:
+        client.post("/api/waitlist", json={"email": "metrics@example.com"})
+        client.get("/api/waitlist/count")
+        client.get("/no/such/page")
+
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'http_request_duration_seconds_count{method="POST",'
+        'route="/api/waitlist",status="200"}' in body
+    )
+    assert 'route="/api/waitlist/count"' in body
+    assert 'route="unmatched",status="404"' in body
+    assert "/no/such/page" not in body
+
+
+@pytest.mark.asyncio
+async def test_storage_calls_and_cache_lookups_are_counted():
+    """Test each Firestore call is timed and cache hits and misses are counted."""
+    service = create_waitlist_service(
+        FirestoreWaitlistRepository(client=FakeAsyncClient())
+    )
+    creates = _sample(
+        "waitlist_storage_duration_seconds_count",
+        backend="firestore",
+        operation="create",
+    )
+    counts = _sample(
+        "waitlist_storage_duration_seconds_count",
+        backend="firestore",
+        operation="count",
+    )
+    hits = _sample("waitlist_cache_lookups_total", cache="count", result="hit")
+
+    await service.add_email("timed@example.com")
+    await service.get_count()
+    await service.get_count()
+
+    assert (
+        _sample(
+            "waitlist_storage_duration_seconds_count",
+            backend="firestore",
+            operation="create",
+        )
+        == creates + 1
+    )
+    assert (
+        _sample(
+            "waitlist_storage_duration_seconds_count",
+            backend="firestore",
+            operation="count",
+        )
+        == counts + 1
+    )
+    assert (
+        _sample("waitlist_cache_lookups_total", cache="count", result="hit") == hits + 1
+    )
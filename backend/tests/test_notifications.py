@@ -0,0 +1,208 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from app.config import settings
+from app.repositories import FirestoreWaitlistRepository, InMemoryWaitlistRepository
+from app.services.notifications import (
+    MailgunClient,
+    MailgunError,
+    MailgunRejectedError,
+    NotificationWorker,
+)
+from app.services.waitlist import AsyncWaitlistService
+from tests.fakes import FakeAsyncClient
+
+
+class FakeMailgun(ThreadingHTTPServer):
+    """Local HTTP server that records requests and answers with queued statuses."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeMailgunHandler)
+        self.requests = []
+        self.statuses = []
+        # Batches holding any of these addresses are answered 400
+        self.invalid = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v3"
+
+
+class FakeMailgunHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        form = parse_qs(body)
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        if self.server.invalid.intersection(form.get("to", [])):
+            status = 400
+        self.server.requests.append(
+            {
+                "path": self.path,
+                "authorization": self.headers["Authorization"],
+                "form": form,
+                "status": status,
+            }
+        )
+        payload = json.dumps({"message": "Queued. Thank you."}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def mailgun():
+    server = FakeMailgun()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _mailer(server: FakeMailgun) -> MailgunClient:
+    return MailgunClient(
+        api_key="key-test",
+        domain="mg.example.com",
+        from_email="hello@example.com",
+        base_url=server.url,
+        max_retries=2,
+        backoff=0.01,
+    )
+
+
+@pytest.mark.asyncio
+async def test_worker_sends_one_batch_and_marks_entries(mailgun):
+    """Test unnotified entries go out in one retried batch and are marked."""
+    repository = InMemoryWaitlistRepository()
+    service = AsyncWaitlistService(repository)
+    emails = [f"user{i}@example.com" for i in range(3)]
+    for email in emails:
+        await service.add_email(email)
+    mailgun.statuses = [503]
+
+    worker = NotificationWorker(repository, _mailer(mailgun), batch_size=10)
+    assert await worker.run_once() == 3
+    assert await worker.run_once() == 0
+    await worker.mailer.aclose()
+
+    assert len(mailgun.requests) == 2  # the 503 was retried
+    request = mailgun.requests[-1]
+    assert request["path"] == "/v3/mg.example.com/messages"
+    assert request["authorization"].startswith("Basic ")
+    assert sorted(request["form"]["to"]) == emails
+    assert set(json.loads(request["form"]["recipient-variables"][0])) == set(emails)
+    assert "%recipient.email%" in request["form"]["text"][0]
+    for email in emails:
+        assert (await repository.get(email))["notified"] is True
+
+
+@pytest.mark.asyncio
+async def test_rejected_address_does_not_block_later_entries(mailgun):
+    """Test a 400 is not retried and only the rejected address is set aside."""
+    repository = InMemoryWaitlistRepository()
+    service = AsyncWaitlistService(repository)
+    emails = [f"user{i}@example.com" for i in range(5)]
+    for email in emails:
+        await service.add_email(email)
+    mailgun.invalid = {emails[1]}
+
+    worker = NotificationWorker(repository, _mailer(mailgun), batch_size=10)
+    assert await worker.run_once() == 5
+    await worker.mailer.aclose()
+
+    assert worker.sent == 4 and worker.rejected == 1
+    delivered = [
+        to
+        for request in mailgun.requests
+        if request["status"] == 200
+        for to in request["form"]["to"]
+    ]
+    assert sorted(delivered) == emails[:1] + emails[2:]
+    assert await repository.list_unnotified(10) == []
+    bad = await repository.get(emails[1])
+    assert bad["notified"] is True
+    assert "HTTP 400" in bad["notification_error"]
+    assert "notification_error" not in await repository.get(emails[0])
+
+
+@pytest.mark.asyncio
+async def test_batch_rejected_as_a_whole_stays_unnotified(mailgun):
+    """Test nothing is marked when no part of a rejected batch gets through."""
+    repository = InMemoryWaitlistRepository()
+    for i in range(2):
+        await AsyncWaitlistService(repository).add_email(f"user{i}@example.com")
+    mailgun.statuses = [400, 400, 400, 401]
+
+    worker = NotificationWorker(repository, _mailer(mailgun))
+    with pytest.raises(MailgunRejectedError):
+        await worker.run_once()
+    # Other 4xx are settings problems: no retry, no split
+    with pytest.raises(MailgunError):
+        await worker.run_once()
+    await worker.mailer.aclose()
+
+    assert len(mailgun.requests) == 4
+    assert len(await repository.list_unnotified(10)) == 2
+
+
+@pytest.mark.asyncio
+async def test_named_lists_are_notified(mailgun, monkeypatch):
+    """Test registered and allowlisted lists get their confirmations too."""
+    monkeypatch.setattr(settings, "waitlist_lists", ["beta"])
+    repository = InMemoryWaitlistRepository()
+    await repository.create_list("launch")
+    for list_id in ("default", "launch", "beta"):
+        service = AsyncWaitlistService(repository.for_list(list_id))
+        await service.add_email(f"{list_id}@example.com")
+
+    worker = NotificationWorker(repository, _mailer(mailgun))
+    assert await worker.run_once() == 3
+    await worker.mailer.aclose()
+
+    assert sorted(to for r in mailgun.requests for to in r["form"]["to"]) == [
+        "beta@example.com",
+        "default@example.com",
+        "launch@example.com",
+    ]
+    for list_id in ("default", "launch", "beta"):
+        assert await repository.for_list(list_id).list_unnotified(10) == []
+
+
+def test_lease_outlasts_the_worst_case_send():
+    """Test the lease covers every attempt timing out between the longest waits."""
+    mailer = MailgunClient(api_key="key-test", domain="mg.example.com", max_retries=4)
+    assert mailer.max_send_seconds >= 5 * 10.0 + 4 * 0.5 * 2**3
+
+
+@pytest.mark.asyncio
+async def test_firestore_notified_flags_and_lease():
+    """Test Firestore marks entries in batches and grants the lease to one owner."""
+    repository = FirestoreWaitlistRepository(client=FakeAsyncClient())
+    service = AsyncWaitlistService(repository)
+    for i in range(3):
+        await service.add_email(f"user{i}@example.com")
+
+    pending = await repository.list_unnotified(2)
+    assert len(pending) == 2
+    await repository.mark_notified([entry["id"] for entry in pending])
+    remaining = await repository.list_unnotified(10)
+    assert len(remaining) == 1
+    assert remaining[0]["id"] not in {entry["id"] for entry in pending}
+
+    assert await repository.list_ids() == []
+    await repository.create_list("launch")
+    assert await repository.list_ids() == ["launch"]
+
+    assert await repository.acquire_lease("job", "worker-a", 60)
+    assert not await repository.acquire_lease("job", "worker-b", 60)
+    assert await repository.acquire_lease("job", "worker-a", 60)
+    assert await repository.acquire_lease("other", "worker-b", 60)
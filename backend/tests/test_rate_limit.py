@@ -0,0 +1,143 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.config import Settings, settings
+from app.core.rate_limit import (
+    MAX_INSPECTED_BODY,
+    MemoryBucketStore,
+    Rate,
+    RateLimiter,
+    RateLimitMiddleware,
+)
+from main import app
+from tests.fakes import FakeClock
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_refills_and_evicts():
+    """Test a bucket allows its burst, refills over time and stays bounded."""
+    clock = FakeClock()
+    store = MemoryBucketStore(max_keys=2, clock=clock)
+    rate = Rate(burst=2, per_minute=60)
+
+    assert (await store.take("a", rate))[0]
+    assert (await store.take("a", rate))[0]
+    allowed, retry_after = await store.take("a", rate)
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+
+    clock.now = 1.0
+    assert (await store.take("a", rate))[0]
+
+    await store.take("b", rate)
+    await store.take("c", rate)
+    assert len(store) == 2
+
+
+def test_rates_must_refill():
+    """Test a zero rate is refused at startup instead of dividing by zero."""
+    with pytest.raises(ValidationError):
+        Settings(rate_limit_ip_per_minute=0)
+    with pytest.raises(ValidationError):
+        Settings(rate_limit_debug_per_minute=-1)
+    with pytest.raises(ValueError):
+        Rate(burst=10, per_minute=0)
+
+
+def test_ip_limit_rejects_before_storage(monkeypatch):
+    """Test a client over its IP limit gets 429s that never reach the service."""
+    monkeypatch.setattr(settings, "rate_limit_ip_burst", 2)
+    monkeypatch.setattr(settings, "rate_limit_ip_per_minute", 1)
+
+    with TestClient(app) as client:
+        statuses = [
+            client.post("/api/waitlist", json={"email": f"ip{i}@example.com"})
+            for i in range(4)
+        ]
+        assert [r.status_code for r in statuses] == [200, 200, 429, 429]
+        assert statuses[-1].headers["Retry-After"] == "60"
+        repository = client.app.state.waitlist_service.repository
+        assert len(repository._by_email) == 2
+        # Other routes are not limited
+        assert client.get("/api/waitlist/count").status_code == 200
+
+
+def test_domain_limit_applies_across_addresses(monkeypatch):
+    """Test addresses at one domain share a bucket; other domains are unaffected."""
+    monkeypatch.setattr(settings, "rate_limit_domain_burst", 1)
+    monkeypatch.setattr(settings, "rate_limit_domain_per_minute", 1)
+
+    with TestClient(app) as client:
+        first = client.post("/api/waitlist", json={"email": "a@spam.example"})
+        second = client.post("/api/waitlist", json={"email": "B@SPAM.example"})
+        other = client.post("/api/waitlist", json={"email": "a@other.example"})
+
+    assert (first.status_code, second.status_code, other.status_code) == (
+        200,
+        429,
+        200,
+    )
+
+
+def test_forwarded_for_is_keyed_on_the_trusted_hop(monkeypatch):
+    """Test the client cannot pick its bucket by prepending X-Forwarded-For hops."""
+    monkeypatch.setattr(settings, "rate_limit_trust_forwarded_for", True)
+    monkeypatch.setattr(settings, "rate_limit_ip_burst", 1)
+    monkeypatch.setattr(settings, "rate_limit_ip_per_minute", 1)
+
+    with TestClient(app) as client:
+        statuses = [
+            client.post(
+                "/api/waitlist",
+                json={"email": f"hop{i}@example.com"},
+                headers={"X-Forwarded-For": f"10.0.0.{i}, 203.0.113.7"},
+            ).status_code
+            for i in range(2)
+        ]
+        other = client.post(
+            "/api/waitlist",
+            json={"email": "hop@example.com"},
+            headers={"X-Forwarded-For": "203.0.113.8"},
+        )
+
+    assert statuses == [200, 429]
+    assert other.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_body_reading_stops_at_the_cap():
+    """Test a large body is read only up to the cap, then streamed to the route."""
+    chunks = [b"x" * 1024] * 10
+    pending = list(chunks)
+    read_before_route = []
+    received = []
+
+    async def receive():
+        chunk = pending.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(pending)}
+
+    async def route(scope, receive, send):
+        read_before_route.append(len(chunks) - len(pending))
+        more_body = True
+        while more_body:
+            message = await receive()
+            received.append(message["body"])
+            more_body = message["more_body"]
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/waitlist",
+        "headers": [],
+        "client": ("127.0.0.1", 1),
+        "app": SimpleNamespace(
+            state=SimpleNamespace(rate_limiter=RateLimiter(MemoryBucketStore()))
+        ),
+    }
+    await RateLimitMiddleware(route)(scope, receive, None)
+
+    assert read_before_route == [MAX_INSPECTED_BODY // 1024 + 1]
+    assert b"".join(received) == b"".join(chunks)
@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.repositories import InMemoryWaitlistRepository
+from app.services.waitlist import AsyncWaitlistService, DuplicateEmailError
+
+
+@pytest.mark.asyncio
+async def test_memory_concurrent_signups_create_once():
+    """Test concurrent signups for one address leave exactly one entry."""
+    service = AsyncWaitlistService(InMemoryWaitlistRepository())
+
+    results = await asyncio.gather(
+        *(service.add_email("Same@Example.com") for _ in range(10)),
+        return_exceptions=True,
+    )
+
+    assert sum(not isinstance(r, Exception) for r in results) == 1
+    assert all(
+        isinstance(r, DuplicateEmailError) for r in results if isinstance(r, Exception)
+    )
+    assert await service.get_count() == 1
+    assert (await service.get_email("same@example.com"))["email"] == "same@example.com"
+
+
+@pytest.mark.asyncio
+async def test_memory_pages_follow_created_at_index():
+    """Test pages come newest first, with the ID breaking timestamp ties."""
+    repository = InMemoryWaitlistRepository()
+    service = AsyncWaitlistService(repository)
+    start = datetime(2025, 1, 1)
+    entries = []
+    for i in reversed(range(25)):
+        entry = service.new_entry(f"user{i:03d}@example.com")
+        entry["id"] = f"id{i:03d}"
+        entry["created_at"] = start + timedelta(minutes=i // 2)
+        entries.append(entry)
+    # Inserted out of order, so the sorted index has to place them
+    assert len(await repository.create_many(entries)) == 25
+
+    seen, token = [], None
+    while True:
+        page, token = await service.get_all_emails(limit=10, page_token=token)
+        seen.extend(entry["id"] for entry in page)
+        if token is None:
+            break
+    assert seen == [f"id{i:03d}" for i in reversed(range(25))]
+
+    streamed = [entry["id"] async for entry in service.stream_entries(page_size=4)]
+    assert streamed == seen
+
+
+@pytest.mark.asyncio
+async def test_memory_create_many_skips_existing():
+    """Test bulk creates only add addresses that are not stored yet."""
+    repository = InMemoryWaitlistRepository()
+    service = AsyncWaitlistService(repository)
+    await service.add_email("existing@example.com")
+
+    created = await repository.create_many(
+        [service.new_entry(e) for e in ("existing@example.com", "new@example.com")]
+    )
+
+    assert [entry["email"] for entry in created] == ["new@example.com"]
+    assert await repository.existing(
+        ["existing@example.com", "new@example.com", "other@example.com"]
+    ) == {"existing@example.com", "new@example.com"}
+    assert await repository.count() == 2
@@ -0,0 +1,122 @@
+import pytest
+from fastapi.testclient import TestClient
+from google.api_core import exceptions as gcp_exceptions
+
+from app.core.circuit import CircuitBreaker
+from app.core.resilience import RetryBudget, StorageGuard
+from app.repositories import FirestoreWaitlistRepository, StorageUnavailableError
+from app.repositories.firestore import TRANSIENT_ERRORS
+from app.services.waitlist import AsyncWaitlistService
+from main import app
+from tests.fakes import FakeAsyncClient, FakeClock
+
+
+def guarded_repository(fake, clock=None, **options):
+    breaker = CircuitBreaker(
+        options.pop("failure_threshold", 100),
+        reset_timeout=10,
+        clock=clock or FakeClock(),
+    )
+    guard = StorageGuard(TRANSIENT_ERRORS, breaker=breaker, backoff_base=0, **options)
+    return FirestoreWaitlistRepository(client=fake, id_mode="email", guard=guard)
+
+
+def unavailable():
+    return gcp_exceptions.ServiceUnavailable("connection reset")
+
+
+@pytest.mark.asyncio
+async def test_reads_are_retried_and_writes_are_not():
+    """Test a transient error is retried on a read but fails a write at once."""
+    fake = FakeAsyncClient()
+    repository = guarded_repository(fake)
+
+    fake.faults = [unavailable()]
+    assert await repository.get("person@example.com") is None
+    assert fake.calls == 2
+
+    fake.faults = [unavailable()]
+    with pytest.raises(StorageUnavailableError):
+        await repository.create({"email": "person@example.com"})
+    assert fake.calls == 3
+    assert not any(fake._store.values())
+
+    # An answer from Firestore is not retried or counted as a failure
+    await repository.create({"email": "person@example.com"})
+    with pytest.raises(Exception, match="already registered"):
+        await repository.create({"email": "person@example.com"})
+    assert repository.guard.breaker.stats()["consecutive_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_ends_stalled_calls():
+    """Test a call that outlives its deadline fails instead of waiting."""
+    fake = FakeAsyncClient()
+    fake.stall = 5.0
+    repository = guarded_repository(fake, read_timeout=0.05, max_attempts=1)
+
+    with pytest.raises(StorageUnavailableError, match="TimeoutError"):
+        await repository.get("person@example.com")
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_stops_retries_while_most_calls_fail():
+    """Test retries stop once failures have used up half the budget."""
+    fake = FakeAsyncClient()
+    repository = guarded_repository(
+        fake, max_attempts=5, budget=RetryBudget(max_tokens=4, ratio=0.5)
+    )
+    fake.faults = [unavailable() for _ in range(10)]
+
+    with pytest.raises(StorageUnavailableError):
+        await repository.get("person@example.com")
+    assert fake.calls == 2  # the second failure leaves no budget to retry
+
+    fake.faults = []
+    for _ in range(2):
+        await repository.get("person@example.com")
+    assert repository.guard.budget.allow_retry()
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_fast_until_a_trial_succeeds():
+    """Test repeated failures open the breaker and the next ping closes it."""
+    clock = FakeClock()
+    fake = FakeAsyncClient()
+    repository = guarded_repository(
+        fake, clock=clock, failure_threshold=2, max_attempts=1
+    )
+    fake.faults = [unavailable(), unavailable()]
+    for _ in range(2):
+        with pytest.raises(StorageUnavailableError):
+            await repository.count()
+
+    calls = fake.calls
+    with pytest.raises(StorageUnavailableError) as raised:
+        await repository.get("person@example.com")
+    assert fake.calls == calls  # rejected without a round-trip
+    assert raised.value.retry_after == 10
+
+    clock.now = 10
+    await repository.ping()
+    assert repository.guard.breaker.state == "closed"
+    assert await repository.count() == 0
+
+
+def test_open_breaker_answers_503_with_retry_after(monkeypatch):
+    """Test signups and the count are refused with Retry-After while open."""
+    fake = FakeAsyncClient()
+    repository = guarded_repository(fake, failure_threshold=1)
+    service = AsyncWaitlistService(repository)
+    monkeypatch.setattr(app.state, "waitlist_service", service, raising=False)
+    client = TestClient(app)
+
+    fake.faults = [unavailable()]
+    response = client.post("/api/waitlist", json={"email": "person@example.com"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "10"
+
+    response = client.get("/api/waitlist/count")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "10"
+    assert fake.calls == 1
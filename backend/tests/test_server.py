@@ -0,0 +1,65 @@
+import runpy
+import sys
+from pathlib import Path
+
+from gunicorn.config import Config
+
+from app.config import settings
+from app.core.server import available_cpus, preload_storage
+
+CONF_PATH = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+
+
+def _gunicorn_config() -> Config:
+    config = Config()
+    for name, value in runpy.run_path(str(CONF_PATH)).items():
+        if name in config.settings:
+            config.set(name, value)
+    return config
+
+
+def test_gunicorn_config_comes_from_settings(monkeypatch):
+    """Test gunicorn.conf.py maps the server settings onto gunicorn's."""
+    monkeypatch.setattr(settings, "port", 9000)
+    monkeypatch.setattr(settings, "server_workers", 3)
+    monkeypatch.setattr(settings, "server_max_requests", 5000)
+    monkeypatch.setattr(settings, "server_max_requests_jitter", None)
+    monkeypatch.setattr(settings, "server_preload", False)
+
+    config = _gunicorn_config()
+
+    assert config.bind == ["0.0.0.0:9000"]
+    assert config.workers == 3
+    assert config.keepalive == settings.server_keepalive
+    assert config.graceful_timeout == settings.server_graceful_timeout
+    assert config.max_requests == 5000
+    assert config.max_requests_jitter == 500
+    assert config.preload_app is False
+    assert config.worker_class_str == "app.core.server.UvicornWorker"
+
+    # Unset, the worker count follows the CPUs the container may use
+    monkeypatch.setattr(settings, "server_workers", None)
+    assert _gunicorn_config().workers == available_cpus()
+
+
+def test_available_cpus_respects_the_cgroup_limit(tmp_path):
+    """Test a container CPU quota caps the CPU count, rounded up."""
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("150000 100000\n")
+    assert available_cpus(cpu_max) == min(2, available_cpus(tmp_path / "missing"))
+
+    cpu_max.write_text("max 100000\n")
+    assert available_cpus(cpu_max) == available_cpus(tmp_path / "missing")
+
+
+def test_firestore_modules_are_preloaded(monkeypatch):
+    """Test the master imports the Firestore repository only for that backend."""
+    monkeypatch.delitem(sys.modules, "app.repositories.firestore", raising=False)
+    monkeypatch.setattr(settings, "server_preload", True)
+
+    preload_storage()
+    assert "app.repositories.firestore" not in sys.modules
+
+    monkeypatch.setattr(settings, "storage_backend", "firestore")
+    _gunicorn_config().on_starting(None)
+    assert "app.repositories.firestore" in sys.modules
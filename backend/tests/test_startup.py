@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+from benchmarks.bench_startup import (
+    IMPORT_BUDGET_SECONDS,
+    LAZY_MODULES,
+    RSS_BUDGET_MB,
+    measure_startup,
+)
+
+
+def test_app_import_is_lazy():
+    """Test importing main:app in a fresh process leaves the lazy modules out."""
+    startup = measure_startup()
+
+    eager = [name for name in LAZY_MODULES if name in startup["modules"]]
+    assert eager == []
+
+
+# Wall-clock and memory budgets depend on the machine: set TEST_STARTUP_BUDGET=1
+# to check them
+@pytest.mark.skipif(
+    not os.getenv("TEST_STARTUP_BUDGET"), reason="set TEST_STARTUP_BUDGET=1"
+)
+@pytest.mark.parametrize("storage_backend", ["memory", "firestore"])
+def test_cold_import_stays_within_budget(storage_backend):
+    """Test a cold import of the app and its storage stays fast and small."""
+    startup = measure_startup(storage_backend)
+
+    assert startup["seconds"] < IMPORT_BUDGET_SECONDS[storage_backend]
+    assert startup["rss_mb"] < RSS_BUDGET_MB[storage_backend]
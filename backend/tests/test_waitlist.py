@@ -1,13 +1,20 @@
 import uuid
 
+import pytest
 from fastapi.testclient import TestClient
 
 from main import app
 
-client = TestClient(app)
 
+@pytest.fixture
+def client():
+    # Entering the context keeps one event loop alive for the whole test, which
+    # the async Firestore client's gRPC channel is bound to.
+    with TestClient(app) as test_client:
+        yield test_client
 
-def test_join_waitlist_success():
+
+def test_join_waitlist_success(client):
     """Test successfully joining the waitlist."""
     # Use a unique email for each test run
     unique_email = f"test-{uuid.uuid4().hex[:8]}@example.com"
@@ -19,7 +26,7 @@ def test_join_waitlist_success():
     assert "timestamp" in data
 
 
-def test_join_waitlist_duplicate():
+def test_join_waitlist_duplicate(client):
     """Test joining waitlist with duplicate email."""
     # Use a unique email for this test
     email = f"duplicate-{uuid.uuid4().hex[:8]}@example.com"
@@ -34,7 +41,50 @@ def test_join_waitlist_duplicate():
     assert "already registered" in response2.json()["detail"]
 
 
-def test_join_waitlist_invalid_email():
+def test_join_waitlist_invalid_email(client):
     """Test joining waitlist with invalid email."""
     response = client.post("/api/waitlist", json={"email": "not-an-email"})
     assert response.status_code == 422
+
+
+def test_join_waitlist_replays_idempotent_retries(client):
+    """Test a retry with the same Idempotency-Key gets the original response."""
+    email = f"retry-{uuid.uuid4().hex[:8]}@example.com"
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+
+    first = client.post("/api/waitlist", json={"email": email}, headers=headers)
+    retry = client.post("/api/waitlist", json={"email": email}, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+
+    # Without the key, or with another one, it is still a duplicate
+    response = client.post("/api/waitlist", json={"email": email})
+    assert response.status_code == 400
+    response = client.post(
+        "/api/waitlist",
+        json={"email": f"other-{email}"},
+        headers=headers,
+    )
+    assert response.status_code == 422
+
+
+def test_count_and_probes_answer_conditional_requests(client):
+    """Test cacheable GETs send validators and 304 when the client's copy matches."""
+    for path in ("/api/waitlist/count", "/health", "/"):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"].startswith("public, max-age=")
+        tag = response.headers["ETag"]
+
+        response = client.get(path, headers={"If-None-Match": tag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == tag
+
+    # A signup changes the count, so the old tag no longer matches
+    tag = client.get("/api/waitlist/count").headers["ETag"]
+    client.post(
+        "/api/waitlist", json={"email": f"test-{uuid.uuid4().hex[:8]}@example.com"}
+    )
+    response = client.get("/api/waitlist/count", headers={"If-None-Match": tag})
+    assert response.status_code == 200
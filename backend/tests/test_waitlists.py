@@ -0,0 +1,103 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.repositories import FirestoreWaitlistRepository, InMemoryWaitlistRepository
+from app.services.waitlist import AsyncWaitlistService
+from app.services.waitlists import UnknownWaitlistError, WaitlistRegistry
+from main import app
+from tests.fakes import FakeAsyncClient
+
+
+@pytest.fixture
+def client(monkeypatch):
+    service = AsyncWaitlistService(InMemoryWaitlistRepository())
+    monkeypatch.setattr(app.state, "waitlist_service", service, raising=False)
+    monkeypatch.setattr(app.state, "waitlist_registry", None, raising=False)
+    monkeypatch.setattr(app.state, "rate_limiter", None, raising=False)
+    return TestClient(app)
+
+
+def test_named_lists_have_their_own_entries_and_counts(client, monkeypatch):
+    """Test an address can join two lists once each, counted per list."""
+    monkeypatch.setattr(settings, "waitlist_lists", ["launch-a", "launch-b"])
+    for list_id in ("launch-a", "launch-b"):
+        response = client.post(
+            f"/api/waitlists/{list_id}", json={"email": "person@example.com"}
+        )
+        assert response.status_code == 200
+    response = client.post(
+        "/api/waitlists/launch-a", json={"email": "person@example.com"}
+    )
+    assert response.status_code == 400
+
+    assert client.get("/api/waitlists/launch-a/count").json() == {"count": 1}
+    assert client.get("/api/waitlists/launch-b/count").json() == {"count": 1}
+    assert client.get("/api/waitlist/count").json() == {"count": 0}
+
+    # "default" is the list of /api/waitlist
+    client.post("/api/waitlists/default", json={"email": "person@example.com"})
+    assert client.get("/api/waitlist/count").json() == {"count": 1}
+
+
+def test_only_listed_or_admin_created_lists_exist(client, monkeypatch):
+    """Test callers cannot create lists; WAITLIST_LISTS and admins can."""
+    monkeypatch.setattr(settings, "admin_api_key", "secret")
+    admin = {"Authorization": "Bearer secret"}
+    response = client.post("/api/waitlists/Not_Valid", json={"email": "a@example.com"})
+    assert response.status_code == 404
+    response = client.post("/api/waitlists/made-up", json={"email": "a@example.com"})
+    assert response.status_code == 404
+
+    monkeypatch.setattr(settings, "waitlist_lists", ["launch-a"])
+    assert client.get("/api/waitlists/launch-a/count").status_code == 200
+    assert client.get("/api/waitlists/launch-b/count").status_code == 404
+
+    assert client.post("/api/admin/waitlists/launch-b").status_code == 401
+    response = client.post("/api/admin/waitlists/launch-b", headers=admin)
+    assert response.status_code == 201
+    assert response.json() == {"list_id": "launch-b", "created": True}
+    # Remembered as unknown above, but creating it clears that
+    assert client.get("/api/waitlists/launch-b/count").status_code == 200
+    response = client.post("/api/admin/waitlists/launch-b", headers=admin)
+    assert response.json()["created"] is False
+    response = client.post("/api/admin/waitlists/Not_Valid", headers=admin)
+    assert response.status_code == 400
+
+    # The in-memory backend holds a bounded number of lists
+    monkeypatch.setattr(InMemoryWaitlistRepository, "MAX_LISTS", 2)
+    response = client.post("/api/admin/waitlists/launch-c", headers=admin)
+    assert response.status_code == 409
+    # A listed waitlist it has no room for is a 503, not a 500
+    monkeypatch.setattr(settings, "waitlist_lists", ["launch-a", "launch-d"])
+    response = client.get("/api/waitlists/launch-d/count")
+    assert response.status_code == 503
+    assert response.json() == {"detail": "At most 2 named waitlists"}
+
+
+@pytest.mark.asyncio
+async def test_registry_shares_storage_and_bounds_services():
+    """Test named lists share the client and guard, in a bounded LRU."""
+    fake = FakeAsyncClient()
+    default = AsyncWaitlistService(FirestoreWaitlistRepository(client=fake))
+    registry = WaitlistRegistry(default, max_lists=2)
+    for list_id in ("launch", "one", "two", "three"):
+        assert await registry.create(list_id)
+    assert "waitlists" in fake._store
+
+    launch = await registry.get("launch")
+    assert launch.repository.db is fake
+    assert launch.repository.guard is default.repository.guard
+    await launch.add_email("person@example.com")
+    assert len(fake._store["waitlists/launch/entries"]) == 1
+    assert not fake._store.get("waitlist")
+
+    for list_id in ("one", "two", "three"):
+        await registry.get(list_id)
+    assert registry.stats()["size"] == 2
+    relaunch = await registry.get("launch")
+    assert relaunch is not launch  # evicted, then rebuilt
+    assert await relaunch.get_count() == 1
+    for list_id in ("-bad", "never-created"):
+        with pytest.raises(UnknownWaitlistError):
+            await registry.get(list_id)
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.repositories import InMemoryWaitlistRepository
+from app.services.waitlist import (
+    AsyncWaitlistService,
+    DuplicateEmailError,
+    create_waitlist_service,
+)
+from app.services.write_behind import QueueFullError, WriteBehindQueue
+from main import app
+
+
+class RecordingRepository(InMemoryWaitlistRepository):
+    """In-memory repository that records batches and can hold writes back."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def create_many(self, entries):
+        await self.release.wait()
+        self.batches.append(len(entries))
+        return await super().create_many(entries)
+
+
+@pytest.mark.asyncio
+async def test_signups_are_acknowledged_then_written_in_batches():
+    """Test queued signups return at once and are written in few batches."""
+    repository = RecordingRepository()
+    repository.release.clear()
+    queue = WriteBehindQueue(repository, batch_size=20, flush_interval=0.05)
+    service = AsyncWaitlistService(repository, write_behind=queue)
+
+    await asyncio.gather(
+        *(service.add_email(f"user{i}@example.com") for i in range(50))
+    )
+    assert await repository.count() == 0
+    assert await service.get_count() == 50
+    with pytest.raises(DuplicateEmailError):
+        await service.add_email("user7@example.com")
+
+    repository.release.set()
+    await service.close()
+    assert await repository.count() == 50
+    assert repository.batches == [20, 20, 10]
+    assert queue.stats()["written"] == 50
+
+
+@pytest.mark.asyncio
+async def test_stored_address_is_rejected_before_queueing(monkeypatch):
+    """Test an address already in storage is a duplicate, not a dropped 200."""
+    monkeypatch.setattr(settings, "waitlist_write_behind", True)
+    repository = RecordingRepository()
+    await AsyncWaitlistService(repository).add_email("taken@example.com")
+
+    service = create_waitlist_service(repository)
+    assert service.email_index is not None
+    # While the index loads, the address is read from storage
+    with pytest.raises(DuplicateEmailError):
+        await service.add_email("taken@example.com")
+
+    await service.email_index.load()
+    with pytest.raises(DuplicateEmailError):
+        await service.add_email("Taken@example.com")
+    await service.add_email("new@example.com")
+    await service.close()
+
+    assert await repository.count() == 2
+    assert service.write_behind.stats()["already_registered"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_signups():
+    """Test the queue sheds signups once max_size entries are waiting."""
+    repository = RecordingRepository()
+    repository.release.clear()
+    queue = WriteBehindQueue(repository, max_size=2, batch_size=1, flush_interval=0)
+    service = AsyncWaitlistService(repository, write_behind=queue)
+
+    await service.add_email("a@example.com")
+    await asyncio.sleep(0)  # the writer takes "a" and blocks on the repository
+    await service.add_email("b@example.com")
+    await service.add_email("c@example.com")
+    with pytest.raises(QueueFullError):
+        await service.add_email("d@example.com")
+
+    repository.release.set()
+    await service.close()
+    assert await repository.count() == 3
+    with pytest.raises(QueueFullError):
+        await service.add_email("e@example.com")
+
+
+@pytest.mark.asyncio
+async def test_failing_callback_does_not_stop_the_writer():
+    """Test an on_written error is logged and later batches still drain."""
+    repository = RecordingRepository()
+    service = AsyncWaitlistService(repository)
+    await service.add_email("taken@example.com")
+    queue = WriteBehindQueue(repository, batch_size=1, flush_interval=0)
+
+    def on_written(entries):
+        raise RuntimeError("cache is broken")
+
+    queue.on_written = on_written
+    for email in ("a@example.com", "taken@example.com", "b@example.com"):
+        queue.submit(service.new_entry(email))
+
+    await asyncio.wait_for(queue.drain(), 1.0)
+    assert await repository.count() == 3
+    assert queue.stats()["written"] == 2
+    assert queue.stats()["already_registered"] == 1
+
+
+def test_lifespan_drains_queue_on_shutdown(monkeypatch):
+    """Test signups still queued at shutdown are written before the worker exits."""
+    monkeypatch.setattr(settings, "waitlist_write_behind", True)
+    monkeypatch.setattr(settings, "waitlist_flush_interval", 60.0)
+
+    with TestClient(app) as client:
+        repository = client.app.state.waitlist_service.repository
+        for i in range(3):
+            response = client.post("/api/waitlist", json={"email": f"q{i}@example.com"})
+            assert response.status_code == 200
+        assert client.get("/api/waitlist/count").json() == {"count": 3}
+
+    assert len(repository._by_email) == 3
+
+
+def test_full_queue_returns_503(monkeypatch):
+    """Test the endpoint answers 503 with Retry-After when the queue is full."""
+    repository = RecordingRepository()
+    queue = WriteBehindQueue(repository, max_size=1)
+    queue._closing = True
+    service = AsyncWaitlistService(repository, write_behind=queue)
+    monkeypatch.setattr(app.state, "waitlist_service", service, raising=False)
+
+    response = TestClient(app).post("/api/waitlist", json={"email": "x@example.com"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,92 @@
+// @vitest-environment node
+import { afterEach, describe, expect, it, vi } from 'vitest'
+import { cachedGet, resetUpstreamCache, upstreamStats } from '../app/api/proxy/upstream'
+
+const COUNT_URL = 'http://backend.test/api/waitlist/count'
+
+// Stands in for the backend's GET /api/waitlist/count: answers after `latency`
+// ms with Cache-Control and an ETag, and with 304 to a matching If-None-Match
+const fakeBackend = (latency: number, maxAge: number) => {
+  let count = 42
+  const etag = () => `"count-${count}"`
+  const fetchMock = vi.fn(async (_url: string, init?: RequestInit) => {
+    if (latency > 0) {
+      await new Promise((resolve) => setTimeout(resolve, latency))
+    }
+    const headers = { 'Cache-Control': `public, max-age=${maxAge}`, 'ETag': etag() }
+    const ifNoneMatch = (init?.headers as Record<string, string> | undefined)?.['If-None-Match']
+    if (ifNoneMatch === etag()) {
+      return new Response(null, { status: 304, headers })
+    }
+    return new Response(JSON.stringify({ count }), { status: 200, headers })
+  })
+  vi.stubGlobal('fetch', fetchMock)
+  return { fetchMock, signUp: () => { count++ } }
+}
+
+const getCount = () => cachedGet(COUNT_URL, 'test', 1000)
+
+describe('Proxy upstream cache', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals()
+    vi.useRealTimers()
+    resetUpstreamCache()
+  })
+
+  it('collapses concurrent identical GETs into one upstream request', async () => {
+    const { fetchMock } = fakeBackend(20, 5)
+
+    const responses = await Promise.all(Array.from({ length: 100 }, getCount))
+
+    expect(fetchMock).toHaveBeenCalledTimes(1)
+    expect(responses.every((response) => response.body === '{"count":42}')).toBe(true)
+    expect(upstreamStats.collapsed).toBe(99)
+  })
+
+  it('serves fresh responses from memory and revalidates stale ones', async () => {
+    vi.useFakeTimers({ toFake: ['Date'] })
+    const { fetchMock, signUp } = fakeBackend(0, 5)
+
+    await getCount()
+    await getCount()
+    expect(fetchMock).toHaveBeenCalledTimes(1)
+
+    // Stale: revalidated with If-None-Match and kept on a 304
+    vi.setSystemTime(Date.now() + 6000)
+    expect((await getCount()).body).toBe('{"count":42}')
+    expect(upstreamStats.revalidated).toBe(1)
+
+    signUp()
+    vi.setSystemTime(Date.now() + 6000)
+    expect((await getCount()).body).toBe('{"count":43}')
+    expect(fetchMock).toHaveBeenCalledTimes(3)
+  })
+
+  it('benchmark: upstream requests for viewers polling the count', async () => {
+    vi.useFakeTimers({ toFake: ['Date'] })
+    const { fetchMock, signUp } = fakeBackend(0, 5)
+    const viewers = 200
+    const seconds = 60
+
+    // Every viewer polls once a second; someone signs up every 10 seconds
+    for (let second = 0; second < seconds; second++) {
+      vi.setSystemTime(second * 1000)
+      if (second % 10 === 9) {
+        signUp()
+      }
+      await Promise.all(Array.from({ length: viewers }, getCount))
+    }
+
+    const polls = viewers * seconds
+    console.table({
+      'proxy requests': polls,
+      'upstream requests': upstreamStats.requests,
+      'answered 304': upstreamStats.revalidated,
+      'served from cache': upstreamStats.cacheHits,
+      'collapsed in flight': upstreamStats.collapsed,
+    })
+    // One upstream request per max-age window instead of one per poll
+    expect(fetchMock).toHaveBeenCalledTimes(seconds / 5)
+    expect(upstreamStats.requests).toBeLessThan(polls / 100)
+  })
+})
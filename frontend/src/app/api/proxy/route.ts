@@ -1,8 +1,15 @@
 // src/app/api/proxy/route.ts
 import { NextResponse } from 'next/server';
+import { cachedGet, UpstreamResponse } from './upstream';
 
 const BACKEND_BASE_URL = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://127.0.0.1:8000';
-const REQUEST_TIMEOUT = 30000;  // 30 seconds for TagAssistant API requests
+// The backend bounds each storage call (see backend/app/core/resilience.py) and
+// answers 503 with Retry-After when storage is failing, so requests end well
+// within this; a longer wait would only hold the connection open.
+const REQUEST_TIMEOUT = 10000;  // 10 seconds for TagAssistant API requests
+
+// Streamed through instead of buffered (see GET below)
+const LIVE_COUNT_ENDPOINT = '/api/waitlist/count/stream';
 
 // Log the backend URL on startup
 console.log(`[PROXY-INIT] Backend URL configured as: ${BACKEND_BASE_URL}`);
@@ -19,32 +26,36 @@ interface NetworkError extends Error {
   port?: number;
 }
 
+// The caller's address, for the backend's per-IP rate limits. Cloud Run's
+// front end appends the address it received the request from to
+// X-Forwarded-For, so only the right-most entry can be trusted; anything to
+// its left came from the client.
+const clientIp = (req: Request): string | undefined => {
+  const hops = (req.headers.get('x-forwarded-for') || '')
+    .split(',')
+    .map((hop) => hop.trim())
+    .filter(Boolean);
+  return hops.length > 0 ? hops[hops.length - 1] : req.headers.get('x-real-ip') || undefined;
+};
+
 const logWithTimestamp = (requestId: string, message: string, data?: unknown) => {
   const timestamp = new Date().toISOString();
   console.log(`[${timestamp}][${requestId}] ${message}`, data ? data : '');
 };
 
-// Simple fetch with timeout
-const fetchWithTimeout = async (
+// GET through the shared upstream cache (see ./upstream.ts), failing on
+// non-2xx answers and timeouts
+const getWithTimeout = async (
   url: string,
-  options: RequestInit,
   timeout: number,
   requestId: string
-): Promise<Response> => {
-  const controller = new AbortController();
-  const timeoutId = setTimeout(() => controller.abort(), timeout);
-
+): Promise<UpstreamResponse> => {
   try {
-    logWithTimestamp(requestId, `Fetching ${options.method} ${url}`);
-    
-    const response = await fetch(url, {
-      ...options,
-      signal: controller.signal,
-    });
-    
-    clearTimeout(timeoutId);
-    
-    if (!response.ok) {
+    logWithTimestamp(requestId, `Fetching GET ${url}`);
+
+    const response = await cachedGet(url, requestId, timeout);
+
+    if (response.status < 200 || response.status >= 300) {
       const error = new Error(`HTTP ${response.status}`) as ProxyError;
       error.status = response.status;
       throw error;
@@ -52,14 +63,12 @@ const fetchWithTimeout = async (
 
     return response;
   } catch (error) {
-    clearTimeout(timeoutId);
-    
-    if (error instanceof Error && error.name === 'AbortError') {
+    if (error instanceof Error && (error.name === 'AbortError' || error.name === 'TimeoutError')) {
       const timeoutError = new Error('Request timeout') as ProxyError;
       timeoutError.status = 504;
       throw timeoutError;
     }
-    
+
     throw error;
   }
 };
@@ -98,25 +107,18 @@ export async function POST(req: Request) {
       try {
         logWithTimestamp(requestId, `Health check to: ${BACKEND_BASE_URL}/health`);
         
-        const healthResponse = await fetchWithTimeout(
+        const healthResponse = await getWithTimeout(
           `${BACKEND_BASE_URL}/health`,
-          {
-            method: 'GET',
-            headers: { 
-              'Content-Type': 'application/json',
-              'X-Request-ID': requestId
-            }
-          },
           REQUEST_TIMEOUT,
           requestId
         );
         
-        const healthData = await healthResponse.json();
+        const healthData = JSON.parse(healthResponse.body);
         logWithTimestamp(requestId, 'Health check successful', { status: healthResponse.status });
         
         return NextResponse.json({ 
           status: healthResponse.status,
-          ok: healthResponse.ok,
+          ok: true,
           data: healthData,
           timestamp: new Date().toISOString(),
           backendUrl: `${BACKEND_BASE_URL}/health`
@@ -145,7 +147,30 @@ export async function POST(req: Request) {
       'Content-Type': 'application/json',
       'X-Request-ID': requestId
     };
+    const idempotencyKey = req.headers.get('Idempotency-Key');
+    if (idempotencyKey) {
+      forwardedHeaders['Idempotency-Key'] = idempotencyKey;
+    }
+    // Replaces, rather than extends, the client's header: the backend takes
+    // the right-most entry as the client (RATE_LIMIT_TRUSTED_HOPS=1)
+    const ip = clientIp(req);
+    if (ip) {
+      forwardedHeaders['X-Forwarded-For'] = ip;
+    }
     
+    // Reads are served from the upstream cache while fresh, and identical
+    // concurrent reads share one backend request
+    if (method === 'GET') {
+      const cached = await cachedGet(backendUrl, requestId, REQUEST_TIMEOUT);
+      if (cached.status >= 400) {
+        logWithTimestamp(requestId, `Backend error ${cached.status} from ${endpoint}:`, cached.body);
+      }
+      return new NextResponse(cached.body, {
+        status: cached.status,
+        headers: { 'Content-Type': 'application/json', ...cached.headers }
+      });
+    }
+
     const response = await fetch(backendUrl, {
       method,
       headers: forwardedHeaders,
@@ -161,7 +186,12 @@ export async function POST(req: Request) {
     } else {
       // Handle HTTP errors (400, 500, etc.) by forwarding the error response
       logWithTimestamp(requestId, `Backend error ${response.status} from ${endpoint}:`, data);
-      return NextResponse.json(data, { status: response.status });
+      // Pass on when to try again (503 while storage is failing, 429 when rate limited)
+      const retryAfter = response.headers.get('Retry-After');
+      return NextResponse.json(data, {
+        status: response.status,
+        ...(retryAfter ? { headers: { 'Retry-After': retryAfter } } : {})
+      });
     }
     
   } catch (error) {
@@ -204,23 +234,39 @@ export async function GET(req: Request) {
 
   logWithTimestamp(requestId, `GET proxy request for ${endpoint}`);
 
-  try {
-    
-    const response = await fetchWithTimeout(
-      backendUrl,
-      {
-        method: 'GET',
+  // Server-Sent Events are passed through as a stream, without the request
+  // timeout; the backend ends each stream and EventSource reconnects
+  if (endpoint === LIVE_COUNT_ENDPOINT) {
+    try {
+      const response = await fetch(backendUrl, {
+        headers: { 'Accept': 'text/event-stream', 'X-Request-ID': requestId },
+        signal: req.signal
+      });
+      const retryAfter = response.headers.get('Retry-After');
+      return new Response(response.body, {
+        status: response.status,
         headers: {
-          'Content-Type': 'application/json',
-          'X-Request-ID': requestId
+          'Content-Type': response.headers.get('Content-Type') || 'text/event-stream',
+          'Cache-Control': 'no-cache',
+          'X-Accel-Buffering': 'no',
+          ...(retryAfter ? { 'Retry-After': retryAfter } : {})
         }
-      },
-      REQUEST_TIMEOUT,
-      requestId
-    );
+      });
+    } catch (error) {
+      logWithTimestamp(requestId, 'Live count stream failed:', error instanceof Error ? error.message : error);
+      return NextResponse.json({ error: 'Backend request failed' }, { status: 502 });
+    }
+  }
 
-    const data = await response.json();
-    return NextResponse.json(data);
+  try {
+    
+    const response = await getWithTimeout(backendUrl, REQUEST_TIMEOUT, requestId);
+
+    // Cache-Control and ETag are passed on, so browsers can cache too
+    return new NextResponse(response.body, {
+      status: response.status,
+      headers: { 'Content-Type': 'application/json', ...response.headers }
+    });
     
   } catch (error) {
     const errorDetails = {
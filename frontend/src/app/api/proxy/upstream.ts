@@ -0,0 +1,144 @@
+// src/app/api/proxy/upstream.ts
+//
+// GET requests from the proxy to the backend go through cachedGet:
+// - responses are kept for the max-age the backend sends in Cache-Control
+//   (the count, /health and /), then revalidated with If-None-Match, which
+//   the backend answers with an empty 304 while nothing has changed;
+// - concurrent requests for the same URL share one upstream request.
+//
+// Connections need no agent here: Node's fetch (undici) keeps connections to
+// the backend alive and pools them per origin.
+
+export interface UpstreamResponse {
+  status: number;
+  body: string;
+  headers: Record<string, string>;
+}
+
+interface CacheEntry {
+  response: UpstreamResponse;
+  etag?: string;
+  expiresAt: number;
+}
+
+// Only a handful of GET endpoints are proxied; this just bounds the map
+const MAX_ENTRIES = 100;
+// Response headers passed on to the proxy's own clients
+const PASSED_HEADERS = ['cache-control', 'etag', 'retry-after'];
+
+const cache = new Map<string, CacheEntry>();
+const inFlight = new Map<string, Promise<UpstreamResponse>>();
+
+export const upstreamStats = {
+  requests: 0,     // requests sent to the backend
+  cacheHits: 0,    // answered from a fresh cached response
+  collapsed: 0,    // waited on an identical request already in flight
+  revalidated: 0,  // stale response confirmed by a 304
+};
+
+const maxAgeSeconds = (cacheControl: string | null): number => {
+  if (!cacheControl || /no-store|no-cache|private/i.test(cacheControl)) {
+    return 0;
+  }
+  const match = /max-age=(\d+)/i.exec(cacheControl);
+  return match ? Number(match[1]) : 0;
+};
+
+const store = (url: string, entry: CacheEntry) => {
+  // Re-inserting keeps the Map in least recently stored order
+  cache.delete(url);
+  cache.set(url, entry);
+  if (cache.size > MAX_ENTRIES) {
+    const oldest = cache.keys().next().value;
+    if (oldest !== undefined) {
+      cache.delete(oldest);
+    }
+  }
+};
+
+const fetchUpstream = async (
+  url: string,
+  requestId: string,
+  timeout: number
+): Promise<UpstreamResponse> => {
+  const cached = cache.get(url);
+  const headers: Record<string, string> = {
+    'Accept': 'application/json',
+    'X-Request-ID': requestId
+  };
+  if (cached?.etag) {
+    headers['If-None-Match'] = cached.etag;
+  }
+
+  upstreamStats.requests++;
+  const response = await fetch(url, {
+    headers,
+    signal: AbortSignal.timeout(timeout)
+  });
+  const maxAge = maxAgeSeconds(response.headers.get('Cache-Control'));
+
+  if (response.status === 304 && cached) {
+    upstreamStats.revalidated++;
+    cached.expiresAt = Date.now() + maxAge * 1000;
+    return cached.response;
+  }
+
+  const result: UpstreamResponse = {
+    status: response.status,
+    body: await response.text(),
+    headers: {}
+  };
+  for (const name of PASSED_HEADERS) {
+    const value = response.headers.get(name);
+    if (value) {
+      result.headers[name] = value;
+    }
+  }
+
+  if (response.ok && maxAge > 0) {
+    store(url, {
+      response: result,
+      etag: response.headers.get('ETag') ?? undefined,
+      expiresAt: Date.now() + maxAge * 1000
+    });
+  } else {
+    cache.delete(url);
+  }
+  return result;
+};
+
+// GET url from the backend, from the cache while fresh, sharing any identical
+// request already in flight. Network errors and timeouts are thrown.
+export const cachedGet = (
+  url: string,
+  requestId: string,
+  timeout: number
+): Promise<UpstreamResponse> => {
+  const cached = cache.get(url);
+  if (cached && cached.expiresAt > Date.now()) {
+    upstreamStats.cacheHits++;
+    return Promise.resolve(cached.response);
+  }
+
+  const pending = inFlight.get(url);
+  if (pending) {
+    upstreamStats.collapsed++;
+    return pending;
+  }
+
+  const request = fetchUpstream(url, requestId, timeout).finally(() => {
+    inFlight.delete(url);
+  });
+  inFlight.set(url, request);
+  return request;
+};
+
+// For tests and benchmarks
+export const resetUpstreamCache = () => {
+  cache.clear();
+  inFlight.clear();
+  upstreamStats.requests = 0;
+  upstreamStats.cacheHits = 0;
+  upstreamStats.collapsed = 0;
+  upstreamStats.revalidated = 0;
+};
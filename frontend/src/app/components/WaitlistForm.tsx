@@ -1,6 +1,6 @@
 'use client'
 
-import { useState } from 'react'
+import { useRef, useState } from 'react'
 import { joinWaitlist } from '../services/api'
 
 interface WaitlistFormProps {
@@ -12,6 +12,8 @@ export default function WaitlistForm({ onSuccess }: WaitlistFormProps) {
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState('')
   const [consented, setConsented] = useState(false)
+  // One key per address, so resubmitting the same email is recognised as a retry
+  const attempt = useRef<{ email: string; key: string } | null>(null)
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault()
@@ -25,7 +27,10 @@ export default function WaitlistForm({ onSuccess }: WaitlistFormProps) {
     setLoading(true)
 
     try {
-      await joinWaitlist(email)
+      if (attempt.current?.email !== email) {
+        attempt.current = { email, key: crypto.randomUUID() }
+      }
+      await joinWaitlist(email, attempt.current.key)
       onSuccess()
     } catch (err) {
       // Show the actual error message from the API
@@ -1,8 +1,12 @@
-export async function joinWaitlist(email: string): Promise<void> {
+// idempotencyKey identifies one signup attempt: resending the same attempt
+// (a double submit or a retry) gets the original answer back instead of
+// "already registered"
+export async function joinWaitlist(email: string, idempotencyKey?: string): Promise<void> {
   const response = await fetch('/api/proxy', {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
+      ...(idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}),
     },
     body: JSON.stringify({ 
       endpoint: '/api/waitlist',